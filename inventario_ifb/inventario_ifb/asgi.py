@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventario_ifb.settings')
 
 application = get_asgi_application()
+
+# As views do scanner são async; o restante roda no mesmo servidor (ex.:
+# uvicorn inventario_ifb.asgi:application). Em DEBUG, o runserver serve os
+# arquivos estáticos e aqui o handler do staticfiles faz o mesmo
+from django.conf import settings  # noqa: E402
+
+if settings.DEBUG:
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+
+    application = ASGIStaticFilesHandler(application)
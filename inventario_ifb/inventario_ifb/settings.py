@@ -42,7 +42,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'meuapp.metricas.MetricasMiddleware',
+    'meuapp.instrumentacao.InstrumentacaoConsultasMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'meuapp.estaticos.EstaticosMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -51,6 +54,22 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Conta as consultas SQL de cada requisição (cabeçalhos X-Consultas-SQL e
+# X-Tempo-SQL-ms) e registra no log as repetidas (padrão N+1). Ligado só com
+# INSTRUMENTACAO_CONSULTAS=1 no ambiente
+INSTRUMENTACAO_CONSULTAS = os.environ.get('INSTRUMENTACAO_CONSULTAS') == '1'
+INSTRUMENTACAO_LIMITE_CONSULTAS = 30
+
+# Métricas no formato do Prometheus em /metricas/ (ver meuapp/metricas.py).
+# O Prometheus envia "Authorization: Bearer <METRICAS_TOKEN>"; sem token,
+# só usuários staff acessam
+METRICAS_ATIVAS = True
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+# Com vários workers, cada processo grava seus totais nessa pasta e /metricas/
+# soma todos. Sem ela, cada resposta traz só os totais do processo que a atendeu
+METRICAS_DIRETORIO = os.environ.get('METRICAS_DIRETORIO')
+METRICAS_INTERVALO_GRAVACAO = 10
+
 ROOT_URLCONF = 'inventario_ifb.urls'
 
 TEMPLATES = [
@@ -74,13 +93,64 @@ WSGI_APPLICATION = 'inventario_ifb.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Perfil de produção do SQLite (WAL, PRAGMAs, conexões persistentes e lock de
+# escrita no BEGIN): ligado fora do DEBUG ou com SQLITE_PRODUCAO=1. Em
+# desenvolvimento o db.sqlite3 versionado fica no journal padrão, sem -wal/-shm
+SQLITE_PRODUCAO = not DEBUG or os.environ.get('SQLITE_PRODUCAO') == '1'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Segundos esperando o lock de escrita antes de "database is locked"
+            'timeout': 20,
+        },
+    }
+}
+
+# PRAGMAs aplicados a cada conexão nova com o SQLite (ver meuapp/banco.py).
+# WAL: leituras não bloqueiam a escrita; com WAL, synchronous=NORMAL só pode
+# perder as últimas transações numa queda de energia, sem corromper o banco
+SQLITE_PRAGMAS = {}
+
+if SQLITE_PRODUCAO:
+    DATABASES['default'].update({
+        # Reaproveita a conexão entre requisições (verificada antes de reutilizar)
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    })
+    # A transação pega o lock de escrita já no BEGIN. No modo padrão
+    # (deferred) a promoção de leitura para escrita falha na hora,
+    # sem esperar o timeout, quando outra conexão está gravando
+    DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,  # em KB (64 MB)
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    }
+# Novas tentativas das views de escrita quando o banco continua bloqueado
+BANCO_TENTATIVAS_ESCRITA = 3
+
+
+# Cache
+# Guarda os contadores do dashboard. Em produção com vários workers use um
+# backend compartilhado (Redis/Memcached) para que todos vejam os mesmos valores.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Intervalo (segundos) para recalcular os contadores a partir do banco
+CONTADORES_INTERVALO_RESYNC = 300
+
+# Validade (segundos) das contagens aproximadas exibidas nas listagens paginadas
+CONTAGEM_APROXIMADA_TTL = 600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,6 +193,22 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'meuapp' / 'static']
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Build dos estáticos: em produção o collectstatic minifica JS/CSS e grava os
+# arquivos com hash no nome e as versões .gz/.br (ver meuapp/estaticos.py).
+# O WhiteNoise serve os comprimidos conforme o Accept-Encoding, com cache de
+# um ano (immutable) para os nomes com hash. Em desenvolvimento os arquivos
+# são servidos direto de meuapp/static, sem build.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': ('django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+                    else 'meuapp.estaticos.EstaticosStorage'),
+    },
+}
+WHITENOISE_AUTOREFRESH = DEBUG
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'principal'
 LOGOUT_REDIRECT_URL = 'login'
@@ -131,3 +217,8 @@ LOGOUT_REDIRECT_URL = 'login'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Relatórios PDF (gerados pelo comando processar_relatorios)
+RELATORIO_PDF_LIMITE_PARALELO = 5000
+RELATORIO_PDF_PROCESSOS = os.cpu_count() or 2
+RELATORIO_JOB_PRAZO_SEGUNDOS = 30 * 60
@@ -1,5 +1,27 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import Setor, Sala, Inventario, Conferencia, ItemConferencia
+from django.contrib.admin.widgets import ForeignKeyRawIdWidget
+from django.forms.models import BaseInlineFormSet
+from django.urls import NoReverseMatch, reverse
+from django.utils.html import format_html
+from django.utils.text import Truncator
+
+from .busca import filtrar_busca
+from .models import (Setor, Sala, Inventario, Conferencia, ItemConferencia, ConciliacaoSala, ConciliacaoItem,
+                     Movimentacao)
+from .movimentacoes import registrar_movimentacoes
+from .paginacao import PaginadorAproximado
+
+# Acima disso a edição da conferência não traz o inline (um formulário por item);
+# os itens ficam na listagem de Itens de Conferência filtrada pela conferência
+ADMIN_INLINE_MAX_ITENS = getattr(settings, 'ADMIN_INLINE_MAX_ITENS', 200)
+
+
+class ContagemAproximadaMixin:
+    """Listagens de tabelas grandes: total estimado em vez de COUNT(*) a cada página."""
+    paginator = PaginadorAproximado
+    show_full_result_count = False
+
 
 @admin.register(Setor)
 class SetorAdmin(admin.ModelAdmin):
@@ -11,31 +33,147 @@ class SetorAdmin(admin.ModelAdmin):
 class SalaAdmin(admin.ModelAdmin):
     list_display = ['numero', 'setor']
     list_filter = ['setor']
+    list_select_related = ['setor']
     search_fields = ['numero']
+    autocomplete_fields = ['setor']
 
 
 @admin.register(Inventario)
-class InventarioAdmin(admin.ModelAdmin):
+class InventarioAdmin(ContagemAproximadaMixin, admin.ModelAdmin):
     list_display = ['codigo', 'descricao', 'tipo', 'status', 'sala_atual']
     list_filter = ['tipo', 'status']
+    list_select_related = ['sala_atual']
     search_fields = ['codigo', 'descricao', 'numero_serie']
+    autocomplete_fields = ['sala_atual']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Índice FTS5 e prefixo do código em vez de LIKE '%...%' em cada campo
+        return filtrar_busca(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        anterior = form.initial.get('sala_atual') if change else None
+        super().save_model(request, obj, form, change)
+        registrar_movimentacoes([(obj.pk, anterior, obj.sala_atual_id)], 'admin', usuario_id=request.user.pk)
+
+
+class InventarioRawIdWidget(ForeignKeyRawIdWidget):
+    """Campo de id do inventário que usa o item já carregado pelo inline para o rótulo.
+
+    O ForeignKeyRawIdWidget padrão faz uma consulta por linha para isso.
+    """
+    carregado = None
+
+    def label_and_url_for_value(self, value):
+        if self.carregado is None or str(self.carregado.pk) != str(value):
+            return super().label_and_url_for_value(value)
+        try:
+            url = reverse(f'{self.admin_site.name}:meuapp_inventario_change', args=[self.carregado.pk])
+        except NoReverseMatch:
+            url = ''
+        return Truncator(self.carregado).words(14), url
+
+
+class ItensConferenciaFormSet(BaseInlineFormSet):
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        if form.instance.pk:
+            # O formset só preenche conferencia_id; sem isso o __str__ de cada linha relê a conferência
+            form.instance.conferencia = self.instance
+            form.fields['inventario'].widget.carregado = form.instance.inventario
 
 
 class ItemConferenciaInline(admin.TabularInline):
     model = ItemConferencia
+    formset = ItensConferenciaFormSet
     extra = 0
+    raw_id_fields = ['inventario']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('inventario')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'inventario':
+            kwargs['widget'] = InventarioRawIdWidget(db_field.remote_field, self.admin_site, using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(Conferencia)
-class ConferenciaAdmin(admin.ModelAdmin):
+class ConferenciaAdmin(ContagemAproximadaMixin, admin.ModelAdmin):
     list_display = ['sala', 'ano', 'usuario', 'data_inicio', 'finalizada']
-    list_filter = ['finalizada', 'ano', 'sala']
+    # Sem filtro por sala: a lista lateral teria todas as salas (use a busca)
+    list_filter = ['finalizada', 'ano']
+    list_select_related = ['sala', 'usuario']
     search_fields = ['sala__numero', 'usuario__username']
+    raw_id_fields = ['usuario']
+    autocomplete_fields = ['sala']
+    readonly_fields = ['itens_conferidos']
     inlines = [ItemConferenciaInline]
 
+    def get_queryset(self, request):
+        # __str__ usa sala e usuário, inclusive no título da edição e nas linhas do inline
+        return super().get_queryset(request).select_related('sala', 'usuario')
+
+    def get_inlines(self, request, obj):
+        if obj is not None and obj.total_itens > ADMIN_INLINE_MAX_ITENS:
+            return []
+        return super().get_inlines(request, obj)
+
+    @admin.display(description='Itens conferidos')
+    def itens_conferidos(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:meuapp_itemconferencia_changelist')
+        return format_html('<a href="{}?conferencia__id__exact={}">{} item(ns)</a>', url, obj.pk, obj.total_itens)
+
 
 @admin.register(ItemConferencia)
-class ItemConferenciaAdmin(admin.ModelAdmin):
+class ItemConferenciaAdmin(ContagemAproximadaMixin, admin.ModelAdmin):
     list_display = ['conferencia', 'inventario', 'status_conferido', 'data_conferencia']
     list_filter = ['status_conferido', 'data_conferencia']
-    search_fields = ['inventario__codigo', 'observacao']
\ No newline at end of file
+    list_select_related = ['inventario', 'conferencia__sala', 'conferencia__usuario']
+    search_fields = ['inventario__codigo']
+    raw_id_fields = ['conferencia', 'inventario']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Mesma busca do inventário (prefixo do código e FTS5) em vez de LIKE na junção.
+        # A observação fica fora: sem índice, seria um LIKE '%...%' na tabela inteira
+        if not search_term.strip():
+            return queryset, False
+        itens = filtrar_busca(Inventario.objects.all(), search_term).values('pk')
+        return queryset.filter(inventario__in=itens), False
+
+
+@admin.register(ConciliacaoSala)
+class ConciliacaoSalaAdmin(admin.ModelAdmin):
+    list_display = ['sala', 'ano', 'conferencias', 'esperados', 'encontrados', 'faltantes',
+                    'realocados', 'inesperados', 'calculado_em']
+    list_filter = ['ano', 'sala__setor']
+    list_select_related = ['sala']
+
+
+@admin.register(ConciliacaoItem)
+class ConciliacaoItemAdmin(ContagemAproximadaMixin, admin.ModelAdmin):
+    list_display = ['inventario', 'sala', 'ano', 'situacao', 'sala_relacionada']
+    list_filter = ['ano', 'situacao']
+    list_select_related = ['inventario', 'sala', 'sala_relacionada']
+    search_fields = ['inventario__codigo']
+
+
+@admin.register(Movimentacao)
+class MovimentacaoAdmin(ContagemAproximadaMixin, admin.ModelAdmin):
+    """Histórico só para consulta: movimentações não são editadas nem apagadas."""
+    list_display = ['inventario', 'sala_anterior', 'sala', 'data', 'origem', 'usuario']
+    list_filter = ['origem', 'data']
+    list_select_related = ['inventario', 'sala_anterior', 'sala', 'usuario']
+    # Sem date_hierarchy: ele faz MIN/MAX e agrupa as datas da tabela inteira a
+    # cada carregamento. O filtro lateral por data só monta links fixos
+    search_fields = ['inventario__codigo']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,138 @@
+import hashlib
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+from .busca import FIM_PREFIXO, maiusculas
+from .models import Sala, Setor
+
+AUTOCOMPLETAR_LIMITE = getattr(settings, 'AUTOCOMPLETAR_LIMITE', 20)
+AUTOCOMPLETAR_CACHE_TTL = getattr(settings, 'AUTOCOMPLETAR_CACHE_TTL', 300)
+CHAVE_VERSAO = 'autocompletar:versao'
+# Prefixo numérico: "10" também encontra 100-109, 1000-1099... até esse tamanho
+NUMERO_MAX_DIGITOS = 9
+
+
+# ========== WIDGET ==========
+class AutocompletarSelect(forms.Select):
+    """<select> que traz só a opção escolhida; as demais vêm do endpoint `url` (ver js/autocompletar.js).
+
+    Evita carregar e renderizar a tabela inteira como <option>.
+    """
+
+    class Media:
+        js = [forms.Script('js/autocompletar.js', defer=True)]
+
+    def __init__(self, url, rotulo=str, select_related=(), attrs=None):
+        super().__init__(attrs)
+        self.url = url
+        self.rotulo = rotulo
+        self.select_related = select_related
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocompletar'] = str(self.url)
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        escolhidos = [v for v in value if str(v).isdigit()]
+        vazio = self.choices.field.empty_label
+        opcoes = []
+        if vazio is not None or not escolhidos:
+            opcoes.append(self.create_option(name, '', vazio or '---------', not escolhidos, 0))
+        if escolhidos:
+            selecionados = self.choices.queryset.select_related(*self.select_related).filter(pk__in=escolhidos)
+            for indice, objeto in enumerate(selecionados, start=1):
+                opcoes.append(self.create_option(name, objeto.pk, self.rotulo(objeto), True, indice))
+        return [(None, opcoes, 0)]
+
+
+def rotulo_sala(sala):
+    return f'{sala} - {sala.setor.sigla} ({sala.setor.campus})'
+
+
+def rotulo_setor(setor):
+    return f'{setor} ({setor.campus})'
+
+
+# ========== CACHE ==========
+def _versao():
+    return cache.get_or_set(CHAVE_VERSAO, 1, timeout=None)
+
+
+def invalidar_autocompletar():
+    """Descarta as respostas em cache (chamado quando salas ou setores mudam)."""
+    try:
+        cache.incr(CHAVE_VERSAO)
+    except ValueError:
+        cache.set(CHAVE_VERSAO, 1, timeout=None)
+
+
+def _em_cache(modelo, parametros, calcular):
+    chave = hashlib.md5(repr(sorted(parametros.items())).encode()).hexdigest()
+    chave = f'autocompletar:{modelo}:{_versao()}:{chave}'
+    resultado = cache.get(chave)
+    if resultado is None:
+        resultado = calcular()
+        cache.set(chave, resultado, AUTOCOMPLETAR_CACHE_TTL)
+    return resultado
+
+
+# ========== CONSULTAS ==========
+def _prefixo_texto(campo_maiusculo, termo):
+    # Intervalo sobre UPPER(campo) usa o índice de expressão, como na busca do inventário
+    prefixo = maiusculas(termo)
+    return Q(**{f'{campo_maiusculo}__gte': prefixo, f'{campo_maiusculo}__lt': prefixo + FIM_PREFIXO})
+
+
+def _prefixo_numero(termo):
+    valor, filtro = int(termo), Q(numero=int(termo))
+    for digitos in range(len(termo) + 1, NUMERO_MAX_DIGITOS + 1):
+        escala = 10 ** (digitos - len(termo))
+        filtro |= Q(numero__gte=valor * escala, numero__lt=(valor + 1) * escala)
+    return filtro
+
+
+def _resposta(objetos, rotulo, limite):
+    return {
+        'resultados': [{'id': objeto.pk, 'texto': rotulo(objeto)} for objeto in objetos[:limite]],
+        'mais': len(objetos) > limite,
+    }
+
+
+def autocompletar_salas(termo='', campus='', setor='', limite=AUTOCOMPLETAR_LIMITE):
+    """Salas pelo prefixo do número ou da sigla/nome do setor ("10", "CGEN 10"), opcionalmente por campus."""
+    def calcular():
+        salas = Sala.objects.select_related('setor').alias(
+            sigla_maiuscula=Upper('setor__sigla'), nome_maiusculo=Upper('setor__nome'))
+        for palavra in termo.split():
+            if palavra.isdigit() and len(palavra) <= NUMERO_MAX_DIGITOS:
+                salas = salas.filter(_prefixo_numero(palavra))
+            else:
+                salas = salas.filter(_prefixo_texto('sigla_maiuscula', palavra)
+                                     | _prefixo_texto('nome_maiusculo', palavra))
+        if campus:
+            salas = salas.filter(setor__campus=campus)
+        if setor.isdigit():
+            salas = salas.filter(setor_id=setor)
+        return _resposta(list(salas.order_by('numero', 'id')[:limite + 1]), rotulo_sala, limite)
+
+    return _em_cache('salas', {'q': termo, 'campus': campus, 'setor': setor, 'limite': limite}, calcular)
+
+
+def autocompletar_setores(termo='', campus='', limite=AUTOCOMPLETAR_LIMITE):
+    """Setores pelo prefixo da sigla ou do nome, opcionalmente por campus."""
+    def calcular():
+        setores = Setor.objects.alias(sigla_maiuscula=Upper('sigla'), nome_maiusculo=Upper('nome'))
+        termo_limpo = termo.strip()
+        if termo_limpo:
+            setores = setores.filter(_prefixo_texto('sigla_maiuscula', termo_limpo)
+                                     | _prefixo_texto('nome_maiusculo', termo_limpo))
+        if campus:
+            setores = setores.filter(campus=campus)
+        return _resposta(list(setores.order_by('sigla', 'id')[:limite + 1]), rotulo_setor, limite)
+
+    return _em_cache('setores', {'q': termo, 'campus': campus, 'limite': limite}, calcular)
@@ -0,0 +1,75 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections, transaction
+
+SQLITE_PRAGMAS = getattr(settings, 'SQLITE_PRAGMAS', {})
+TENTATIVAS_ESCRITA = getattr(settings, 'BANCO_TENTATIVAS_ESCRITA', 3)
+ESPERA_INICIAL = 0.1  # segundos; dobra a cada tentativa
+METODOS_LEITURA = ('GET', 'HEAD', 'OPTIONS')
+
+
+def aplicar_pragmas(conexao):
+    """Aplica os SQLITE_PRAGMAS numa conexão recém-aberta (signal connection_created)."""
+    if conexao.vendor != 'sqlite' or not SQLITE_PRAGMAS:
+        return
+    with conexao.cursor() as cursor:
+        for nome, valor in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {nome} = {valor}')
+
+
+def inicializar_processo():
+    """Initializer dos pools de processos: cada filho abre as próprias conexões.
+
+    Com spawn o filho ainda precisa do django.setup(); com fork ele só fecha
+    as conexões herdadas do pai.
+    """
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def banco_bloqueado(exc):
+    return isinstance(exc, OperationalError) and 'locked' in str(exc)
+
+
+def _executar_com_retentativa(chamada):
+    for tentativa in range(TENTATIVAS_ESCRITA):
+        try:
+            with transaction.atomic():
+                return chamada()
+        except OperationalError as exc:
+            if not banco_bloqueado(exc) or tentativa == TENTATIVAS_ESCRITA - 1:
+                raise
+        # Espera aleatória para as requisições concorrentes não colidirem de novo
+        time.sleep(ESPERA_INICIAL * 2 ** tentativa * random.uniform(0.5, 1.5))
+
+
+def repetir_se_bloqueado(funcao):
+    """Executa a função numa transação, repetindo se o banco estiver bloqueado.
+
+    Dentro de uma transação já aberta não há como repetir, e a função é
+    chamada diretamente. Usado também pelas views async via sync_to_async.
+    """
+    @wraps(funcao)
+    def envolver(*args, **kwargs):
+        if connection.in_atomic_block:
+            return funcao(*args, **kwargs)
+        return _executar_com_retentativa(lambda: funcao(*args, **kwargs))
+    return envolver
+
+
+def repetir_escrita(view):
+    """repetir_se_bloqueado para as requisições de escrita de uma view síncrona.
+
+    O timeout da conexão já espera pelo lock; a nova tentativa cobre o que
+    passar dele em picos de conferência.
+    """
+    @wraps(view)
+    def envolver(request, *args, **kwargs):
+        if request.method in METODOS_LEITURA or connection.in_atomic_block:
+            return view(request, *args, **kwargs)
+        return _executar_com_retentativa(lambda: view(request, *args, **kwargs))
+    return envolver
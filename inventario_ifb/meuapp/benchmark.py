@@ -0,0 +1,315 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.db.models import Count
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from .conferencias import registrar_itens
+from .dados_sinteticos import USUARIO
+from .instrumentacao import ContadorConsultas
+from .models import Conferencia, Inventario, RelatorioJob, Sala
+from .relatorios import processar_job, reservar_proximo_job
+
+PERCENTIS = (50, 90, 95, 99)
+
+
+def _consumir(resposta):
+    # Respostas streaming (CSV) só fazem o trabalho enquanto o corpo é lido
+    if resposta.streaming:
+        for _ in resposta.streaming_content:
+            pass
+    return resposta
+
+
+def _percentil(valores, percentil):
+    """Percentil pelo método nearest-rank (sempre um valor observado)."""
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(percentil / 100 * len(ordenados)) - 1)]
+
+
+# ========== CENÁRIOS ==========
+def _principal(cliente, contexto, i):
+    return cliente.get(reverse('principal'))
+
+
+def _inventario_list(cliente, contexto, i):
+    return cliente.get(reverse('inventario_list'))
+
+
+def _realizar_conferencia(cliente, contexto, i):
+    return cliente.get(reverse('realizar_conferencia', args=[contexto['conferencia'].pk]))
+
+
+def _confirmar_item(cliente, contexto, i):
+    # Um item ainda não conferido a cada repetição: mede a criação, não a edição
+    inventario_pk = contexto['pendentes'][i % len(contexto['pendentes'])]
+    return cliente.post(reverse('confirmar_item', args=[contexto['conferencia'].pk, inventario_pk]),
+                        {'status_conferido': 'bom', 'observacao': ''})
+
+
+def _relatorio_csv(cliente, contexto, i):
+    return cliente.get(reverse('relatorio_csv'))
+
+
+def _limpar_relatorios(contexto):
+    for job in RelatorioJob.objects.all():
+        if job.arquivo:
+            job.arquivo.delete(save=False)
+        job.delete()
+
+
+def _relatorio_pdf(cliente, contexto, i):
+    # A requisição só enfileira; o worker é executado aqui para medir a geração
+    resposta = cliente.get(reverse('relatorio_pdf'))
+    job = processar_job(reservar_proximo_job())
+    if job.status != 'concluido':
+        raise RuntimeError(f'Falha ao gerar o PDF: {job.erro}')
+    return resposta
+
+
+# nome -> (preparação antes de cada repetição, requisição medida)
+CENARIOS = {
+    'principal': (None, _principal),
+    'inventario_list': (None, _inventario_list),
+    'realizar_conferencia': (None, _realizar_conferencia),
+    'confirmar_item': (None, _confirmar_item),
+    'relatorio_csv': (None, _relatorio_csv),
+    'relatorio_pdf': (_limpar_relatorios, _relatorio_pdf),
+}
+
+
+# ========== EXECUÇÃO ==========
+def preparar_contexto(execucoes, ano=2025):
+    """Abre uma conferência na sala com mais itens, com metade deles já conferidos.
+
+    Separa `execucoes` itens ainda não conferidos para o cenário confirmar_item.
+    """
+    usuario, _ = User.objects.get_or_create(username=USUARIO)
+    sala = Sala.objects.annotate(total=Count('inventarios')).order_by('-total', 'pk').first()
+    if sala is None:
+        raise ValueError('O banco não tem salas: gere os dados antes (gerar_dados_sinteticos).')
+
+    conferencia = Conferencia.objects.create(sala=sala, ano=ano, usuario=usuario)
+    codigos = list(sala.inventarios.order_by('pk').values_list('codigo', flat=True))
+    registrar_itens(conferencia, [{'codigo': c, 'status': None, 'observacao': None}
+                                  for c in codigos[:len(codigos) // 2]])
+    pendentes = list(Inventario.objects.exclude(itemconferencia__conferencia=conferencia)
+                     .order_by('pk').values_list('pk', flat=True)[:execucoes])
+    return {'usuario': usuario, 'conferencia': conferencia, 'pendentes': pendentes}
+
+
+def medir_cenario(cliente, contexto, preparar, executar, repeticoes, aquecimento):
+    """Executa o cenário e devolve latências, consultas e o pico de memória."""
+    latencias, consultas, tempos_sql, status = [], [], [], set()
+    for i in range(aquecimento + repeticoes):
+        if preparar:
+            preparar(contexto)
+        with ContadorConsultas() as contador:
+            comeco = time.perf_counter()
+            resposta = _consumir(executar(cliente, contexto, i))
+            duracao = time.perf_counter() - comeco
+        if i < aquecimento:
+            continue
+        latencias.append(duracao * 1000)
+        consultas.append(contador.total)
+        tempos_sql.append(contador.tempo * 1000)
+        status.add(resposta.status_code)
+
+    # Uma execução a mais só para a memória: o tracemalloc deixa as demais lentas
+    if preparar:
+        preparar(contexto)
+    tracemalloc.start()
+    try:
+        _consumir(executar(cliente, contexto, aquecimento + repeticoes))
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'repeticoes': repeticoes,
+        'status': sorted(status),
+        'latencia_ms': {
+            'min': round(min(latencias), 2),
+            **{f'p{p}': round(_percentil(latencias, p), 2) for p in PERCENTIS},
+            'max': round(max(latencias), 2),
+            'media': round(sum(latencias) / len(latencias), 2),
+        },
+        'consultas': {'min': min(consultas), 'max': max(consultas)},
+        'tempo_sql_ms_medio': round(sum(tempos_sql) / len(tempos_sql), 2),
+        'memoria_pico_kb': round(pico / 1024),
+    }
+
+
+def executar_benchmark(repeticoes=20, aquecimento=2, cenarios=None):
+    """Mede os cenários pelo cliente de testes do Django; devolve {cenário: resultado}."""
+    cenarios = cenarios or list(CENARIOS)
+    execucoes = aquecimento + repeticoes + 1
+    contexto = preparar_contexto(execucoes)
+    cliente = Client()
+    cliente.force_login(contexto['usuario'])
+    cache.clear()
+
+    resultados = {}
+    for nome in cenarios:
+        preparar, executar = CENARIOS[nome]
+        resultados[nome] = medir_cenario(cliente, contexto, preparar, executar, repeticoes, aquecimento)
+    return resultados
+
+
+# ========== CONCORRÊNCIA ==========
+def _inicializar_operador():
+    # Cada processo abre a própria conexão, como um worker do servidor
+    connections.close_all()
+
+
+def _operador(conferencia_pk, codigos, usuario_pk, largada, lote):
+    """Um operador enviando a fila do scanner em lotes; devolve (latências em ms, erros, itens)."""
+    cliente = Client()
+    cliente.force_login(User.objects.get(pk=usuario_pk))
+    url = reverse('sincronizar_conferencia', args=[conferencia_pk])
+    latencias, erros, confirmados = [], [], 0
+    time.sleep(max(0, largada - time.time()))
+    for inicio in range(0, len(codigos), lote):
+        itens = [{'codigo': codigo} for codigo in codigos[inicio:inicio + lote]]
+        corpo = json.dumps({'chave': f'benchmark-{conferencia_pk}-{inicio}', 'itens': itens})
+        comeco = time.perf_counter()
+        try:
+            resposta = cliente.post(url, corpo, content_type='application/json')
+        except DatabaseError as exc:  # ex.: "database is locked"
+            erros.append(str(exc))
+            continue
+        if resposta.status_code != 200:
+            erros.append(f'HTTP {resposta.status_code}')
+            continue
+        latencias.append((time.perf_counter() - comeco) * 1000)
+        confirmados += len(itens)
+    connections.close_all()
+    return latencias, erros, confirmados
+
+
+def medir_concorrencia(operadores=10, itens_por_operador=30, lote=5, ano=2025):
+    """Operadores simultâneos, um processo por operador, cada um conferindo a própria sala.
+
+    Cada operador sincroniza a fila do scanner em lotes de `lote` itens. Mede
+    a vazão de itens confirmados por segundo e os erros de escrita
+    (banco bloqueado) quando várias conferências gravam ao mesmo tempo.
+    Usa fork: os processos herdam o banco de teste criado pelo comando.
+    """
+    usuario, _ = User.objects.get_or_create(username=USUARIO)
+    salas = list(Sala.objects.annotate(total=Count('inventarios')).order_by('-total', 'pk')[:operadores])
+    if len(salas) < operadores:
+        raise ValueError(f'São necessárias {operadores} salas com itens para {operadores} operadores.')
+
+    tarefas = []
+    for sala in salas:
+        conferencia = Conferencia.objects.create(sala=sala, ano=ano, usuario=usuario)
+        codigos = list(sala.inventarios.order_by('pk').values_list('codigo', flat=True)[:itens_por_operador])
+        tarefas.append((conferencia.pk, codigos))
+
+    # Fecha a conexão antes do fork para não compartilhá-la com os filhos
+    connections.close_all()
+    contexto = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=operadores, mp_context=contexto,
+                             initializer=_inicializar_operador) as pool:
+        largada = time.time() + 1 + operadores * 0.05  # todos começam juntos
+        futuros = [pool.submit(_operador, conferencia_pk, codigos, usuario.pk, largada, lote)
+                   for conferencia_pk, codigos in tarefas]
+        resultados = [futuro.result() for futuro in futuros]
+        duracao = time.time() - largada
+
+    latencias = [latencia for parcial, _, _ in resultados for latencia in parcial]
+    erros = [erro for _, parcial, _ in resultados for erro in parcial]
+    confirmados = sum(itens for _, _, itens in resultados)
+    return {
+        'operadores': operadores,
+        'itens_por_operador': itens_por_operador,
+        'lote': lote,
+        'lotes_enviados': len(latencias),
+        'confirmados': confirmados,
+        'erros': len(erros),
+        'exemplos_de_erro': sorted(set(erros))[:3],
+        'duracao_s': round(duracao, 2),
+        'itens_por_segundo': round(confirmados / duracao, 1) if duracao > 0 else None,
+        'latencia_ms': {
+            **{f'p{p}': round(_percentil(latencias, p), 2) for p in PERCENTIS},
+            'max': round(max(latencias), 2),
+        } if latencias else None,
+    }
+
+
+# ========== SCANNERS ASYNC ==========
+async def _scanner(usuario, conferencia_pk, codigos):
+    """Um scanner: busca o código e confirma o item, em sequência; devolve (latências, erros)."""
+    cliente = AsyncClient()
+    await cliente.aforce_login(usuario)
+    url_busca = reverse('realizar_conferencia', args=[conferencia_pk])
+    latencias, erros = [], []
+    for codigo in codigos:
+        comeco = time.perf_counter()
+        # Como no servidor ASGI: cada requisição tem as próprias threads para o código síncrono
+        async with ThreadSensitiveContext():
+            busca = await cliente.post(url_busca, {'codigo_patrimonio': codigo})
+        if busca.status_code != 302:
+            erros.append(f'busca HTTP {busca.status_code}')
+            continue
+        async with ThreadSensitiveContext():
+            confirmacao = await cliente.post(busca.url, {'status_conferido': 'bom', 'observacao': ''})
+        if confirmacao.status_code != 302:
+            erros.append(f'confirmação HTTP {confirmacao.status_code}')
+            continue
+        latencias.append((time.perf_counter() - comeco) * 1000)
+    return latencias, erros
+
+
+async def _rodar_scanners(usuario, tarefas):
+    comeco = time.perf_counter()
+    resultados = await asyncio.gather(*(_scanner(usuario, conferencia_pk, codigos)
+                                        for conferencia_pk, codigos in tarefas))
+    return resultados, time.perf_counter() - comeco
+
+
+def medir_scanners_async(scanners=50, itens_por_scanner=10, ano=2025):
+    """Scanners simultâneos num único processo e loop de eventos, pelas views async.
+
+    Cada scanner faz, por item, a busca do código (realizar_conferencia) e a
+    confirmação (confirmar_item) na própria conferência. As requisições passam
+    pelo handler ASGI do Django (AsyncClient), sem a camada de rede.
+    """
+    usuario, _ = User.objects.get_or_create(username=USUARIO)
+    salas = list(Sala.objects.order_by('pk')[:scanners])
+    codigos = list(Inventario.objects.order_by('pk').values_list('codigo', flat=True)
+                   [:scanners * itens_por_scanner])
+    if len(codigos) < scanners * itens_por_scanner:
+        raise ValueError(f'São necessários {scanners * itens_por_scanner} itens para {scanners} scanners.')
+
+    tarefas = []
+    for i in range(scanners):
+        conferencia = Conferencia.objects.create(sala=salas[i % len(salas)], ano=ano, usuario=usuario)
+        tarefas.append((conferencia.pk, codigos[i * itens_por_scanner:(i + 1) * itens_por_scanner]))
+
+    resultados, duracao = asyncio.run(_rodar_scanners(usuario, tarefas))
+    latencias = [latencia for parcial, _ in resultados for latencia in parcial]
+    erros = [erro for _, parcial in resultados for erro in parcial]
+    return {
+        'scanners': scanners,
+        'itens_por_scanner': itens_por_scanner,
+        'confirmados': len(latencias),
+        'erros': len(erros),
+        'exemplos_de_erro': sorted(set(erros))[:3],
+        'duracao_s': round(duracao, 2),
+        'itens_por_segundo': round(len(latencias) / duracao, 1) if duracao > 0 else None,
+        'latencia_ms': {
+            **{f'p{p}': round(_percentil(latencias, p), 2) for p in PERCENTIS},
+            'max': round(max(latencias), 2),
+        } if latencias else None,
+    }
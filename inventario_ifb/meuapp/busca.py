@@ -0,0 +1,112 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Upper
+
+from .models import Inventario
+
+TABELA = Inventario._meta.db_table
+TABELA_BUSCA = f'{TABELA}_busca'
+CAMPOS_BUSCA = ['descricao', 'numero_serie', 'obs']
+# Limite de resultados ranqueados na busca da aplicação
+BUSCA_MAX_RESULTADOS = getattr(settings, 'BUSCA_MAX_RESULTADOS', 1000)
+# Maior caractere unicode: limite superior do intervalo de prefixo
+FIM_PREFIXO = '\U0010ffff'
+MAIUSCULAS_ASCII = str.maketrans('abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+
+# ========== ÍNDICE FTS5 ==========
+# A tabela FTS5 e os triggers que a mantêm em sincronia com o Inventario são
+# criados na migração 0017_indice_busca_fts. No SQLite, uma migração que recrie
+# a tabela do inventário (ex.: AlterField) apaga os triggers e precisa repetir
+# o SQL daquela migração
+def busca_disponivel(conexao=None):
+    return (conexao or connection).vendor == 'sqlite'
+
+
+def otimizar_indice_busca(conexao=None):
+    """Junta os segmentos do índice FTS5 (rodado pela manutenção do banco)."""
+    conexao = conexao or connection
+    if busca_disponivel(conexao):
+        with conexao.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}) VALUES ('optimize')")
+
+
+# ========== CONSULTAS ==========
+def expressao_fts(termo):
+    """Converte o texto digitado numa consulta FTS5: todas as palavras, por prefixo."""
+    palavras = re.findall(r'\w+', termo or '')
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def maiusculas(texto):
+    """O texto como o UPPER() do banco o deixaria.
+
+    No SQLite o UPPER() só converte ASCII ('é' continua 'é'); o str.upper()
+    do Python tiraria o prefixo do intervalo comparado com a coluna.
+    """
+    if connection.vendor == 'sqlite':
+        return texto.translate(MAIUSCULAS_ASCII)
+    return texto.upper()
+
+
+def _filtro_codigo(termo):
+    # Intervalo sobre UPPER(codigo) usa o índice de expressão (LIKE não usaria)
+    prefixo = maiusculas(termo.strip())
+    return Q(codigo_maiusculo__gte=prefixo, codigo_maiusculo__lt=prefixo + FIM_PREFIXO)
+
+
+def filtrar_busca(queryset, termo):
+    """Filtra o queryset pelo prefixo do código ou pelo texto (sem ranking)."""
+    termo = (termo or '').strip()
+    if not termo:
+        return queryset
+
+    queryset = queryset.alias(codigo_maiusculo=Upper('codigo'))
+    filtro = _filtro_codigo(termo)
+    expressao = expressao_fts(termo)
+    if expressao and busca_disponivel():
+        filtro |= Q(pk__in=RawSQL(f'SELECT rowid FROM {TABELA_BUSCA} WHERE {TABELA_BUSCA} MATCH %s', [expressao]))
+    elif expressao:
+        for campo in CAMPOS_BUSCA:
+            filtro |= Q(**{f'{campo}__icontains': termo})
+    return queryset.filter(filtro)
+
+
+def _buscar_texto_ranqueado(expressao, limite):
+    with connection.cursor() as cursor:
+        # ORDER BY rank com LIMIT fica dentro do FTS5: ranqueia todas as ocorrências
+        # guardando só as `limite` melhores, sem cortar os itens mais antigos
+        cursor.execute(
+            f'SELECT rowid FROM {TABELA_BUSCA} WHERE {TABELA_BUSCA} MATCH %s ORDER BY rank LIMIT %s',
+            [expressao, limite],
+        )
+        return [linha[0] for linha in cursor.fetchall()]
+
+
+def buscar_ids(termo, limite=BUSCA_MAX_RESULTADOS):
+    """Ids em ordem de relevância: códigos com o prefixo primeiro, depois o texto por bm25."""
+    termo = (termo or '').strip()
+    if not termo:
+        return []
+
+    ids = list(
+        Inventario.objects.alias(codigo_maiusculo=Upper('codigo'))
+        .filter(_filtro_codigo(termo)).order_by('codigo_maiusculo')
+        .values_list('id', flat=True)[:limite]
+    )
+    expressao = expressao_fts(termo)
+    if expressao and len(ids) < limite:
+        if busca_disponivel():
+            texto = _buscar_texto_ranqueado(expressao, limite)
+        else:
+            filtro = Q()
+            for campo in CAMPOS_BUSCA:
+                filtro |= Q(**{f'{campo}__icontains': termo})
+            texto = Inventario.objects.filter(filtro).values_list('id', flat=True)[:limite]
+        vistos = set(ids)
+        ids += [i for i in texto if i not in vistos]
+    return ids[:limite]
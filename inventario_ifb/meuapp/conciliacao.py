@@ -0,0 +1,174 @@
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import (ConciliacaoItem, ConciliacaoSala, Conferencia, Inventario,
+                     ItemConferencia, Sala)
+
+# Tabelas usadas nas consultas em SQL
+SALA = Sala._meta.db_table
+INVENTARIO = Inventario._meta.db_table
+CONFERENCIA = Conferencia._meta.db_table
+ITEM = ItemConferencia._meta.db_table
+RESUMO = ConciliacaoSala._meta.db_table
+DETALHE = ConciliacaoItem._meta.db_table
+
+# Cada sala entra seis vezes nos parâmetros do INSERT do detalhe: em lotes, as
+# consultas ficam abaixo do limite de variáveis do SQLite (999 para o Django)
+SALAS_POR_LOTE = 150
+
+
+def _lista(valores):
+    return ', '.join(['%s'] * len(valores))
+
+
+def _sql_localizacao(ano, salas):
+    """CTE `localizacao` (inventario_id, esperada, encontrada) dos itens ligados às salas.
+
+    Esperada: sala cadastrada antes da primeira conferência do ano (ou a atual,
+    se o item não foi conferido). Encontrada: sala da última conferência do ano.
+    """
+    sql = f"""
+        WITH relevantes AS (
+            SELECT id FROM {INVENTARIO} WHERE sala_atual_id IN ({_lista(salas)})
+            UNION
+            SELECT ic.inventario_id FROM {ITEM} ic
+            INNER JOIN {CONFERENCIA} c ON c.id = ic.conferencia_id
+            WHERE c.ano = %s AND (c.sala_id IN ({_lista(salas)}) OR ic.sala_anterior_id IN ({_lista(salas)}))
+        ),
+        varreduras AS (
+            SELECT ic.inventario_id, MIN(ic.id) AS primeira, MAX(ic.id) AS ultima
+            FROM {ITEM} ic
+            INNER JOIN {CONFERENCIA} c ON c.id = ic.conferencia_id
+            WHERE c.ano = %s AND ic.inventario_id IN (SELECT id FROM relevantes)
+            GROUP BY ic.inventario_id
+        ),
+        localizacao AS (
+            SELECT v.inventario_id, primeira.sala_anterior_id AS esperada, c.sala_id AS encontrada
+            FROM varreduras v
+            INNER JOIN {ITEM} primeira ON primeira.id = v.primeira
+            INNER JOIN {ITEM} ultima ON ultima.id = v.ultima
+            INNER JOIN {CONFERENCIA} c ON c.id = ultima.conferencia_id
+            UNION ALL
+            SELECT i.id, i.sala_atual_id, NULL
+            FROM {INVENTARIO} i
+            WHERE i.sala_atual_id IN ({_lista(salas)})
+              AND NOT EXISTS (SELECT 1 FROM {ITEM} ic
+                              INNER JOIN {CONFERENCIA} c ON c.id = ic.conferencia_id
+                              WHERE ic.inventario_id = i.id AND c.ano = %s)
+        )
+    """
+    return sql, [*salas, ano, *salas, *salas, ano, *salas, ano]
+
+
+def _recalcular(ano, salas, calculado_em):
+    """Recalcula detalhe e resumo das salas com consultas de conjunto (sem laço por item)."""
+    localizacao, parametros = _sql_localizacao(ano, salas)
+    calculado_em = connection.ops.adapt_datetimefield_value(calculado_em)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {DETALHE} WHERE ano = %s AND sala_id IN ({_lista(salas)})', [ano, *salas])
+        cursor.execute(f'DELETE FROM {RESUMO} WHERE ano = %s AND sala_id IN ({_lista(salas)})', [ano, *salas])
+
+        cursor.execute(
+            f"""
+            INSERT INTO {DETALHE} (ano, sala_id, inventario_id, situacao, sala_relacionada_id)
+            {localizacao}
+            SELECT %s, esperada, inventario_id,
+                   CASE WHEN encontrada IS NULL THEN 'faltante'
+                        WHEN encontrada = esperada THEN 'encontrado'
+                        ELSE 'realocado' END,
+                   CASE WHEN encontrada <> esperada THEN encontrada END
+            FROM localizacao
+            WHERE esperada IN ({_lista(salas)})
+            UNION ALL
+            SELECT %s, encontrada, inventario_id, 'inesperado', esperada
+            FROM localizacao
+            WHERE encontrada IN ({_lista(salas)}) AND (esperada IS NULL OR esperada <> encontrada)
+            """,
+            [*parametros, ano, *salas, ano, *salas],
+        )
+
+        cursor.execute(
+            f"""
+            INSERT INTO {RESUMO} (sala_id, ano, conferencias, esperados, encontrados, faltantes,
+                                  realocados, inesperados, calculado_em)
+            SELECT s.id, %s,
+                   (SELECT COUNT(*) FROM {CONFERENCIA} c WHERE c.sala_id = s.id AND c.ano = %s),
+                   COUNT(CASE WHEN d.situacao <> 'inesperado' THEN 1 END),
+                   COUNT(CASE WHEN d.situacao = 'encontrado' THEN 1 END),
+                   COUNT(CASE WHEN d.situacao = 'faltante' THEN 1 END),
+                   COUNT(CASE WHEN d.situacao = 'realocado' THEN 1 END),
+                   COUNT(CASE WHEN d.situacao = 'inesperado' THEN 1 END),
+                   %s
+            FROM {SALA} s
+            LEFT JOIN {DETALHE} d ON d.sala_id = s.id AND d.ano = %s
+            WHERE s.id IN ({_lista(salas)})
+            GROUP BY s.id
+            """,
+            [ano, ano, calculado_em, ano, *salas],
+        )
+
+
+def salas_alteradas(ano, desde):
+    """Salas cuja conciliação pode ter mudado desde `desde`, numa única consulta."""
+    desde = connection.ops.adapt_datetimefield_value(desde)
+    alterados = f'SELECT id FROM {INVENTARIO} WHERE atualizado_em > %s'
+    # Resumos que não batem mais com o banco: conferência ou itens excluídos
+    divergentes = f"""
+        SELECT r.sala_id FROM {RESUMO} r
+        WHERE r.ano = %s AND (
+            r.conferencias <> (SELECT COUNT(*) FROM {CONFERENCIA} c WHERE c.sala_id = r.sala_id AND c.ano = r.ano)
+            OR r.esperados + r.inesperados <> (SELECT COUNT(*) FROM {DETALHE} d
+                                               WHERE d.sala_id = r.sala_id AND d.ano = r.ano))
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT sala_id FROM {CONFERENCIA} WHERE ano = %s AND atualizado_em > %s
+            UNION {divergentes}
+            UNION SELECT sala_atual_id FROM {INVENTARIO} WHERE atualizado_em > %s
+            UNION SELECT ic.sala_anterior_id FROM {ITEM} ic
+                  INNER JOIN {CONFERENCIA} c ON c.id = ic.conferencia_id
+                  WHERE c.ano = %s AND ic.inventario_id IN ({alterados})
+            UNION SELECT sala_id FROM {DETALHE} WHERE ano = %s AND inventario_id IN ({alterados})
+            UNION SELECT sala_relacionada_id FROM {DETALHE} WHERE ano = %s AND inventario_id IN ({alterados})
+            UNION SELECT sala_id FROM {DETALHE} WHERE ano = %s AND sala_relacionada_id IN ({divergentes})
+            """,
+            [ano, desde, ano, desde, ano, desde, ano, desde, ano, desde, ano, ano],
+        )
+        return {sala_id for sala_id, in cursor.fetchall() if sala_id is not None}
+
+
+@transaction.atomic
+def atualizar_conciliacao(ano, setor=None, campus=None, completo=False):
+    """Atualiza a conciliação do ano para um setor, um campus ou todas as salas.
+
+    Sem `completo`, só recalcula as salas sem resumo e as alteradas desde o
+    cálculo mais antigo do escopo. Devolve a lista de salas recalculadas.
+    """
+    escopo = Sala.objects.all()
+    if setor is not None:
+        escopo = escopo.filter(setor=setor)
+    if campus:
+        escopo = escopo.filter(setor__campus=campus)
+    ids_escopo = set(escopo.values_list('id', flat=True))
+
+    # Marcado antes do cálculo: alterações concorrentes entram na próxima rodada
+    calculado_em = timezone.now()
+    resumos = ConciliacaoSala.objects.filter(ano=ano, sala_id__in=escopo.values('id'))
+    if completo:
+        salas = ids_escopo
+    else:
+        salas = ids_escopo - set(resumos.values_list('sala_id', flat=True))
+        desde = resumos.aggregate(desde=Min('calculado_em'))['desde']
+        if desde is not None:
+            salas |= salas_alteradas(ano, desde) & ids_escopo
+
+    salas = sorted(salas)
+    # Cada lote é independente: uma sala só recebe as linhas em que é esperada ou encontrada
+    for inicio in range(0, len(salas), SALAS_POR_LOTE):
+        _recalcular(ano, salas[inicio:inicio + SALAS_POR_LOTE], calculado_em)
+    # As demais salas do escopo foram verificadas: a próxima rodada parte daqui
+    # (as recalculadas já têm esse calculado_em)
+    resumos.update(calculado_em=calculado_em)
+    return salas
@@ -0,0 +1,142 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .metricas import registrar_leituras
+from .models import Conferencia, Inventario, ItemConferencia
+from .movimentacoes import registrar_movimentacoes
+
+STATUS_VALIDOS = {valor for valor, _ in Inventario.STATUS_CHOICES}
+
+
+def atualizar_totais(conferencia_id, itens=0, por_status=None):
+    """Soma deltas aos totais da conferência num único UPDATE (seguro com concorrência)."""
+    campos = {}
+    if itens:
+        campos['total_itens'] = F('total_itens') + itens
+    for status, delta in (por_status or {}).items():
+        if delta and status in STATUS_VALIDOS:
+            campos[f'total_{status}'] = F(f'total_{status}') + delta
+    if campos:
+        Conferencia.objects.filter(pk=conferencia_id).update(atualizado_em=timezone.now(), **campos)
+
+
+def normalizar_itens(dados):
+    """Aceita {"codigos": [...]} ou {"itens": [{"codigo", "status", "observacao"}, ...]}."""
+    if not isinstance(dados, dict):
+        raise ValueError('Corpo da requisição deve ser um objeto JSON.')
+
+    itens = dados.get('itens')
+    if itens is None:
+        codigos = dados.get('codigos', [])
+        if not isinstance(codigos, list):
+            raise ValueError('"codigos" deve ser uma lista.')
+        itens = [{'codigo': codigo} for codigo in codigos]
+    if not isinstance(itens, list):
+        raise ValueError('"itens" deve ser uma lista.')
+
+    normalizados = []
+    for item in itens:
+        if isinstance(item, str):
+            item = {'codigo': item}
+        if not isinstance(item, dict) or not isinstance(item.get('codigo'), str) or not item['codigo'].strip():
+            raise ValueError('Cada item precisa de um "codigo" (texto).')
+        for campo in ('status', 'observacao'):
+            if not isinstance(item.get(campo), (str, type(None))):
+                raise ValueError(f'"{campo}" deve ser texto ou null.')
+        normalizados.append({
+            'codigo': item['codigo'].strip(),
+            'status': item.get('status') or None,
+            'observacao': item.get('observacao') or None,
+        })
+    return normalizados
+
+
+@transaction.atomic
+def registrar_itens(conferencia, itens):
+    """Confere vários patrimônios de uma vez, com número fixo de consultas.
+
+    Devolve uma lista com o resultado de cada código, na ordem recebida:
+    "ok", "ja_conferido", "nao_encontrado" ou "status_invalido".
+    """
+    codigos = {item['codigo'] for item in itens}
+    inventarios = {
+        codigo: (pk, status, sala_id)
+        for pk, codigo, status, sala_id in Inventario.objects.filter(codigo__in=codigos).order_by()
+        .values_list('id', 'codigo', 'status', 'sala_atual_id')
+    }
+    existentes = {
+        item.inventario_id: item
+        for item in ItemConferencia.objects.filter(
+            conferencia=conferencia,
+            inventario_id__in=[pk for pk, _, _ in inventarios.values()],
+        )
+    }
+
+    resultados = []
+    novos = {}
+    alterados = {}
+    deltas = Counter()
+    for item in itens:
+        codigo = item['codigo']
+        if codigo not in inventarios:
+            resultados.append({'codigo': codigo, 'resultado': 'nao_encontrado'})
+            continue
+
+        inventario_id, status_cadastrado, sala_cadastrada = inventarios[codigo]
+        status = item['status'] or status_cadastrado
+        if status not in STATUS_VALIDOS:
+            resultados.append({'codigo': codigo, 'resultado': 'status_invalido'})
+            continue
+
+        existente = existentes.get(inventario_id) or novos.get(inventario_id)
+        if existente is None:
+            novos[inventario_id] = ItemConferencia(
+                conferencia=conferencia,
+                inventario_id=inventario_id,
+                status_conferido=status,
+                observacao=item['observacao'],
+                sala_anterior_id=sala_cadastrada,
+            )
+            resultados.append({'codigo': codigo, 'resultado': 'ok'})
+            continue
+
+        # Já conferido: só atualiza o que foi enviado explicitamente
+        if item['status'] or item['observacao']:
+            if item['status'] and existente.status_conferido != status:
+                if existente.pk:
+                    deltas[existente.status_conferido] -= 1
+                    deltas[status] += 1
+                existente.status_conferido = status
+            if item['observacao']:
+                existente.observacao = item['observacao']
+            if existente.pk:
+                alterados[inventario_id] = existente
+        resultados.append({'codigo': codigo, 'resultado': 'ja_conferido'})
+
+    if novos:
+        ItemConferencia.objects.bulk_create(novos.values())
+        deltas.update(item.status_conferido for item in novos.values())
+    if alterados:
+        ItemConferencia.objects.bulk_update(alterados.values(), ['status_conferido', 'observacao'])
+
+    # bulk_create/bulk_update não disparam signals: os totais são somados aqui
+    atualizar_totais(conferencia.pk, itens=len(novos), por_status=deltas)
+
+    # Todos os itens encontrados passam a estar na sala da conferência
+    conferidos = list(novos) + list(alterados)
+    if conferidos:
+        Inventario.objects.filter(pk__in=conferidos).update(
+            sala_atual=conferencia.sala_id, atualizado_em=timezone.now(),
+        )
+        salas_cadastradas = {pk: sala_id for pk, _, sala_id in inventarios.values()}
+        registrar_movimentacoes(
+            [(pk, salas_cadastradas[pk], conferencia.sala_id) for pk in conferidos],
+            'conferencia', usuario_id=conferencia.usuario_id, conferencia_id=conferencia.pk,
+        )
+
+    # Só depois do commit: se o banco estiver bloqueado a transação é refeita
+    transaction.on_commit(lambda: registrar_leituras(conferencia.pk, len(itens)))
+    return resultados
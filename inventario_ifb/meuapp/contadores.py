@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .models import Conferencia, Inventario, Sala
+
+PREFIXO = 'contadores'
+# Depois desse intervalo os contadores são recalculados a partir do banco
+INTERVALO_RESYNC = getattr(settings, 'CONTADORES_INTERVALO_RESYNC', 300)
+CHAVE_SINCRONIZADO = f'{PREFIXO}:sincronizado'
+
+
+def chave(*partes):
+    return ':'.join((PREFIXO, *partes))
+
+
+def todas_as_chaves():
+    chaves = [chave('salas'), chave('inventarios'), chave('conferencias'), chave('conferencias_abertas')]
+    chaves += [chave('status', valor) for valor, _ in Inventario.STATUS_CHOICES]
+    chaves += [chave('tipo', valor) for valor, _ in Inventario.TIPO_CHOICES]
+    return chaves
+
+
+def calcular_contadores():
+    """Calcula todos os contadores numa única consulta agregada."""
+    inventario = Inventario._meta.db_table
+    colunas = [
+        f'(SELECT COUNT(*) FROM {Sala._meta.db_table})',
+        f'(SELECT COUNT(*) FROM {inventario})',
+        f'(SELECT COUNT(*) FROM {Conferencia._meta.db_table})',
+        f'(SELECT COUNT(*) FROM {Conferencia._meta.db_table} WHERE finalizada = %s)',
+    ]
+    parametros = [False]
+    for campo, escolhas in (('status', Inventario.STATUS_CHOICES), ('tipo', Inventario.TIPO_CHOICES)):
+        for valor, _ in escolhas:
+            colunas.append(f'(SELECT COUNT(*) FROM {inventario} WHERE {campo} = %s)')
+            parametros.append(valor)
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT ' + ', '.join(colunas), parametros)
+        valores = cursor.fetchone()
+    return dict(zip(todas_as_chaves(), valores))
+
+
+def sincronizar_contadores():
+    valores = calcular_contadores()
+    cache.set_many(valores, timeout=None)
+    cache.set(CHAVE_SINCRONIZADO, True, timeout=INTERVALO_RESYNC)
+    return valores
+
+
+def invalidar_contadores():
+    """Força o recálculo na próxima leitura (ex.: após bulk_create ou update em massa)."""
+    cache.delete(CHAVE_SINCRONIZADO)
+
+
+def obter_contadores():
+    """Lê os contadores do cache, recalculando se faltar algum ou se o resync venceu."""
+    chaves = todas_as_chaves()
+    valores = cache.get_many(chaves + [CHAVE_SINCRONIZADO])
+    if CHAVE_SINCRONIZADO not in valores or any(c not in valores for c in chaves):
+        valores = sincronizar_contadores()
+
+    return {
+        'total_salas': valores[chave('salas')],
+        'total_inventarios': valores[chave('inventarios')],
+        'total_conferencias': valores[chave('conferencias')],
+        'conferencias_abertas': valores[chave('conferencias_abertas')],
+        'por_status': [(rotulo, valores[chave('status', valor)]) for valor, rotulo in Inventario.STATUS_CHOICES],
+        'por_tipo': [(rotulo, valores[chave('tipo', valor)]) for valor, rotulo in Inventario.TIPO_CHOICES],
+    }
+
+
+def aplicar_deltas(deltas):
+    """Soma os deltas ao cache quando a transação atual for confirmada."""
+    deltas = {c: d for c, d in deltas.items() if d}
+    if not deltas:
+        return
+
+    def aplicar():
+        for c, delta in deltas.items():
+            try:
+                cache.incr(c, delta)
+            except ValueError:
+                # Contador ausente: a próxima leitura recalcula tudo
+                invalidar_contadores()
+
+    transaction.on_commit(aplicar)
@@ -0,0 +1,147 @@
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .conferencias import registrar_itens
+from .contadores import invalidar_contadores
+from .models import Conferencia, Inventario, Sala, Setor
+from .movimentacoes import registrar_movimentacoes
+from .resumos import reconstruir_resumo
+
+# campi, setores por campus, salas por setor, itens por sala
+ESCALAS = {
+    'pequena': {'campi': 1, 'setores': 3, 'salas': 3, 'itens': 20},
+    'media': {'campi': 3, 'setores': 10, 'salas': 10, 'itens': 50},
+    'grande': {'campi': 5, 'setores': 20, 'salas': 20, 'itens': 100},
+}
+LOTE = 2000
+USUARIO = 'benchmark'
+
+CAMPI = ['Brasília', 'Gama', 'Taguatinga', 'Planaltina', 'Samambaia', 'Riacho Fundo',
+         'São Sebastião', 'Ceilândia', 'Estrutural', 'Recanto das Emas']
+SETORES = [('CDAE', 'Coordenação de Assistência Estudantil'), ('CGEN', 'Coordenação Geral de Ensino'),
+           ('CDPI', 'Coordenação de Pesquisa e Inovação'), ('CDEX', 'Coordenação de Extensão'),
+           ('CDTI', 'Coordenação de Tecnologia da Informação'), ('CDBI', 'Biblioteca'),
+           ('CDLAB', 'Coordenação de Laboratórios'), ('CDRA', 'Registro Acadêmico'),
+           ('CDAP', 'Coordenação de Administração e Planejamento'), ('CDGP', 'Gestão de Pessoas')]
+# descrição, tipo, valor de referência
+CATALOGO = [
+    ('Mesa de escritório em MDF', 'mobiliario', 450),
+    ('Cadeira giratória com braços', 'mobiliario', 380),
+    ('Armário de aço 2 portas', 'mobiliario', 900),
+    ('Estante de aço 6 prateleiras', 'mobiliario', 350),
+    ('Quadro branco 120x90', 'escritorio', 220),
+    ('Fragmentadora de papel', 'escritorio', 600),
+    ('Computador desktop i5 8GB', 'informatica', 3800),
+    ('Monitor LED 24 polegadas', 'informatica', 900),
+    ('Notebook 14 polegadas', 'informatica', 4500),
+    ('Impressora multifuncional laser', 'informatica', 2200),
+    ('Projetor multimídia', 'informatica', 3100),
+    ('Switch 24 portas', 'informatica', 1700),
+    ('Geladeira frost free 300L', 'eletrodomestico', 2600),
+    ('Bebedouro industrial', 'eletrodomestico', 1400),
+    ('Ar-condicionado split 12000 BTUs', 'eletrodomestico', 2900),
+    ('Forno micro-ondas 20L', 'eletrodomestico', 550),
+    ('Extintor de incêndio PQS 4kg', 'outros', 180),
+    ('Kit de ferramentas', 'outros', 320),
+]
+MARCAS = ['Dell', 'Lenovo', 'HP', 'Positivo', 'Epson', 'LG', 'Samsung', 'Cavaletti', 'Pandin', 'Consul']
+STATUS = ['bom', 'danificado', 'inutilizado']
+STATUS_PESOS = [85, 10, 5]
+
+
+def _campus(indice):
+    nome = f'Campus {CAMPI[indice % len(CAMPI)]}'
+    return nome if indice < len(CAMPI) else f'{nome} {indice // len(CAMPI) + 1}'
+
+
+def _inventario(rng, numero, sala_id, hoje):
+    descricao, tipo, valor = rng.choice(CATALOGO)
+    return Inventario(
+        codigo=f'IFB{numero:08d}',
+        descricao=f'{descricao} {rng.choice(MARCAS)}',
+        tipo=tipo,
+        status=rng.choices(STATUS, weights=STATUS_PESOS)[0],
+        valor_aquisicao=round(valor * rng.uniform(0.7, 1.4), 2),
+        data_aquisicao=hoje - timedelta(days=rng.randint(30, 15 * 365)),
+        numero_serie=f'SN{rng.getrandbits(40):010X}' if tipo == 'informatica' else None,
+        obs='Etiqueta danificada' if rng.random() < 0.02 else None,
+        sala_atual_id=sala_id,
+    )
+
+
+def _criar_inventarios(lote):
+    Inventario.objects.bulk_create(lote)
+    registrar_movimentacoes([(item.pk, None, item.sala_atual_id) for item in lote], 'importacao')
+
+
+@transaction.atomic
+def gerar_dados(campi, setores, salas, itens, semente=42, ano=2025,
+                fracao_conferida=0.5, fracao_encontrada=0.9, fracao_realocada=0.02):
+    """Cria campi → setores → salas → itens e as conferências do ano.
+
+    A mesma semente gera sempre os mesmos dados. Em `fracao_conferida` das
+    salas há uma conferência finalizada com `fracao_encontrada` dos itens,
+    mais alguns itens de outras salas (realocados). Devolve os totais criados.
+    """
+    rng = random.Random(semente)
+    hoje = date(ano, 12, 31)
+    usuario, _ = User.objects.get_or_create(username=USUARIO)
+
+    novos_setores = Setor.objects.bulk_create([
+        Setor(nome=f'{SETORES[s % len(SETORES)][1]} {s + 1}', sigla=f'{SETORES[s % len(SETORES)][0]}{c + 1}-{s + 1}',
+              campus=_campus(c))
+        for c in range(campi) for s in range(setores)
+    ], batch_size=LOTE)
+    novas_salas = Sala.objects.bulk_create([
+        Sala(numero=(i + 1) * 100 + s + 1, setor=setor)
+        for i, setor in enumerate(novos_setores) for s in range(salas)
+    ], batch_size=LOTE)
+
+    # Continua a numeração de uma geração anterior no mesmo banco
+    ultimo = (Inventario.objects.filter(codigo__startswith='IFB').order_by('-codigo')
+              .values_list('codigo', flat=True).first())
+    numero = int(ultimo[3:]) if ultimo and ultimo[3:].isdigit() else 0
+    codigos_por_sala = {}
+    lote = []
+    for sala in novas_salas:
+        codigos = []
+        for _ in range(itens):
+            numero += 1
+            lote.append(_inventario(rng, numero, sala.pk, hoje))
+            codigos.append(lote[-1].codigo)
+        codigos_por_sala[sala.pk] = codigos
+        if len(lote) >= LOTE:
+            _criar_inventarios(lote)
+            lote = []
+    _criar_inventarios(lote)
+
+    conferencias = 0
+    conferidos = 0
+    for sala in novas_salas:
+        if rng.random() >= fracao_conferida:
+            continue
+        codigos = [c for c in codigos_por_sala[sala.pk] if rng.random() < fracao_encontrada]
+        outra = rng.choice(novas_salas).pk
+        codigos += [c for c in codigos_por_sala[outra] if rng.random() < fracao_realocada]
+        codigos = list(dict.fromkeys(codigos))
+
+        conferencia = Conferencia.objects.create(sala=sala, ano=ano, usuario=usuario, finalizada=True)
+        itens_conferidos = [{'codigo': c, 'status': rng.choices(STATUS, weights=STATUS_PESOS)[0],
+                             'observacao': None} for c in codigos]
+        registrar_itens(conferencia, itens_conferidos)
+        conferencias += 1
+        conferidos += len(codigos)
+
+    # bulk_create não passa pelos signals dos contadores do dashboard nem do resumo
+    invalidar_contadores()
+    reconstruir_resumo()
+    return {
+        'setores': len(novos_setores),
+        'salas': len(novas_salas),
+        'inventarios': len(novas_salas) * itens,
+        'conferencias': conferencias,
+        'itens_conferidos': conferidos,
+    }
@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Inventario
+from .resumos import reconstruir_resumo
+
+# vida_util em anos; residual como fração do valor de aquisição; metodo
+# 'linear' ou 'saldo_decrescente' (taxa padrão: 2 / vida_util ao ano).
+# Pode ser sobrescrito por tipo em settings.DEPRECIACAO_POR_TIPO
+DEPRECIACAO_PADRAO = {
+    'mobiliario': {'vida_util': 10, 'residual': 0.10, 'metodo': 'linear'},
+    'eletrodomestico': {'vida_util': 10, 'residual': 0.10, 'metodo': 'linear'},
+    'informatica': {'vida_util': 5, 'residual': 0.10, 'metodo': 'saldo_decrescente'},
+    'escritorio': {'vida_util': 10, 'residual': 0.10, 'metodo': 'linear'},
+    'outros': {'vida_util': 10, 'residual': 0.10, 'metodo': 'linear'},
+}
+DEPRECIACAO_POR_TIPO = {**DEPRECIACAO_PADRAO, **getattr(settings, 'DEPRECIACAO_POR_TIPO', {})}
+DEPRECIACAO_LOTE = 5000
+# Linhas por UPDATE do bulk_update (um CASE WHEN por linha)
+GRAVACAO_LOTE = 500
+METODOS = ('linear', 'saldo_decrescente')
+DIAS_POR_ANO = 365.25
+
+
+def _parametros(tipo):
+    regra = DEPRECIACAO_POR_TIPO[tipo]
+    if regra['metodo'] not in METODOS:
+        raise ValueError(f'Método de depreciação inválido para {tipo}: {regra["metodo"]}')
+    vida = float(regra['vida_util'])
+    return regra['metodo'], vida, float(regra.get('residual', 0)), float(regra.get('taxa') or 2 / vida)
+
+
+# ========== CÁLCULO ==========
+def calcular_valores(valores, idades, metodo, vida, residual, taxa):
+    """Valor atual de cada item a partir do valor de aquisição e da idade em anos (vetorizado)."""
+    valores = np.asarray(valores, dtype=float)
+    idades = np.clip(np.asarray(idades, dtype=float), 0, None)
+    if metodo == 'linear':
+        atuais = valores * (1 - (1 - residual) * np.minimum(idades / vida, 1))
+    else:
+        atuais = valores * np.power(1 - taxa, idades)
+    return np.round(np.maximum(atuais, valores * residual), 2)
+
+
+def _lotes(tipo, tamanho):
+    """Colunas dos itens do tipo com valor e data de aquisição, em lotes pela pk (keyset)."""
+    base = (Inventario.objects.filter(tipo=tipo, valor_aquisicao__isnull=False, data_aquisicao__isnull=False)
+            .order_by('pk'))
+    ultimo = 0
+    while True:
+        lote = list(base.filter(pk__gt=ultimo).values_list(
+            'pk', 'valor_aquisicao', 'data_aquisicao', 'valor_depreciado', 'sala_atual__setor__sigla',
+        )[:tamanho])
+        if not lote:
+            return
+        pks, valores, datas, anteriores, setores = zip(*lote)
+        yield (
+            np.array(pks),
+            np.array(valores, dtype=float),
+            np.array([d.toordinal() for d in datas]),
+            np.array([np.nan if v is None else v for v in anteriores], dtype=float),
+            np.array([s or 'Sem setor' for s in setores]),
+        )
+        ultimo = lote[-1][0]
+
+
+def _gravar(pks, atuais):
+    # bulk_update não passa pelo auto_now: o atualizado_em vai explícito
+    agora = timezone.now()
+    itens = [
+        Inventario(pk=pk, valor_depreciado=atual, atualizado_em=agora)
+        for pk, atual in zip(pks.tolist(), atuais.tolist())
+    ]
+    with transaction.atomic():
+        Inventario.objects.bulk_update(itens, ['valor_depreciado', 'atualizado_em'], batch_size=GRAVACAO_LOTE)
+
+
+def depreciar(data_referencia=None, simular=False, tamanho_lote=DEPRECIACAO_LOTE):
+    """Recalcula valor_depreciado de todos os itens com valor e data de aquisição.
+
+    Só grava os itens cujo valor mudou. Devolve
+    (alterados, totais por sigla do setor: [itens, aquisição, depreciado]).
+    """
+    referencia = (data_referencia or timezone.localdate()).toordinal()
+    totais = defaultdict(lambda: [0, 0.0, 0.0])
+    alterados = 0
+
+    for tipo in DEPRECIACAO_POR_TIPO:
+        metodo, vida, residual, taxa = _parametros(tipo)
+        for pks, valores, datas, anteriores, setores in _lotes(tipo, tamanho_lote):
+            atuais = calcular_valores(valores, (referencia - datas) / DIAS_POR_ANO, metodo, vida, residual, taxa)
+
+            siglas, indices = np.unique(setores, return_inverse=True)
+            contagens = np.bincount(indices, minlength=len(siglas))
+            aquisicoes = np.bincount(indices, weights=valores, minlength=len(siglas))
+            depreciados = np.bincount(indices, weights=atuais, minlength=len(siglas))
+            for sigla, itens, aquisicao, depreciado in zip(siglas.tolist(), contagens.tolist(),
+                                                          aquisicoes.tolist(), depreciados.tolist()):
+                total = totais[sigla]
+                total[0] += itens
+                total[1] += aquisicao
+                total[2] += depreciado
+
+            # NaN (sem valor anterior) nunca compara >= e entra pelo isnan
+            mudaram = np.isnan(anteriores) | (np.abs(anteriores - atuais) >= 0.005)
+            alterados += int(mudaram.sum())
+            if mudaram.any() and not simular:
+                _gravar(pks[mudaram], atuais[mudaram])
+    # O bulk_update não passa pelos signals do resumo analítico
+    if alterados and not simular:
+        reconstruir_resumo()
+    return alterados, dict(totais)
@@ -0,0 +1,75 @@
+import os
+
+import rcssmin
+import rjsmin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# Pastas (dentro do STATIC_ROOT) com os arquivos do projeto a minificar;
+# os do admin já vêm minificados do Django
+ESTATICOS_MINIFICAR = tuple(getattr(settings, 'ESTATICOS_MINIFICAR', ('css/', 'js/')))
+MINIFICADORES = {
+    '.js': rjsmin.jsmin,
+    '.css': rcssmin.cssmin,
+}
+
+
+class EstaticosStorage(CompressedManifestStaticFilesStorage):
+    """Build dos estáticos no collectstatic.
+
+    Minifica JS e CSS do projeto, grava as cópias com o hash do conteúdo no
+    nome (ManifestStaticFilesStorage) e as versões .gz e .br de cada uma
+    (WhiteNoise), que o WhiteNoiseMiddleware serve com cache de longa duração.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = {nome: (self, nome) if self._minificar(nome) else origem for nome, origem in paths.items()}
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def _minificar(self, nome):
+        """Minifica a cópia do arquivo no STATIC_ROOT; devolve False se ele não é minificado."""
+        minificador = MINIFICADORES.get(os.path.splitext(nome)[1])
+        if minificador is None or not nome.replace(os.sep, '/').startswith(ESTATICOS_MINIFICAR):
+            return False
+        with self.open(nome) as arquivo:
+            original = arquivo.read().decode('utf-8')
+        minificado = minificador(original)
+        if minificado != original:
+            self.delete(nome)
+            self._save(nome, ContentFile(minificado.encode('utf-8')))
+        # O hash e as versões comprimidas são calculados a partir desta cópia, não do original
+        return True
+
+
+class EstaticosMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware que também roda em modo async.
+
+    O original é só síncrono, o que faz o Django adaptar a cadeia inteira sob
+    ASGI e rodar as views async do scanner numa thread. Os arquivos são
+    servidos do mesmo jeito; só a chamada da próxima etapa é aguardada.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,233 @@
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import groupby
+from string import ascii_lowercase, ascii_uppercase
+
+from django.conf import settings
+from django.db import connections
+from reportlab.graphics.barcode import qrencoder
+from reportlab.graphics.barcode.code128 import Code128
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from .metricas import registrar_relatorio
+from .models import Inventario
+
+# Medidas em milímetros. Outros modelos de folha podem ser incluídos em
+# settings.ETIQUETAS_FORMATOS, com as mesmas chaves
+FORMATOS_PADRAO = {
+    'a4_3x8': {
+        'nome': 'A4 - 3 x 8 (70 x 37 mm)',
+        'pagina': (210, 297), 'colunas': 3, 'linhas': 8, 'largura': 70, 'altura': 37,
+        'margem_esquerda': 0, 'margem_superior': 0.5, 'espaco_horizontal': 0, 'espaco_vertical': 0,
+    },
+    'a4_2x7': {
+        'nome': 'A4 - 2 x 7 (99,1 x 38,1 mm)',
+        'pagina': (210, 297), 'colunas': 2, 'linhas': 7, 'largura': 99.1, 'altura': 38.1,
+        'margem_esquerda': 4.65, 'margem_superior': 15.15, 'espaco_horizontal': 2.5, 'espaco_vertical': 0,
+    },
+    'carta_3x10': {
+        'nome': 'Carta - 3 x 10 (66,7 x 25,4 mm)',
+        'pagina': (215.9, 279.4), 'colunas': 3, 'linhas': 10, 'largura': 66.7, 'altura': 25.4,
+        'margem_esquerda': 4.8, 'margem_superior': 12.7, 'espaco_horizontal': 3.2, 'espaco_vertical': 0,
+    },
+}
+FORMATOS_ETIQUETA = {**FORMATOS_PADRAO, **getattr(settings, 'ETIQUETAS_FORMATOS', {})}
+SIMBOLOGIAS = {
+    'code128': 'Código de barras (Code 128)',
+    'qr': 'QR Code',
+}
+
+# Acima desse total de etiquetas as folhas são desenhadas num pool de processos
+ETIQUETAS_LIMITE_PARALELO = getattr(settings, 'ETIQUETAS_LIMITE_PARALELO', 2000)
+ETIQUETAS_POR_PARTE = getattr(settings, 'ETIQUETAS_POR_PARTE', 1000)
+ETIQUETAS_PROCESSOS = getattr(settings, 'ETIQUETAS_PROCESSOS', os.cpu_count() or 2)
+ETIQUETAS_CACHE_CODIGOS = getattr(settings, 'ETIQUETAS_CACHE_CODIGOS', 20000)
+ETIQUETAS_CHUNK_SIZE = 2000
+# Maior lote gerado pela página; acima disso, só pelo comando gerar_etiquetas
+ETIQUETAS_LIMITE_WEB = getattr(settings, 'ETIQUETAS_LIMITE_WEB', 2000)
+
+MARGEM_INTERNA = 2 * mm
+
+
+# ========== FILTROS ==========
+def filtrar_etiquetas(filtros):
+    """Inventário de uma sala, de um setor e/ou adquirido a partir de uma data, na ordem do código."""
+    inventarios = Inventario.objects.all()
+    if filtros.get('sala'):
+        inventarios = inventarios.filter(sala_atual=filtros['sala'])
+    if filtros.get('setor'):
+        inventarios = inventarios.filter(sala_atual__setor=filtros['setor'])
+    if filtros.get('desde'):
+        inventarios = inventarios.filter(data_aquisicao__gte=filtros['desde'])
+    return inventarios.order_by('codigo')
+
+
+# ========== CÓDIGOS ==========
+def _barras_code128(codigo):
+    barcode = Code128(codigo, barWidth=1, barHeight=1, quiet=0, humanReadable=0)
+    barcode.validate()
+    if not barcode.valid:
+        # O reportlab descartaria os caracteres fora do ASCII e as barras leriam outro código
+        raise ValueError(f'Código fora do Code 128: {codigo!r}')
+    barcode.encode()
+    barcode.decompose()
+    # Como no MultiWidthBarcode.draw: minúscula = espaço, maiúscula = barra, na largura da letra
+    esquerda, barras = 0, []
+    for letra in barcode.decomposed:
+        if letra in ascii_uppercase:
+            largura = ord(letra) - ord('A') + 1
+            barras.append((esquerda, 0, largura, 1))
+            esquerda += largura
+        elif letra in ascii_lowercase:
+            esquerda += ord(letra) - ord('a') + 1
+    return esquerda, 1, barras
+
+
+def _modulos_qr(codigo):
+    qr = qrencoder.QRCode(None, qrencoder.QRErrorCorrectLevel.L)
+    qr.addData(codigo)
+    qr.make()
+    tamanho, barras = qr.getModuleCount(), []
+    # Módulos escuros seguidos na mesma linha viram um retângulo só
+    for linha, modulos in enumerate(qr.modules):
+        coluna = 0
+        for escuro, grupo in groupby(modulos, bool):
+            quantidade = len(list(grupo))
+            if escuro:
+                barras.append((coluna, tamanho - linha - 1, quantidade, 1))
+            coluna += quantidade
+    return tamanho, tamanho, barras
+
+
+@lru_cache(maxsize=ETIQUETAS_CACHE_CODIGOS)
+def geometria_codigo(simbologia, codigo):
+    """(largura, altura, barras) do código, em módulos.
+
+    As barras saem direto da codificação do reportlab, sem montar o Drawing
+    (a parte cara, principalmente no QR); ficam em cache por código e cada
+    etiqueta as desenha num único caminho preenchido.
+    """
+    largura, altura, barras = (_modulos_qr if simbologia == 'qr' else _barras_code128)(codigo)
+    return largura, altura, tuple(barras)
+
+
+def _desenhar_codigo(pdf, simbologia, codigo, x, y, largura, altura):
+    largura_desenho, altura_desenho, barras = geometria_codigo(simbologia, codigo)
+    escala_x, escala_y = largura / largura_desenho, altura / altura_desenho
+    if simbologia == 'qr':
+        escala_x = escala_y = min(escala_x, escala_y)
+    pdf.saveState()
+    pdf.translate(x, y)
+    pdf.scale(escala_x, escala_y)
+    caminho = pdf.beginPath()
+    for barra in barras:
+        caminho.rect(*barra)
+    pdf.drawPath(caminho, stroke=0, fill=1)
+    pdf.restoreState()
+
+
+def _ajustar(texto, fonte, tamanho, largura):
+    """Corta o texto com reticências para caber na largura."""
+    if stringWidth(texto, fonte, tamanho) <= largura:
+        return texto
+    while texto and stringWidth(texto + '…', fonte, tamanho) > largura:
+        texto = texto[:-1]
+    return texto + '…'
+
+
+# ========== FOLHAS ==========
+def _desenhar_etiqueta(pdf, etiqueta, simbologia, x, y, largura, altura):
+    codigo, descricao, sala_numero, setor_sigla = etiqueta
+    local = f"Sala {sala_numero} - {setor_sigla}" if sala_numero is not None else "Sem sala"
+    x, y = x + MARGEM_INTERNA, y + MARGEM_INTERNA
+    largura, altura = largura - 2 * MARGEM_INTERNA, altura - 2 * MARGEM_INTERNA
+    if simbologia == 'code128' and not codigo.isascii():
+        # Code 128 só tem ASCII; o QR leva o código em UTF-8, igual ao impresso
+        simbologia = 'qr'
+
+    if simbologia == 'qr':
+        # QR à esquerda, textos à direita
+        _desenhar_codigo(pdf, simbologia, codigo, x, y, altura, altura)
+        x_texto, largura_texto, topo = x + altura + MARGEM_INTERNA, largura - altura - MARGEM_INTERNA, y + altura
+    else:
+        # Textos em cima, barras ocupando o resto da altura
+        x_texto, largura_texto, topo = x, largura, y + altura
+        _desenhar_codigo(pdf, simbologia, codigo, x, y, largura, altura - 24)
+
+    pdf.setFont('Helvetica-Bold', 9)
+    pdf.drawString(x_texto, topo - 8, _ajustar(codigo, 'Helvetica-Bold', 9, largura_texto))
+    pdf.setFont('Helvetica', 6.5)
+    pdf.drawString(x_texto, topo - 15, _ajustar(descricao, 'Helvetica', 6.5, largura_texto))
+    pdf.drawString(x_texto, topo - 22, _ajustar(local, 'Helvetica', 6.5, largura_texto))
+
+
+def _renderizar_folhas(etiquetas, formato, simbologia, destino):
+    """Desenha as etiquetas em folhas do formato, a partir da primeira posição da primeira folha."""
+    especificacao = FORMATOS_ETIQUETA[formato]
+    largura_pagina, altura_pagina = (medida * mm for medida in especificacao['pagina'])
+    largura, altura = especificacao['largura'] * mm, especificacao['altura'] * mm
+    passo_x = largura + especificacao['espaco_horizontal'] * mm
+    passo_y = altura + especificacao['espaco_vertical'] * mm
+    por_pagina = especificacao['colunas'] * especificacao['linhas']
+
+    pdf = canvas.Canvas(destino, pagesize=(largura_pagina, altura_pagina))
+    posicao = 0
+    for posicao, etiqueta in enumerate(etiquetas):
+        if posicao and posicao % por_pagina == 0:
+            pdf.showPage()
+        linha, coluna = divmod(posicao % por_pagina, especificacao['colunas'])
+        x = especificacao['margem_esquerda'] * mm + coluna * passo_x
+        y = altura_pagina - especificacao['margem_superior'] * mm - (linha + 1) * passo_y + (passo_y - altura)
+        _desenhar_etiqueta(pdf, etiqueta, simbologia, x, y, largura, altura)
+    pdf.showPage()
+    pdf.save()
+    return destino
+
+
+def gerar_etiquetas_pdf(filtros, destino, formato='a4_3x8', simbologia='code128', copias=1, paralelo=True):
+    """Escreve em `destino` (caminho ou arquivo) as folhas de etiquetas do inventário filtrado.
+
+    Devolve o total de etiquetas. Lotes grandes são divididos em partes de
+    folhas inteiras, desenhadas em paralelo num pool de processos e depois
+    concatenadas. Com paralelo=False (a view) tudo é desenhado no processo atual.
+    """
+    inicio = time.perf_counter()
+    linhas = filtrar_etiquetas(filtros).values_list(
+        'codigo', 'descricao', 'sala_atual__numero', 'sala_atual__setor__sigla',
+    ).iterator(chunk_size=ETIQUETAS_CHUNK_SIZE)
+    etiquetas = [linha for linha in linhas for _ in range(copias)]
+
+    if not paralelo or len(etiquetas) < ETIQUETAS_LIMITE_PARALELO:
+        _renderizar_folhas(etiquetas, formato, simbologia, destino)
+        registrar_relatorio('etiquetas', time.perf_counter() - inicio, len(etiquetas))
+        return len(etiquetas)
+
+    from pypdf import PdfWriter
+
+    # Partes com folhas inteiras, para a concatenação não deixar posições vazias
+    especificacao = FORMATOS_ETIQUETA[formato]
+    por_pagina = especificacao['colunas'] * especificacao['linhas']
+    tamanho = math.ceil(ETIQUETAS_POR_PARTE / por_pagina) * por_pagina
+    partes = [etiquetas[posicao:posicao + tamanho] for posicao in range(0, len(etiquetas), tamanho)]
+
+    # Os processos só desenham (não usam o banco); a conexão não deve ir para os filhos
+    connections.close_all()
+    with tempfile.TemporaryDirectory(prefix='etiquetas_') as pasta:
+        caminhos = [os.path.join(pasta, f'parte_{i}.pdf') for i in range(len(partes))]
+        with ProcessPoolExecutor(max_workers=ETIQUETAS_PROCESSOS) as pool:
+            for futuro in [pool.submit(_renderizar_folhas, parte, formato, simbologia, caminho)
+                           for parte, caminho in zip(partes, caminhos)]:
+                futuro.result()
+
+        writer = PdfWriter()
+        for caminho in caminhos:
+            writer.append(caminho)
+        writer.write(destino)
+    registrar_relatorio('etiquetas', time.perf_counter() - inicio, len(etiquetas))
+    return len(etiquetas)
@@ -1,6 +1,20 @@
 from django import forms
+from django.urls import reverse_lazy
+from .autocompletar import AutocompletarSelect, rotulo_sala, rotulo_setor
+from .etiquetas import ETIQUETAS_LIMITE_WEB, FORMATOS_ETIQUETA, SIMBOLOGIAS, filtrar_etiquetas
 from .models import Sala, Inventario, Conferencia, ItemConferencia, Setor
 
+
+def select_sala(**attrs):
+    return AutocompletarSelect(reverse_lazy('autocompletar_salas'), rotulo=rotulo_sala, select_related=['setor'],
+                               attrs={'class': 'form-control', **attrs})
+
+
+def select_setor(**attrs):
+    return AutocompletarSelect(reverse_lazy('autocompletar_setores'), rotulo=rotulo_setor,
+                               attrs={'class': 'form-control', **attrs})
+
+
 class SetorForm(forms.ModelForm):
     class Meta:
         model = Setor
@@ -18,14 +32,14 @@ class SalaForm(forms.ModelForm):
         fields = ['numero', 'setor']
         widgets = {
             'numero': forms.NumberInput(attrs={'class': 'form-control'}),
-            'setor': forms.Select(attrs={'class': 'form-control'}),
+            'setor': select_setor(),
         }
 
 
 class InventarioForm(forms.ModelForm):
     class Meta:
         model = Inventario
-        fields = ['codigo', 'descricao', 'tipo', 'status', 'valor_aquisicao',
+        fields = ['codigo', 'descricao', 'tipo', 'status', 'valor_aquisicao', 'data_aquisicao',
                   'valor_depreciado', 'numero_serie', 'obs', 'sala_atual']
         widgets = {
             'codigo': forms.TextInput(attrs={'class': 'form-control'}),
@@ -33,10 +47,11 @@ class InventarioForm(forms.ModelForm):
             'tipo': forms.Select(attrs={'class': 'form-control'}),
             'status': forms.Select(attrs={'class': 'form-control'}),
             'valor_aquisicao': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
+            'data_aquisicao': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}, format='%Y-%m-%d'),
             'valor_depreciado': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'numero_serie': forms.TextInput(attrs={'class': 'form-control'}),
             'obs': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
-            'sala_atual': forms.Select(attrs={'class': 'form-control'}),
+            'sala_atual': select_sala(),
         }
 
 
@@ -45,7 +60,7 @@ class ConferenciaForm(forms.ModelForm):
         model = Conferencia
         fields = ['sala', 'ano']
         widgets = {
-            'sala': forms.Select(attrs={'class': 'form-control'}),
+            'sala': select_sala(),
             'ano': forms.NumberInput(attrs={'class': 'form-control'}),
         }
 
@@ -53,7 +68,7 @@ class ConferenciaForm(forms.ModelForm):
 class IniciarConferenciaForm(forms.Form):
     sala = forms.ModelChoiceField(
         queryset=Sala.objects.all(),
-        widget=forms.Select(attrs={'class': 'form-control'}),
+        widget=select_sala(),
         label="Selecione a Sala"
     )
     ano = forms.IntegerField(
@@ -85,3 +100,56 @@ class ConfirmarItemForm(forms.ModelForm):
             'imagem_observacao': forms.FileInput(attrs={'class': 'form-control'}),
         }
 
+
+class FiltroRelatorioForm(forms.Form):
+    tipo = forms.ChoiceField(
+        choices=[('', 'Todos')] + Inventario.TIPO_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    status = forms.ChoiceField(
+        choices=[('', 'Todos')] + Inventario.STATUS_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    setor = forms.IntegerField(required=False, widget=forms.HiddenInput)
+    sala = forms.IntegerField(required=False, widget=forms.HiddenInput)
+
+
+class FiltroEtiquetasForm(forms.Form):
+    sala = forms.ModelChoiceField(queryset=Sala.objects.all(), required=False, widget=select_sala())
+    setor = forms.ModelChoiceField(queryset=Setor.objects.all(), required=False, widget=select_setor())
+    desde = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        label="Adquiridos a partir de"
+    )
+    formato = forms.ChoiceField(
+        choices=[(chave, formato['nome']) for chave, formato in FORMATOS_ETIQUETA.items()],
+        initial='a4_3x8',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        label="Folha de etiquetas"
+    )
+    simbologia = forms.ChoiceField(
+        choices=list(SIMBOLOGIAS.items()),
+        initial='code128',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        label="Código"
+    )
+    copias = forms.IntegerField(
+        min_value=1, max_value=10, initial=1,
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+        label="Cópias de cada etiqueta"
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        total = filtrar_etiquetas(cleaned_data).count() * cleaned_data['copias']
+        if total > ETIQUETAS_LIMITE_WEB:
+            raise forms.ValidationError(
+                f'Os filtros resultam em {total} etiquetas; pela página o limite é {ETIQUETAS_LIMITE_WEB}. '
+                'Restrinja a sala, o setor ou a data, ou gere o lote com "manage.py gerar_etiquetas".'
+            )
+        return cleaned_data
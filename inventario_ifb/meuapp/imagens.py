@@ -0,0 +1,163 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .banco import inicializar_processo
+from .models import ImagemPendente, ItemConferencia
+
+# Fotos do celular chegam com 4-8 MB; o processamento fica fora da requisição
+IMAGEM_LADO_MAXIMO = getattr(settings, 'IMAGEM_LADO_MAXIMO', 1600)
+MINIATURA_LADO = getattr(settings, 'IMAGEM_MINIATURA_LADO', 240)
+IMAGEM_QUALIDADE = getattr(settings, 'IMAGEM_QUALIDADE', 80)
+IMAGEM_PROCESSOS = getattr(settings, 'IMAGEM_PROCESSOS', os.cpu_count() or 2)
+# Jobs em processamento há mais tempo que isso (worker que morreu) voltam para a fila
+IMAGEM_JOB_PRAZO_SEGUNDOS = getattr(settings, 'IMAGEM_JOB_PRAZO_SEGUNDOS', 10 * 60)
+DIRETORIO_IMAGENS = 'observacoes'
+DIRETORIO_PENDENTES = 'observacoes/pendentes'
+TAMANHO_BLOCO = 1024 * 1024
+
+
+def _formato():
+    return ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+
+
+def _caminho(nome):
+    return Path(settings.MEDIA_ROOT) / nome
+
+
+def _gravar_atomico(destino, escrever):
+    """Grava num temporário do mesmo diretório, faz fsync e renomeia por cima do destino."""
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=destino.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as arquivo:
+            escrever(arquivo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, destino)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+    # Garante que a entrada do diretório também chegou ao disco
+    fd_diretorio = os.open(destino.parent, os.O_RDONLY)
+    try:
+        os.fsync(fd_diretorio)
+    finally:
+        os.close(fd_diretorio)
+
+
+# ========== NA REQUISIÇÃO ==========
+def enfileirar_imagem(item, arquivo):
+    """Grava o upload original em disco (com fsync) e cria o job de processamento.
+
+    Chamar depois do commit do item: dentro da transação, um rollback (ou a
+    nova tentativa do repetir_se_bloqueado) deixaria o arquivo órfão.
+    """
+    nome = f'{DIRETORIO_PENDENTES}/{uuid.uuid4().hex}'
+
+    def escrever(destino):
+        for bloco in arquivo.chunks(TAMANHO_BLOCO):
+            destino.write(bloco)
+
+    _gravar_atomico(_caminho(nome), escrever)
+    return ImagemPendente.objects.create(item=item, arquivo=nome)
+
+
+# ========== NO WORKER ==========
+def processar_imagem(nome_original):
+    """Orienta, reduz e recodifica a foto; devolve (imagem, miniatura) relativos a MEDIA_ROOT.
+
+    O nome é o SHA-256 dos bytes enviados: a mesma foto enviada duas vezes
+    é processada e guardada uma única vez.
+    """
+    original = _caminho(nome_original)
+    resumo = hashlib.sha256()
+    with open(original, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b''):
+            resumo.update(bloco)
+    digest = resumo.hexdigest()
+
+    formato, extensao = _formato()
+    base = f'{DIRETORIO_IMAGENS}/{digest[:2]}/{digest}'
+    nome_imagem, nome_miniatura = f'{base}.{extensao}', f'{base}_mini.{extensao}'
+    if _caminho(nome_imagem).exists() and _caminho(nome_miniatura).exists():
+        return nome_imagem, nome_miniatura
+
+    with Image.open(original) as imagem:
+        imagem.draft('RGB', (IMAGEM_LADO_MAXIMO, IMAGEM_LADO_MAXIMO))  # JPEG: decodifica já reduzido
+        imagem = ImageOps.exif_transpose(imagem)
+        if imagem.mode not in ('RGB', 'L'):
+            imagem = imagem.convert('RGB')
+        imagem.thumbnail((IMAGEM_LADO_MAXIMO, IMAGEM_LADO_MAXIMO))
+        miniatura = imagem.copy()
+        miniatura.thumbnail((MINIATURA_LADO, MINIATURA_LADO))
+
+        for nome, conteudo in ((nome_imagem, imagem), (nome_miniatura, miniatura)):
+            _gravar_atomico(_caminho(nome),
+                            lambda destino, conteudo=conteudo: conteudo.save(destino, formato, quality=IMAGEM_QUALIDADE))
+    return nome_imagem, nome_miniatura
+
+
+def reservar_imagens(limite):
+    """Marca até `limite` jobs pendentes como em processamento; seguro com vários workers.
+
+    Jobs em processamento há mais de IMAGEM_JOB_PRAZO_SEGUNDOS são reservados de novo.
+    """
+    agora = timezone.now()
+    vencidos = Q(status='processando', iniciado_em__lt=agora - timedelta(seconds=IMAGEM_JOB_PRAZO_SEGUNDOS))
+    reservados = []
+    for job in ImagemPendente.objects.filter(Q(status='pendente') | vencidos).order_by('criado_em')[:limite]:
+        # Só reserva se ninguém reservou desde a leitura (mesmo status e início)
+        if ImagemPendente.objects.filter(pk=job.pk, status=job.status, iniciado_em=job.iniciado_em).update(
+                status='processando', iniciado_em=agora):
+            job.status, job.iniciado_em = 'processando', agora
+            reservados.append(job)
+    return reservados
+
+
+def concluir_imagem(job, futuro):
+    try:
+        nome_imagem, nome_miniatura = futuro.result()
+    except Exception as exc:
+        job.status = 'erro'
+        job.erro = str(exc)
+    else:
+        # update() não passa pelo save(): os totais e signals do item não mudam. Só
+        # grava se a foto atual veio de um envio anterior: jobs do mesmo item podem
+        # terminar fora de ordem em workers diferentes
+        ItemConferencia.objects.filter(
+            Q(imagem_enviada_em__isnull=True) | Q(imagem_enviada_em__lt=job.criado_em), pk=job.item_id,
+        ).update(
+            imagem_observacao=nome_imagem, imagem_miniatura=nome_miniatura, imagem_enviada_em=job.criado_em,
+        )
+        _caminho(job.arquivo).unlink(missing_ok=True)
+        job.status = 'concluido'
+        job.erro = None
+    job.processado_em = timezone.now()
+    # Um job vencido pode ter rodado em dois workers: o erro de um (o outro já
+    # apagou o original) não desfaz a conclusão do outro
+    if not ImagemPendente.objects.filter(pk=job.pk).exclude(status='concluido').update(
+            status=job.status, erro=job.erro, processado_em=job.processado_em):
+        job.refresh_from_db(fields=['status', 'erro', 'processado_em'])
+    return job
+
+
+def criar_pool(processos=IMAGEM_PROCESSOS):
+    # O processamento não usa o banco; o initializer só fecha as conexões herdadas do pai
+    return ProcessPoolExecutor(max_workers=processos, initializer=inicializar_processo)
+
+
+def processar_pendentes(pool, limite):
+    """Processa um lote de jobs no pool; devolve os jobs concluídos (ou com erro)."""
+    jobs = reservar_imagens(limite)
+    futuros = [(job, pool.submit(processar_imagem, job.arquivo)) for job in jobs]
+    return [concluir_imagem(job, futuro) for job, futuro in futuros]
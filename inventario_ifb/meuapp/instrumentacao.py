@@ -0,0 +1,106 @@
+import logging
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class ContadorConsultas:
+    """Context manager que registra as consultas SQL executadas no bloco.
+
+    Guarda quantidade, tempo total e o SQL de cada consulta. Como o SQL é
+    capturado antes da substituição dos parâmetros, consultas repetidas com
+    valores diferentes (o padrão N+1) aparecem em `duplicadas`.
+    """
+
+    def __init__(self, using=None):
+        self.aliases = [using] if using else list(connections)
+        self.consultas = []
+        self._pilha = []
+
+    def __enter__(self):
+        for alias in self.aliases:
+            wrapper = connections[alias].execute_wrapper(self._registrar)
+            wrapper.__enter__()
+            self._pilha.append(wrapper)
+        return self
+
+    def __exit__(self, *exc):
+        while self._pilha:
+            self._pilha.pop().__exit__(*exc)
+
+    def _registrar(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append((sql, time.perf_counter() - inicio))
+
+    @property
+    def total(self):
+        return len(self.consultas)
+
+    @property
+    def tempo(self):
+        return sum(duracao for _, duracao in self.consultas)
+
+    @property
+    def duplicadas(self):
+        repetidas = Counter(sql for sql, _ in self.consultas)
+        return {sql: n for sql, n in repetidas.items() if n > 1}
+
+
+class InstrumentacaoConsultasMiddleware:
+    """Registra consultas SQL por requisição e expõe os totais em cabeçalhos.
+
+    Ativado com INSTRUMENTACAO_CONSULTAS = True. Funciona nos dois modos, como
+    o MetricasMiddleware. Em respostas streaming, as consultas feitas durante
+    o envio do corpo não entram na contagem.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTACAO_CONSULTAS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limite_alerta = getattr(settings, 'INSTRUMENTACAO_LIMITE_CONSULTAS', 30)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with ContadorConsultas() as contador:
+            response = self.get_response(request)
+        return self._registrar(request, response, contador)
+
+    async def __acall__(self, request):
+        # Os wrappers vão na thread em que o ORM roda as consultas das views async
+        contador = ContadorConsultas()
+        await sync_to_async(contador.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(contador.__exit__)(None, None, None)
+        return self._registrar(request, response, contador)
+
+    def _registrar(self, request, response, contador):
+        response['X-Consultas-SQL'] = str(contador.total)
+        response['X-Tempo-SQL-ms'] = f'{contador.tempo * 1000:.1f}'
+
+        duplicadas = contador.duplicadas
+        if duplicadas or contador.total > self.limite_alerta:
+            logger.warning(
+                '%s %s: %d consultas (%.1f ms), %d repetidas',
+                request.method, request.path, contador.total, contador.tempo * 1000,
+                sum(duplicadas.values()),
+            )
+            for sql, n in sorted(duplicadas.items(), key=lambda item: -item[1])[:5]:
+                logger.warning('  %dx %s', n, sql[:200])
+        return response
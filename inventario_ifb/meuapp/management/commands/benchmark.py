@@ -0,0 +1,116 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from meuapp.benchmark import CENARIOS, executar_benchmark, medir_concorrencia, medir_scanners_async
+from meuapp.dados_sinteticos import gerar_dados
+
+from .gerar_dados_sinteticos import adicionar_argumentos_escala, escala_das_opcoes
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Mede latência, consultas e memória das telas principais num banco de teste '
+            'com dados sintéticos e imprime o resultado em JSON')
+
+    def add_arguments(self, parser):
+        adicionar_argumentos_escala(parser)
+        parser.add_argument('--repeticoes', type=int, default=20)
+        parser.add_argument('--aquecimento', type=int, default=2,
+                            help='Execuções descartadas antes das medidas')
+        parser.add_argument('--cenario', action='append', choices=CENARIOS,
+                            help='Mede só este cenário (pode repetir)')
+        parser.add_argument('--operadores', type=int, default=0,
+                            help='Também mede N operadores conferindo ao mesmo tempo')
+        parser.add_argument('--itens-por-operador', type=int, default=30)
+        parser.add_argument('--lote', type=int, default=5, help='Itens por envio de cada operador')
+        parser.add_argument('--scanners', type=lambda valor: [int(n) for n in valor.split(',')], default=[],
+                            help='Mede as views async com N scanners simultâneos num processo (ex.: 10,50,100)')
+        parser.add_argument('--itens-por-scanner', type=int, default=10)
+        parser.add_argument('--saida', help='Grava o JSON neste arquivo em vez da saída padrão')
+        parser.add_argument('--banco-atual', action='store_true',
+                            help='Usa o banco configurado, sem gerar dados. Atenção: abre uma '
+                                 'conferência e confere itens nele')
+
+    def handle(self, *args, **options):
+        if options['repeticoes'] < 1:
+            raise CommandError('--repeticoes deve ser pelo menos 1')
+
+        escala = escala_das_opcoes(options)
+        resultado = {
+            'commit': _commit(),
+            'data': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'banco': connection.vendor,
+            'cpus': os.cpu_count(),
+            'semente': None if options['banco_atual'] else options['semente'],
+            'escala': None if options['banco_atual'] else escala,
+        }
+
+        setup_test_environment()
+        # Relatórios e fotos gerados durante a medida não vão para o MEDIA_ROOT real
+        with tempfile.TemporaryDirectory(prefix='benchmark_') as pasta, override_settings(MEDIA_ROOT=pasta):
+            nome_original = connection.settings_dict['NAME']
+            if not options['banco_atual']:
+                if connection.vendor == 'sqlite':
+                    # Em arquivo (não em memória): o PDF grande usa um pool de processos
+                    connection.settings_dict['TEST']['NAME'] = os.path.join(pasta, 'benchmark.sqlite3')
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                if not options['banco_atual']:
+                    inicio = time.monotonic()
+                    resultado['dados'] = gerar_dados(**escala, semente=options['semente'])
+                    resultado['geracao_s'] = round(time.monotonic() - inicio, 2)
+                resultado['cenarios'] = executar_benchmark(
+                    options['repeticoes'], options['aquecimento'], options['cenario'],
+                )
+                if options['scanners']:
+                    resultado['scanners_async'] = [
+                        medir_scanners_async(scanners, options['itens_por_scanner'])
+                        for scanners in options['scanners']
+                    ]
+                if options['operadores']:
+                    resultado['concorrencia'] = medir_concorrencia(
+                        options['operadores'], options['itens_por_operador'], options['lote'],
+                    )
+            finally:
+                if not options['banco_atual']:
+                    connection.creation.destroy_test_db(nome_original, verbosity=0)
+        teardown_test_environment()
+
+        if resource is not None:
+            # ru_maxrss vem em KB no Linux e em bytes no macOS
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            resultado['rss_max_kb'] = rss // 1024 if sys.platform == 'darwin' else rss
+
+        saida = json.dumps(resultado, indent=2, ensure_ascii=False)
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                arquivo.write(saida + '\n')
+            self.stderr.write(self.style.SUCCESS(f'Resultado gravado em {options["saida"]}'))
+        else:
+            self.stdout.write(saida)
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meuapp.conciliacao import atualizar_conciliacao
+from meuapp.models import Setor
+
+
+class Command(BaseCommand):
+    help = 'Atualiza a conciliação (faltantes, inesperados e realocados) de um ano'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ano', type=int)
+        parser.add_argument('--setor', help='Id ou sigla do setor')
+        parser.add_argument('--campus', help='Nome do campus')
+        parser.add_argument('--completo', action='store_true',
+                            help='Recalcula todas as salas do escopo, não só as alteradas')
+
+    def handle(self, *args, **options):
+        setor = None
+        if options['setor']:
+            valor = options['setor']
+            filtro = {'pk': int(valor)} if valor.isdigit() else {'sigla__iexact': valor}
+            setor = Setor.objects.filter(**filtro).first()
+            if setor is None:
+                raise CommandError(f'Setor não encontrado: {valor}')
+
+        inicio = time.monotonic()
+        salas = atualizar_conciliacao(options['ano'], setor=setor, campus=options['campus'],
+                                      completo=options['completo'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(salas)} sala(s) recalculada(s) em {time.monotonic() - inicio:.1f}s'))
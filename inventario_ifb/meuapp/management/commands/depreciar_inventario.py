@@ -0,0 +1,39 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meuapp.depreciacao import DEPRECIACAO_LOTE, depreciar
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o valor depreciado dos itens a partir do valor e da data de aquisição'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--data', help='Data de referência AAAA-MM-DD (padrão: hoje)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Não grava; mostra os totais por setor')
+        parser.add_argument('--lote', type=int, default=DEPRECIACAO_LOTE,
+                            help='Itens lidos e gravados por vez')
+
+    def handle(self, *args, **options):
+        referencia = None
+        if options['data']:
+            try:
+                referencia = date.fromisoformat(options['data'])
+            except ValueError:
+                raise CommandError(f'Data inválida: {options["data"]}')
+
+        inicio = time.monotonic()
+        alterados, totais = depreciar(referencia, simular=options['dry_run'], tamanho_lote=options['lote'])
+        duracao = time.monotonic() - inicio
+
+        if options['dry_run']:
+            self.stdout.write(f'{"Setor":<20} {"Itens":>10} {"Aquisição":>18} {"Depreciado":>18}')
+            for setor, (itens, aquisicao, depreciado) in sorted(totais.items()):
+                self.stdout.write(f'{setor:<20} {itens:>10} {aquisicao:>18,.2f} {depreciado:>18,.2f}')
+            self.stdout.write(self.style.WARNING(f'Simulação: {alterados} itens seriam alterados'))
+
+        itens = sum(total[0] for total in totais.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'{itens} itens calculados, {alterados} alterados em {duracao:.1f}s'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from meuapp.dados_sinteticos import ESCALAS, gerar_dados
+
+
+def adicionar_argumentos_escala(parser):
+    parser.add_argument('--escala', choices=ESCALAS, default='pequena',
+                        help='Volume pré-definido (campi × setores × salas × itens)')
+    for nome, ajuda in (('campi', 'Campi'), ('setores', 'Setores por campus'),
+                        ('salas', 'Salas por setor'), ('itens', 'Itens por sala')):
+        parser.add_argument(f'--{nome}', type=int, help=f'{ajuda} (sobrescreve a escala)')
+    parser.add_argument('--semente', type=int, default=42, help='Mesma semente, mesmos dados')
+
+
+def escala_das_opcoes(options):
+    escala = dict(ESCALAS[options['escala']])
+    escala.update({nome: options[nome] for nome in escala if options.get(nome) is not None})
+    return escala
+
+
+class Command(BaseCommand):
+    help = 'Gera dados sintéticos (campi, setores, salas, itens e conferências) no banco configurado'
+
+    def add_arguments(self, parser):
+        adicionar_argumentos_escala(parser)
+
+    def handle(self, *args, **options):
+        escala = escala_das_opcoes(options)
+        inicio = time.monotonic()
+        totais = gerar_dados(**escala, semente=options['semente'])
+        resumo = ', '.join(f'{valor} {nome}' for nome, valor in totais.items())
+        self.stdout.write(self.style.SUCCESS(f'{resumo} em {time.monotonic() - inicio:.1f}s'))
@@ -0,0 +1,47 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meuapp.etiquetas import FORMATOS_ETIQUETA, SIMBOLOGIAS, gerar_etiquetas_pdf
+from meuapp.models import Sala, Setor
+
+
+class Command(BaseCommand):
+    help = 'Gera o PDF com as folhas de etiquetas (código de barras ou QR) do inventário'
+
+    def add_arguments(self, parser):
+        parser.add_argument('saida', help='Caminho do PDF gerado')
+        parser.add_argument('--sala', type=int, help='Id da sala')
+        parser.add_argument('--setor', help='Id ou sigla do setor')
+        parser.add_argument('--desde', help='Só itens adquiridos a partir dessa data (AAAA-MM-DD)')
+        parser.add_argument('--formato', choices=list(FORMATOS_ETIQUETA), default='a4_3x8')
+        parser.add_argument('--simbologia', choices=list(SIMBOLOGIAS), default='code128')
+        parser.add_argument('--copias', type=int, default=1, help='Cópias de cada etiqueta')
+
+    def handle(self, *args, **options):
+        if options['copias'] < 1:
+            raise CommandError('--copias deve ser maior que zero.')
+
+        filtros = {}
+        if options['sala'] is not None:
+            filtros['sala'] = Sala.objects.filter(pk=options['sala']).first()
+            if filtros['sala'] is None:
+                raise CommandError(f'Sala não encontrada: {options["sala"]}')
+        if options['setor']:
+            valor = options['setor']
+            filtro = {'pk': int(valor)} if valor.isdigit() else {'sigla__iexact': valor}
+            filtros['setor'] = Setor.objects.filter(**filtro).first()
+            if filtros['setor'] is None:
+                raise CommandError(f'Setor não encontrado: {valor}')
+        if options['desde']:
+            try:
+                filtros['desde'] = datetime.date.fromisoformat(options['desde'])
+            except ValueError:
+                raise CommandError(f'Data inválida: {options["desde"]}')
+
+        inicio = time.monotonic()
+        total = gerar_etiquetas_pdf(filtros, options['saida'], options['formato'], options['simbologia'],
+                                    options['copias'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} etiqueta(s) gerada(s) em {options["saida"]} em {time.monotonic() - inicio:.1f}s'))
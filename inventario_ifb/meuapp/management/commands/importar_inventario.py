@@ -0,0 +1,341 @@
+import csv
+import time
+import unicodedata
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from meuapp.contadores import invalidar_contadores
+from meuapp.models import Inventario, Sala, Setor
+from meuapp.movimentacoes import registrar_movimentacoes
+from meuapp.resumos import reconstruir_resumo
+
+# Coluna da entrada -> campo atualizado; colunas ausentes do arquivo não mexem no item existente
+CAMPOS_POR_COLUNA = {
+    'descricao': 'descricao',
+    'tipo': 'tipo',
+    'status': 'status',
+    'valor_aquisicao': 'valor_aquisicao',
+    'data_aquisicao': 'data_aquisicao',
+    'valor_depreciado': 'valor_depreciado',
+    'numero_serie': 'numero_serie',
+    'obs': 'obs',
+    'sala': 'sala_atual',
+}
+
+# Nomes alternativos aceitos no cabeçalho (inclusive os do relatório CSV)
+ALIASES = {
+    'sala_atual': 'sala',
+    'observacoes': 'obs',
+    'observacao': 'obs',
+    'valor_de_aquisicao': 'valor_aquisicao',
+    'data_de_aquisicao': 'data_aquisicao',
+    'numero_de_serie': 'numero_serie',
+}
+
+TIPOS = {valor for valor, _ in Inventario.TIPO_CHOICES}
+STATUS = {valor for valor, _ in Inventario.STATUS_CHOICES}
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    chave = '_'.join(texto.strip().lower().split())
+    return ALIASES.get(chave, chave)
+
+
+# Os leitores devolvem ((aba, número da linha), linha); no CSV a aba é None
+
+def ler_csv(caminho):
+    with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+        leitor = csv.reader(arquivo)
+        cabecalho = [normalizar(c) for c in next(leitor, [])]
+        for linha in leitor:
+            # line_num conta as quebras dentro de campos entre aspas
+            yield (None, leitor.line_num), dict(zip(cabecalho, linha))
+
+
+def ler_xlsx(caminho):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        # Cada aba (ex.: uma por setor, como no relatório XLSX) é lida em sequência
+        for ws in wb.worksheets:
+            linhas = ws.iter_rows(values_only=True)
+            cabecalho = [normalizar(c) for c in next(linhas, ())]
+            for numero_linha, linha in enumerate(linhas, start=2):
+                if any(valor not in (None, '') for valor in linha):
+                    yield (ws.title, numero_linha), dict(zip(cabecalho, linha))
+    finally:
+        wb.close()
+
+
+def texto(valor):
+    return '' if valor is None else str(valor).strip()
+
+
+def numero(valor):
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    valor = str(valor).strip()
+    if ',' in valor:
+        valor = valor.replace('.', '').replace(',', '.')
+    return float(valor)
+
+
+def data(valor):
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    valor = str(valor).strip()
+    for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(valor, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(valor)
+
+
+def campos_atualizados(linha):
+    """Campos que a linha traz no cabeçalho, mais o atualizado_em."""
+    return tuple(campo for coluna, campo in CAMPOS_POR_COLUNA.items() if coluna in linha) + ('atualizado_em',)
+
+
+def numero_sala(valor):
+    valor = texto(valor)
+    if valor.lower().startswith('sala'):
+        valor = valor[4:].strip()
+    return int(float(valor)) if valor else None
+
+
+class Command(BaseCommand):
+    help = 'Importa (insere ou atualiza pelo código) itens de inventário a partir de CSV ou XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Arquivo .csv ou .xlsx')
+        parser.add_argument('--lote', type=int, default=2000,
+                            help='Linhas gravadas por transação')
+        parser.add_argument('--rejeitados', default=None,
+                            help='Arquivo CSV com as linhas rejeitadas (padrão: <arquivo>.rejeitados.csv)')
+        parser.add_argument('--criar-salas', action='store_true',
+                            help='Cria setores e salas que ainda não existem')
+
+    def handle(self, *args, **options):
+        caminho = Path(options['arquivo'])
+        if not caminho.exists():
+            raise CommandError(f'Arquivo "{caminho}" não encontrado.')
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+
+        if caminho.suffix.lower() == '.xlsx':
+            linhas = ler_xlsx(caminho)
+        elif caminho.suffix.lower() == '.csv':
+            linhas = ler_csv(caminho)
+        else:
+            raise CommandError('Formato não suportado: use .csv ou .xlsx.')
+
+        self.criar_salas = options['criar_salas']
+        self.carregar_salas()
+
+        rejeitados_caminho = Path(options['rejeitados'] or f'{caminho}.rejeitados.csv')
+        self.rejeitados = 0
+        self.rejeitados_writer = None
+        self.rejeitados_arquivo = None
+
+        inicio = time.monotonic()
+        total = gravados = 0
+        lote = []
+        try:
+            for posicao, linha in linhas:
+                total += 1
+                lote.append((posicao, linha))
+                if len(lote) >= options['lote']:
+                    gravados += self.processar_lote(lote, rejeitados_caminho)
+                    lote = []
+                    self.progresso(total, inicio)
+            if lote:
+                gravados += self.processar_lote(lote, rejeitados_caminho)
+        finally:
+            if self.rejeitados_arquivo:
+                self.rejeitados_arquivo.close()
+            # bulk_create não dispara signals; o dashboard recalcula na próxima leitura
+            invalidar_contadores()
+            reconstruir_resumo()
+
+        duracao = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} linhas lidas, {gravados} gravadas, {self.rejeitados} rejeitadas '
+            f'em {duracao:.1f}s ({total / duracao if duracao else total:.0f} linhas/s)'))
+        if self.rejeitados:
+            self.stdout.write(self.style.WARNING(f'Linhas rejeitadas em {rejeitados_caminho}'))
+
+    def progresso(self, total, inicio):
+        duracao = time.monotonic() - inicio
+        self.stdout.write(f'{total} linhas ({total / duracao if duracao else total:.0f} linhas/s)')
+
+    # ========== TABELA DE SALAS ==========
+    def carregar_salas(self):
+        """Carrega em memória (sigla do setor, número) -> id da sala, e número -> id quando único."""
+        self.setores = {sigla.lower(): pk for pk, sigla in Setor.objects.values_list('id', 'sigla')}
+        self.salas = {}
+        self.salas_por_numero = {}
+        for pk, numero_, sigla in Sala.objects.values_list('id', 'numero', 'setor__sigla'):
+            self.salas[(sigla.lower(), numero_)] = pk
+            # Número repetido em setores diferentes fica ambíguo sem o setor
+            self.salas_por_numero[numero_] = None if numero_ in self.salas_por_numero else pk
+
+    def resolver_salas(self, validas):
+        """Cria de uma vez os setores e salas que faltam no lote (com --criar-salas)."""
+        faltando = {}
+        for _, linha, _ in validas:
+            sigla, numero_ = linha['_setor'], linha['_sala']
+            if numero_ is not None and sigla and (sigla.lower(), numero_) not in self.salas:
+                faltando[(sigla.lower(), numero_)] = linha
+        if not faltando:
+            return
+
+        novos_setores = {}
+        for (sigla, _), linha in faltando.items():
+            if sigla not in self.setores and sigla not in novos_setores:
+                novos_setores[sigla] = Setor(
+                    sigla=linha['_setor'],
+                    nome=texto(linha.get('setor_nome')) or linha['_setor'],
+                    campus=texto(linha.get('campus')),
+                )
+        for setor in Setor.objects.bulk_create(novos_setores.values()):
+            self.setores[setor.sigla.lower()] = setor.pk
+
+        novas = Sala.objects.bulk_create([
+            Sala(numero=numero_, setor_id=self.setores[sigla]) for sigla, numero_ in faltando
+        ])
+        for sala, chave in zip(novas, faltando):
+            self.salas[chave] = sala.pk
+            self.salas_por_numero[sala.numero] = None if sala.numero in self.salas_por_numero else sala.pk
+
+    # ========== LOTES ==========
+    def validar(self, linha):
+        codigo = texto(linha.get('codigo'))
+        if not codigo:
+            raise ValueError('código vazio')
+        if len(codigo) > 50:
+            raise ValueError('código com mais de 50 caracteres')
+        descricao = texto(linha.get('descricao'))
+        if not descricao:
+            raise ValueError('descrição vazia')
+        tipo = texto(linha.get('tipo')).lower()
+        if tipo not in TIPOS:
+            raise ValueError(f'tipo inválido "{tipo}"')
+        status = texto(linha.get('status')).lower() or 'bom'
+        if status not in STATUS:
+            raise ValueError(f'status inválido "{status}"')
+        campos = {'codigo': codigo, 'descricao': descricao, 'tipo': tipo}
+        if 'status' in linha:
+            campos['status'] = status
+        try:
+            for coluna in ('valor_aquisicao', 'valor_depreciado'):
+                if coluna in linha:
+                    campos[coluna] = numero(linha[coluna])
+        except ValueError:
+            raise ValueError('valor numérico inválido')
+        if 'data_aquisicao' in linha:
+            try:
+                campos['data_aquisicao'] = data(linha['data_aquisicao'])
+            except ValueError:
+                raise ValueError(f'data de aquisição inválida "{linha["data_aquisicao"]}"')
+        try:
+            linha['_sala'] = numero_sala(linha.get('sala'))
+        except ValueError:
+            raise ValueError(f'sala inválida "{linha.get("sala")}"')
+        linha['_setor'] = texto(linha.get('setor'))
+        for coluna in ('numero_serie', 'obs'):
+            if coluna in linha:
+                campos[coluna] = texto(linha[coluna]) or None
+
+        return Inventario(**campos)
+
+    def sala_id(self, linha):
+        numero_, sigla = linha['_sala'], linha['_setor']
+        if numero_ is None:
+            return None
+        if sigla:
+            pk = self.salas.get((sigla.lower(), numero_))
+            if pk is None:
+                raise ValueError(f'sala {numero_} do setor "{sigla}" não cadastrada')
+            return pk
+        pk = self.salas_por_numero.get(numero_)
+        if pk is None:
+            raise ValueError(f'sala {numero_} não cadastrada ou ambígua (informe o setor)')
+        return pk
+
+    def processar_lote(self, lote, rejeitados_caminho):
+        validas = []
+        for posicao, linha in lote:
+            try:
+                validas.append((posicao, linha, self.validar(linha)))
+            except ValueError as exc:
+                self.rejeitar(rejeitados_caminho, posicao, linha, exc)
+
+        with transaction.atomic():
+            if self.criar_salas:
+                self.resolver_salas(validas)
+
+            # O último registro de um mesmo código dentro do lote prevalece
+            objetos = {}
+            campos = {}
+            for posicao, linha, inventario in validas:
+                if 'sala' in linha:
+                    try:
+                        inventario.sala_atual_id = self.sala_id(linha)
+                    except ValueError as exc:
+                        self.rejeitar(rejeitados_caminho, posicao, linha, exc)
+                        continue
+                objetos[inventario.codigo] = inventario
+                campos[inventario.codigo] = campos_atualizados(linha)
+
+            # Salas antes da importação, para o histórico de movimentações
+            anteriores = dict(Inventario.objects.filter(codigo__in=objetos).order_by()
+                              .values_list('codigo', 'sala_atual_id'))
+            # Um upsert por conjunto de colunas (as abas do XLSX podem ter cabeçalhos diferentes)
+            por_campos = defaultdict(list)
+            for codigo, inventario in objetos.items():
+                if 'sala_atual' not in campos[codigo]:
+                    inventario.sala_atual_id = anteriores.get(codigo)
+                por_campos[campos[codigo]].append(inventario)
+            for update_fields, grupo in por_campos.items():
+                Inventario.objects.bulk_create(
+                    grupo,
+                    update_conflicts=True,
+                    unique_fields=['codigo'],
+                    update_fields=update_fields,
+                )
+            sem_pk = [codigo for codigo, inventario in objetos.items() if inventario.pk is None]
+            if sem_pk:
+                for codigo, pk in Inventario.objects.filter(codigo__in=sem_pk).values_list('codigo', 'id'):
+                    objetos[codigo].pk = pk
+            registrar_movimentacoes(
+                [(inventario.pk, anteriores.get(codigo), inventario.sala_atual_id)
+                 for codigo, inventario in objetos.items()],
+                'importacao',
+            )
+        return len(objetos)
+
+    def rejeitar(self, caminho, posicao, linha, erro):
+        aba, numero_linha = posicao
+        dados = {k: v for k, v in linha.items() if not k.startswith('_')}
+        if self.rejeitados_writer is None:
+            # Mesmas colunas da entrada, para corrigir e reimportar o arquivo; no XLSX, com a aba
+            colunas = ['linha', 'erro', *dados] if aba is None else ['aba', 'linha', 'erro', *dados]
+            self.rejeitados_arquivo = open(caminho, 'w', newline='', encoding='utf-8')
+            self.rejeitados_writer = csv.DictWriter(
+                self.rejeitados_arquivo, fieldnames=colunas, extrasaction='ignore')
+            self.rejeitados_writer.writeheader()
+        self.rejeitados_writer.writerow({'aba': aba, 'linha': numero_linha, 'erro': str(erro), **dados})
+        self.rejeitados += 1
@@ -0,0 +1,52 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from meuapp.busca import otimizar_indice_busca
+
+
+class Command(BaseCommand):
+    help = ('Manutenção do SQLite: checkpoint do WAL, ANALYZE e, opcionalmente, VACUUM. '
+            'Agende fora do horário de conferência, ex.: no cron diariamente e com --vacuum '
+            'uma vez por semana')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacuum', action='store_true',
+                            help='Reescreve o arquivo do banco (bloqueia as escritas enquanto roda)')
+
+    def _tamanho(self):
+        nome = connection.settings_dict['NAME']
+        return sum(os.path.getsize(f'{nome}{sufixo}') for sufixo in ('', '-wal')
+                   if os.path.exists(f'{nome}{sufixo}'))
+
+    def _executar(self, descricao, sql):
+        inicio = time.monotonic()
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            resultado = cursor.fetchall()
+        self.stdout.write(f'{descricao}: {time.monotonic() - inicio:.1f}s')
+        return resultado
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('A manutenção é só para SQLite; em outros bancos use as rotinas do próprio banco.')
+
+        antes = self._tamanho()
+        # Estatísticas do planejador; também alimentam as contagens aproximadas (sqlite_stat1)
+        self._executar('ANALYZE', 'ANALYZE')
+        inicio = time.monotonic()
+        otimizar_indice_busca()
+        self.stdout.write(f'Índice de busca otimizado: {time.monotonic() - inicio:.1f}s')
+        if options['vacuum']:
+            self._executar('VACUUM', 'VACUUM')
+        # Por último: o VACUUM também passa pelo WAL
+        ocupado, paginas, copiadas = self._executar('Checkpoint do WAL', 'PRAGMA wal_checkpoint(TRUNCATE)')[0]
+        if ocupado:
+            self.stdout.write(self.style.WARNING(
+                f'Checkpoint parcial: {copiadas} de {paginas} páginas (havia leitores ativos)'))
+
+        depois = self._tamanho()
+        self.stdout.write(self.style.SUCCESS(
+            f'Banco + WAL: {antes / 1024 / 1024:.1f} MB -> {depois / 1024 / 1024:.1f} MB'))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from meuapp.imagens import IMAGEM_PROCESSOS, criar_pool, processar_pendentes
+
+
+class Command(BaseCommand):
+    help = 'Worker que reduz, recodifica e gera miniaturas das fotos das conferências'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true',
+                            help='Processa as imagens pendentes e encerra')
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='Segundos de espera quando não há imagens pendentes')
+        parser.add_argument('--processos', type=int, default=IMAGEM_PROCESSOS)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Aguardando imagens...')
+        with criar_pool(options['processos']) as pool:
+            while True:
+                inicio = time.monotonic()
+                jobs = processar_pendentes(pool, options['processos'] * 4)
+                if not jobs:
+                    if options['uma_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                erros = [job for job in jobs if job.status == 'erro']
+                self.stdout.write(self.style.SUCCESS(
+                    f'{len(jobs) - len(erros)} imagem(ns) em {time.monotonic() - inicio:.1f}s'))
+                for job in erros:
+                    self.stdout.write(self.style.ERROR(f'{job}: {job.erro}'))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from meuapp.metricas import METRICAS_DIRETORIO, gravar
+from meuapp.relatorios import processar_job, reservar_proximo_job
+
+
+class Command(BaseCommand):
+    help = 'Worker que gera em segundo plano os relatórios PDF solicitados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true',
+                            help='Processa os jobs pendentes e encerra')
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='Segundos de espera quando não há jobs pendentes')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Aguardando relatórios...')
+        while True:
+            job = reservar_proximo_job()
+            if job is None:
+                if options['uma_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            inicio = time.monotonic()
+            job = processar_job(job)
+            duracao = time.monotonic() - inicio
+            if METRICAS_DIRETORIO:
+                # O worker não passa pelo middleware: a duração do relatório vai para o /metricas/ por aqui
+                gravar()
+            if job.status == 'concluido':
+                self.stdout.write(self.style.SUCCESS(
+                    f'{job}: {job.total_itens} itens em {duracao:.1f}s'))
+            else:
+                self.stdout.write(self.style.ERROR(f'{job}: {job.erro}'))
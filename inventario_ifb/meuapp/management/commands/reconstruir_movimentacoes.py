@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meuapp.movimentacoes import MOVIMENTACOES_LOTE, reconstruir_de_conferencias
+
+
+class Command(BaseCommand):
+    help = 'Cria o histórico de movimentações a partir dos itens conferidos (pode ser executado de novo)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=MOVIMENTACOES_LOTE,
+                            help='Itens conferidos lidos e movimentações gravadas por vez')
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+
+        inicio = time.monotonic()
+        criadas = reconstruir_de_conferencias(options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{criadas} movimentação(ões) criada(s) em {time.monotonic() - inicio:.1f}s'))
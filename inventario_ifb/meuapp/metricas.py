@@ -0,0 +1,338 @@
+import glob
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Cada thread soma nos próprios dicionários, sem lock; a leitura das métricas
+# junta os de todas as threads do processo. Com vários workers, cada processo
+# grava seus totais em METRICAS_DIRETORIO a cada METRICAS_INTERVALO_GRAVACAO
+# segundos e /metricas/ soma os arquivos de todos; os de processos encerrados
+# são incorporados a ARQUIVO_ACUMULADO.
+METRICAS_ATIVAS = getattr(settings, 'METRICAS_ATIVAS', True)
+METRICAS_TOKEN = getattr(settings, 'METRICAS_TOKEN', None)
+METRICAS_DIRETORIO = getattr(settings, 'METRICAS_DIRETORIO', None)
+METRICAS_INTERVALO_GRAVACAO = getattr(settings, 'METRICAS_INTERVALO_GRAVACAO', 10)
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CONSULTAS = (1, 2, 3, 5, 8, 13, 20, 50, 100)
+BUCKETS_RELATORIO = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600)
+
+# nome -> (tipo, descrição, buckets)
+METRICAS = {
+    'inventario_http_requisicao_segundos': (
+        'histogram', 'Duração das requisições por view', BUCKETS_SEGUNDOS),
+    'inventario_http_requisicoes_total': (
+        'counter', 'Requisições por view, método e status HTTP', None),
+    'inventario_sql_consultas': (
+        'histogram', 'Consultas SQL por requisição, por view', BUCKETS_CONSULTAS),
+    'inventario_sql_segundos': (
+        'histogram', 'Tempo gasto em SQL por requisição, por view', BUCKETS_SEGUNDOS),
+    'inventario_relatorio_segundos': (
+        'histogram', 'Duração da geração de relatórios por formato', BUCKETS_RELATORIO),
+    'inventario_relatorio_linhas_total': (
+        'counter', 'Itens exportados nos relatórios por formato', None),
+    'inventario_conferencia_leituras_total': (
+        'counter', 'Códigos lidos por conferência (rate() * 60 = leituras por minuto)', None),
+}
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+ARQUIVO_ACUMULADO = 'acumulado.json'
+
+
+# ========== REGISTRO ==========
+class _Registro:
+    """Totais de uma thread: (nome, rótulos) -> valor ou [contagem por bucket..., +Inf, soma]."""
+
+    def __init__(self):
+        self.contadores = {}
+        self.histogramas = {}
+
+
+_local = threading.local()
+_registros = []  # list.append é atômico; cada registro só é alterado pela sua thread
+_ultima_gravacao = 0.0
+_processo = (None, None)  # (pid, nome do arquivo): refeito num processo filho após fork
+
+
+def _registro():
+    registro = getattr(_local, 'registro', None)
+    if registro is None:
+        registro = _local.registro = _Registro()
+        _registros.append(registro)
+    return registro
+
+
+def incrementar(nome, valor=1, **rotulos):
+    contadores = _registro().contadores
+    chave = (nome, tuple(rotulos.items()))
+    contadores[chave] = contadores.get(chave, 0) + valor
+
+
+def observar(nome, valor, **rotulos):
+    histogramas = _registro().histogramas
+    chave = (nome, tuple(rotulos.items()))
+    buckets = METRICAS[nome][2]
+    valores = histogramas.get(chave)
+    if valores is None:
+        valores = histogramas[chave] = [0] * (len(buckets) + 1) + [0.0]
+    valores[bisect_left(buckets, valor)] += 1
+    valores[-1] += valor
+
+
+def registrar_relatorio(formato, segundos, linhas):
+    observar('inventario_relatorio_segundos', segundos, formato=formato)
+    incrementar('inventario_relatorio_linhas_total', linhas, formato=formato)
+
+
+def registrar_leituras(conferencia_id, quantidade=1):
+    incrementar('inventario_conferencia_leituras_total', quantidade, conferencia=str(conferencia_id))
+
+
+# ========== AGREGAÇÃO ==========
+def _somar(destino, chave, valores):
+    atual = destino.get(chave)
+    if atual is None:
+        destino[chave] = list(valores) if isinstance(valores, list) else valores
+    elif isinstance(atual, list):
+        for indice, valor in enumerate(valores):
+            atual[indice] += valor
+    else:
+        destino[chave] = atual + valores
+
+
+def coletar():
+    """Totais deste processo: soma dos registros de todas as threads."""
+    contadores, histogramas = {}, {}
+    for registro in list(_registros):
+        # list(dict.items()) copia sem liberar o GIL, mesmo com a thread dona escrevendo
+        for chave, valor in list(registro.contadores.items()):
+            _somar(contadores, chave, valor)
+        for chave, valores in list(registro.histogramas.items()):
+            _somar(histogramas, chave, list(valores))
+    return contadores, histogramas
+
+
+def _serializar(totais):
+    return [[[nome, [list(rotulo) for rotulo in rotulos], valor] for (nome, rotulos), valor in grupo.items()]
+            for grupo in totais]
+
+
+def _desserializar(dados, totais):
+    for grupo, itens in zip(totais, dados):
+        for nome, rotulos, valor in itens:
+            if nome in METRICAS:
+                _somar(grupo, (nome, tuple(tuple(rotulo) for rotulo in rotulos)), valor)
+
+
+def _arquivo_do_processo():
+    """Arquivo deste processo: pid + id único, para um pid reaproveitado não sobrescrever outro."""
+    global _processo
+    pid = os.getpid()
+    if _processo[0] != pid:
+        _processo = (pid, f'processo-{pid}-{uuid.uuid4().hex}.json')
+    return os.path.join(METRICAS_DIRETORIO, _processo[1])
+
+
+def _gravar_json(caminho, totais):
+    descritor, temporario = tempfile.mkstemp(dir=METRICAS_DIRETORIO, suffix='.tmp')
+    with os.fdopen(descritor, 'w') as arquivo:
+        json.dump(_serializar(totais), arquivo)
+    os.replace(temporario, caminho)
+
+
+def _ler_json(caminho, totais):
+    try:
+        with open(caminho) as arquivo:
+            _desserializar(json.load(arquivo), totais)
+    except (OSError, ValueError):
+        pass
+
+
+def _encerrado(caminho):
+    try:
+        os.kill(int(os.path.basename(caminho).split('-')[1]), 0)
+    except ProcessLookupError:
+        return True
+    except (OSError, ValueError, IndexError):
+        pass
+    return False
+
+
+def gravar():
+    """Grava os totais deste processo em METRICAS_DIRETORIO (troca atômica do arquivo)."""
+    global _ultima_gravacao
+    _ultima_gravacao = time.monotonic()
+    os.makedirs(METRICAS_DIRETORIO, exist_ok=True)
+    _gravar_json(_arquivo_do_processo(), coletar())
+
+
+def gravar_se_preciso():
+    if METRICAS_DIRETORIO and time.monotonic() - _ultima_gravacao >= METRICAS_INTERVALO_GRAVACAO:
+        gravar()
+
+
+def totais_de_todos():
+    """Totais de todos os processos que gravaram em METRICAS_DIRETORIO, ou só deste sem a pasta.
+
+    Os arquivos de processos encerrados são somados ao acumulado e apagados,
+    para os contadores não voltarem para trás nem a pasta crescer sem limite.
+    """
+    if not METRICAS_DIRETORIO:
+        return coletar()
+    import fcntl
+
+    gravar()
+    acumulado = os.path.join(METRICAS_DIRETORIO, ARQUIVO_ACUMULADO)
+    # Leitura e compactação exclusivas: outra leitura simultânea contaria os encerrados duas vezes
+    with open(os.path.join(METRICAS_DIRETORIO, '.trava'), 'w') as trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+        processos = glob.glob(os.path.join(METRICAS_DIRETORIO, 'processo-*.json'))
+        encerrados = [caminho for caminho in processos if _encerrado(caminho)]
+        if encerrados:
+            totais = ({}, {})
+            for caminho in [acumulado, *encerrados]:
+                _ler_json(caminho, totais)
+            _gravar_json(acumulado, totais)
+            for caminho in encerrados:
+                os.remove(caminho)
+
+        totais = ({}, {})
+        for caminho in [acumulado, *(caminho for caminho in processos if caminho not in encerrados)]:
+            _ler_json(caminho, totais)
+    return totais
+
+
+# ========== EXPOSIÇÃO ==========
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(rotulos, extra=()):
+    pares = [*rotulos, *extra]
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares) + '}'
+
+
+def exportar(totais=None):
+    """Texto no formato de exposição do Prometheus."""
+    contadores, histogramas = totais or totais_de_todos()
+    por_metrica = {}
+    for (nome, rotulos), valor in [*contadores.items(), *histogramas.items()]:
+        por_metrica.setdefault(nome, []).append((rotulos, valor))
+
+    linhas = []
+    for nome, (tipo, descricao, buckets) in METRICAS.items():
+        linhas.append(f'# HELP {nome} {descricao}')
+        linhas.append(f'# TYPE {nome} {tipo}')
+        for rotulos, valor in sorted(por_metrica.get(nome, []), key=lambda item: str(item[0])):
+            if tipo == 'counter':
+                linhas.append(f'{nome}{_rotulos(rotulos)} {valor}')
+                continue
+            acumulado = 0
+            for limite, quantidade in zip([*buckets, '+Inf'], valor):
+                acumulado += quantidade
+                linhas.append(f'{nome}_bucket{_rotulos(rotulos, [("le", limite)])} {acumulado}')
+            linhas.append(f'{nome}_sum{_rotulos(rotulos)} {valor[-1]}')
+            linhas.append(f'{nome}_count{_rotulos(rotulos)} {acumulado}')
+    return '\n'.join(linhas) + '\n'
+
+
+def autorizado(request):
+    """Token do Prometheus (Authorization: Bearer <METRICAS_TOKEN>) ou usuário staff."""
+    if METRICAS_TOKEN:
+        cabecalho = request.headers.get('Authorization', '')
+        if hmac.compare_digest(cabecalho.encode(), f'Bearer {METRICAS_TOKEN}'.encode()):
+            return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+# ========== MIDDLEWARE ==========
+class _ContadorSql:
+    """execute_wrapper que só soma quantidade e tempo (sem guardar o SQL, como o ContadorConsultas)."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.tempo += time.perf_counter() - inicio
+
+
+class MetricasMiddleware:
+    """Latência, status e consultas SQL de cada requisição, por nome da URL.
+
+    Desativado com METRICAS_ATIVAS = False. Funciona nos dois modos, para não
+    obrigar o Django a adaptar as views async do scanner sob ASGI. Como no
+    InstrumentacaoConsultasMiddleware, o corpo de respostas streaming fica
+    fora da medição.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not METRICAS_ATIVAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        contador = _ContadorSql()
+        inicio = time.perf_counter()
+        with self._contar_sql(contador):
+            response = self.get_response(request)
+        self._registrar(request, response, time.perf_counter() - inicio, contador)
+        return response
+
+    async def __acall__(self, request):
+        contador = _ContadorSql()
+        inicio = time.perf_counter()
+        # As conexões são por thread: os wrappers vão na thread em que o ORM
+        # roda as consultas das views async (a de sync_to_async)
+        pilha = await sync_to_async(self._contar_sql)(contador)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(pilha.close)()
+        self._registrar(request, response, time.perf_counter() - inicio, contador)
+        return response
+
+    @staticmethod
+    def _contar_sql(contador):
+        pilha = ExitStack()
+        for alias in connections:
+            pilha.enter_context(connections[alias].execute_wrapper(contador))
+        return pilha
+
+    @staticmethod
+    def _registrar(request, response, duracao, contador):
+        if request.resolver_match:
+            view = request.resolver_match.view_name
+        elif request.path.startswith(settings.STATIC_URL or '/static/'):
+            view = 'estaticos'
+        else:
+            view = 'nao_resolvida'
+        observar('inventario_http_requisicao_segundos', duracao, view=view)
+        incrementar('inventario_http_requisicoes_total', view=view, metodo=request.method,
+                    status=response.status_code)
+        observar('inventario_sql_consultas', contador.consultas, view=view)
+        observar('inventario_sql_segundos', contador.tempo, view=view)
+        gravar_se_preciso()
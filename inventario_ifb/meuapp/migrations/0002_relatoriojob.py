@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventario',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='RelatorioJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluido', 'Concluído'), ('erro', 'Erro')], default='pendente', max_length=20)),
+                ('chave', models.CharField(max_length=64, verbose_name='Chave dos filtros')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Versão dos dados')),
+                ('filtros', models.JSONField(blank=True, default=dict)),
+                ('arquivo', models.FileField(blank=True, null=True, upload_to='relatorios/')),
+                ('total_itens', models.IntegerField(default=0)),
+                ('erro', models.TextField(blank=True, null=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('concluido_em', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Relatórios',
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['chave', 'fingerprint', 'status'], name='meuapp_rela_chave_8d3469_idx'), models.Index(fields=['status', 'criado_em'], name='meuapp_rela_status_ce3d81_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0002_relatoriojob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SincronizacaoScanner',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=64, unique=True)),
+                ('resposta', models.JSONField(default=dict)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('conferencia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sincronizacoes', to='meuapp.conferencia')),
+            ],
+            options={
+                'verbose_name_plural': 'Sincronizações do Scanner',
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:10
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def calcular_totais(apps, schema_editor):
+    Conferencia = apps.get_model('meuapp', 'Conferencia')
+    totais = Conferencia.objects.annotate(
+        n_itens=Count('itens'),
+        n_bom=Count('itens', filter=Q(itens__status_conferido='bom')),
+        n_danificado=Count('itens', filter=Q(itens__status_conferido='danificado')),
+        n_inutilizado=Count('itens', filter=Q(itens__status_conferido='inutilizado')),
+    ).filter(n_itens__gt=0)
+    for conferencia in totais:
+        Conferencia.objects.filter(pk=conferencia.pk).update(
+            total_itens=conferencia.n_itens,
+            total_bom=conferencia.n_bom,
+            total_danificado=conferencia.n_danificado,
+            total_inutilizado=conferencia.n_inutilizado,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0003_sincronizacaoscanner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conferencia',
+            name='total_bom',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conferencia',
+            name='total_danificado',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conferencia',
+            name='total_inutilizado',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conferencia',
+            name='total_itens',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_totais, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:16
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0004_conferencia_totais'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventario',
+            index=models.Index(django.db.models.functions.text.Upper('codigo'), name='inventario_codigo_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def preencher_sala_anterior(apps, schema_editor):
+    # Sem histórico, supõe que os itens já conferidos estavam na sala da conferência
+    ItemConferencia = apps.get_model('meuapp', 'ItemConferencia')
+    Conferencia = apps.get_model('meuapp', 'Conferencia')
+    ItemConferencia.objects.update(sala_anterior=Subquery(
+        Conferencia.objects.filter(pk=OuterRef('conferencia_id')).values('sala_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0005_inventario_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conferencia',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='itemconferencia',
+            name='sala_anterior',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='meuapp.sala'),
+        ),
+        migrations.CreateModel(
+            name='ConciliacaoItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.IntegerField()),
+                ('situacao', models.CharField(choices=[('encontrado', 'Encontrado'), ('faltante', 'Não encontrado'), ('realocado', 'Encontrado em outra sala'), ('inesperado', 'Inesperado')], max_length=20)),
+                ('inventario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='meuapp.inventario')),
+                ('sala', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='meuapp.sala')),
+                ('sala_relacionada', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='meuapp.sala')),
+            ],
+            options={
+                'verbose_name_plural': 'Conciliações por Item',
+                'indexes': [models.Index(fields=['ano', 'sala', 'situacao'], name='meuapp_conc_ano_b7192d_idx'), models.Index(fields=['ano', 'inventario'], name='meuapp_conc_ano_342ebf_idx'), models.Index(fields=['ano', 'sala_relacionada'], name='meuapp_conc_ano_b74049_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConciliacaoSala',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ano', models.IntegerField()),
+                ('conferencias', models.IntegerField(default=0)),
+                ('esperados', models.IntegerField(default=0)),
+                ('encontrados', models.IntegerField(default=0)),
+                ('faltantes', models.IntegerField(default=0)),
+                ('realocados', models.IntegerField(default=0)),
+                ('inesperados', models.IntegerField(default=0)),
+                ('calculado_em', models.DateTimeField()),
+                ('sala', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conciliacoes', to='meuapp.sala')),
+            ],
+            options={
+                'verbose_name_plural': 'Conciliações por Sala',
+                'indexes': [models.Index(fields=['ano', 'calculado_em'], name='meuapp_conc_ano_4228a0_idx')],
+                'unique_together': {('sala', 'ano')},
+            },
+        ),
+        migrations.RunPython(preencher_sala_anterior, migrations.RunPython.noop),
+    ]
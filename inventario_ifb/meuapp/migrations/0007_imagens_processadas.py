@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0006_conciliacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemconferencia',
+            name='imagem_miniatura',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='observacoes/'),
+        ),
+        migrations.CreateModel(
+            name='ImagemPendente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('arquivo', models.CharField(max_length=255, verbose_name='Upload original')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluido', 'Concluído'), ('erro', 'Erro')], default='pendente', max_length=20)),
+                ('erro', models.TextField(blank=True, null=True)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('processado_em', models.DateTimeField(blank=True, null=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='imagens_pendentes', to='meuapp.itemconferencia')),
+            ],
+            options={
+                'verbose_name_plural': 'Imagens Pendentes',
+                'indexes': [models.Index(fields=['status', 'criado_em'], name='meuapp_imag_status_1b69c4_idx')],
+            },
+        ),
+    ]
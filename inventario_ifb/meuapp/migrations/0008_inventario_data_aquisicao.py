@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0007_imagens_processadas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventario',
+            name='data_aquisicao',
+            field=models.DateField(blank=True, null=True, verbose_name='Data de Aquisição'),
+        ),
+    ]
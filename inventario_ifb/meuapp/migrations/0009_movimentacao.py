@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0008_inventario_data_aquisicao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Movimentacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateTimeField()),
+                ('origem', models.CharField(choices=[('cadastro', 'Cadastro/edição'), ('conferencia', 'Conferência'), ('admin', 'Admin'), ('importacao', 'Importação')], max_length=20)),
+                ('conferencia', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='meuapp.conferencia')),
+                ('inventario', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='movimentacoes', to='meuapp.inventario')),
+                ('sala', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='meuapp.sala')),
+                ('sala_anterior', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='meuapp.sala')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Movimentações',
+                'ordering': ['-data', '-id'],
+                'indexes': [models.Index(fields=['inventario', 'data', 'sala'], name='movimentacao_item_data_idx'), models.Index(fields=['sala', 'data', 'inventario'], name='movimentacao_sala_data_idx')],
+            },
+        ),
+    ]
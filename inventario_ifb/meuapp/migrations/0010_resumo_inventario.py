@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0009_movimentacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('mobiliario', 'Mobiliário'), ('eletrodomestico', 'Eletrodoméstico'), ('informatica', 'Informática'), ('escritorio', 'Escritório'), ('outros', 'Outros')], max_length=20)),
+                ('status', models.CharField(choices=[('bom', 'Bom'), ('danificado', 'Danificado'), ('inutilizado', 'Inutilizado')], max_length=20)),
+                ('quantidade', models.IntegerField(default=0)),
+                ('valor_aquisicao', models.FloatField(default=0)),
+                ('valor_depreciado', models.FloatField(default=0)),
+                ('setor', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='meuapp.setor')),
+            ],
+            options={
+                'verbose_name_plural': 'Resumos do Inventário',
+                'constraints': [models.UniqueConstraint(fields=('setor', 'tipo', 'status'), name='resumo_setor_tipo_status_unico'), models.UniqueConstraint(condition=models.Q(('setor__isnull', True)), fields=('tipo', 'status'), name='resumo_sem_setor_tipo_status_unico')],
+            },
+        ),
+    ]
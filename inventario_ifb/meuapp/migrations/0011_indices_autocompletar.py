@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:08
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0010_resumo_inventario'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sala',
+            index=models.Index(fields=['numero'], name='sala_numero_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='setor',
+            index=models.Index(django.db.models.functions.text.Upper('sigla'), name='setor_sigla_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='setor',
+            index=models.Index(django.db.models.functions.text.Upper('nome'), name='setor_nome_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='setor',
+            index=models.Index(fields=['campus', 'sigla'], name='setor_campus_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0011_indices_autocompletar'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conferencia',
+            index=models.Index(fields=['ano', 'data_inicio'], name='conferencia_ano_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventario',
+            index=models.Index(fields=['tipo', 'codigo'], name='inventario_tipo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventario',
+            index=models.Index(fields=['status', 'codigo'], name='inventario_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemconferencia',
+            index=models.Index(fields=['status_conferido'], name='item_conferencia_status_idx'),
+        ),
+    ]
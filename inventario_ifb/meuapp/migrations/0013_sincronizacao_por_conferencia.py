@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0012_indices_admin'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sincronizacaoscanner',
+            name='chave',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AlterUniqueTogether(
+            name='sincronizacaoscanner',
+            unique_together={('conferencia', 'chave')},
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0013_sincronizacao_por_conferencia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relatoriojob',
+            name='iniciado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sala',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='setor',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0014_versao_relatorios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemconferencia',
+            name='imagem_enviada_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0015_imagem_enviada_em'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagempendente',
+            name='iniciado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
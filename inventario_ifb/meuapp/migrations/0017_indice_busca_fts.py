@@ -0,0 +1,56 @@
+# Índice FTS5 da busca do inventário (ver meuapp/busca.py)
+
+from django.db import migrations
+
+CRIAR = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS meuapp_inventario_busca USING fts5(
+        descricao, numero_serie, obs, content='meuapp_inventario', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS meuapp_inventario_busca_ai AFTER INSERT ON meuapp_inventario BEGIN
+        INSERT INTO meuapp_inventario_busca(rowid, descricao, numero_serie, obs)
+        VALUES (new.id, new.descricao, new.numero_serie, new.obs);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS meuapp_inventario_busca_ad AFTER DELETE ON meuapp_inventario BEGIN
+        INSERT INTO meuapp_inventario_busca(meuapp_inventario_busca, rowid, descricao, numero_serie, obs)
+        VALUES ('delete', old.id, old.descricao, old.numero_serie, old.obs);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS meuapp_inventario_busca_au
+    AFTER UPDATE OF descricao, numero_serie, obs ON meuapp_inventario BEGIN
+        INSERT INTO meuapp_inventario_busca(meuapp_inventario_busca, rowid, descricao, numero_serie, obs)
+        VALUES ('delete', old.id, old.descricao, old.numero_serie, old.obs);
+        INSERT INTO meuapp_inventario_busca(rowid, descricao, numero_serie, obs)
+        VALUES (new.id, new.descricao, new.numero_serie, new.obs);
+    END""",
+    # Indexa os itens que já existem (bancos onde o índice ainda não existia)
+    "INSERT INTO meuapp_inventario_busca(meuapp_inventario_busca) VALUES ('rebuild')",
+]
+
+APAGAR = [
+    'DROP TRIGGER IF EXISTS meuapp_inventario_busca_ai',
+    'DROP TRIGGER IF EXISTS meuapp_inventario_busca_ad',
+    'DROP TRIGGER IF EXISTS meuapp_inventario_busca_au',
+    'DROP TABLE IF EXISTS meuapp_inventario_busca',
+]
+
+
+class RunSQLSqlite(migrations.RunSQL):
+    """FTS5 só existe no SQLite; nos outros bancos a busca usa icontains."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meuapp', '0016_imagem_iniciado_em'),
+    ]
+
+    operations = [
+        RunSQLSqlite(CRIAR, APAGAR),
+    ]
@@ -1,14 +1,23 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.functions import Upper
 
 
 class Setor(models.Model):
     nome = models.TextField()
     sigla = models.TextField(max_length=10)
     campus = models.TextField()
+    # Entra na versão dos relatórios em cache (ver relatorios.fingerprint_inventarios)
+    atualizado_em = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Setores"
+        indexes = [
+            # Autocompletar por prefixo sem diferenciar maiúsculas (ver autocompletar.py)
+            models.Index(Upper('sigla'), name='setor_sigla_upper_idx'),
+            models.Index(Upper('nome'), name='setor_nome_upper_idx'),
+            models.Index(fields=['campus', 'sigla'], name='setor_campus_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sigla} - {self.nome}"
@@ -17,10 +26,14 @@ class Setor(models.Model):
 class Sala(models.Model):
     numero = models.IntegerField()
     setor = models.ForeignKey(Setor, on_delete=models.CASCADE, related_name='salas')
+    atualizado_em = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Salas"
         ordering = ['numero']
+        indexes = [
+            models.Index(fields=['numero'], name='sala_numero_idx'),
+        ]
 
     def __str__(self):
         return f"Sala {self.numero}"
@@ -47,13 +60,22 @@ class Inventario(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='bom')
     valor_aquisicao = models.FloatField(null=True, blank=True)
     valor_depreciado = models.FloatField(null=True, blank=True)
+    data_aquisicao = models.DateField(null=True, blank=True, verbose_name="Data de Aquisição")
     numero_serie = models.TextField(blank=True, null=True)
     obs = models.TextField(blank=True, null=True, verbose_name="Observações")
     sala_atual = models.ForeignKey(Sala, on_delete=models.SET_NULL, null=True, blank=True, related_name='inventarios')
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name_plural = "Inventários"
         ordering = ['codigo']
+        indexes = [
+            # Busca por prefixo do código sem diferenciar maiúsculas (ver busca.py)
+            models.Index(Upper('codigo'), name='inventario_codigo_upper_idx'),
+            # Filtros do admin já na ordem da listagem
+            models.Index(fields=['tipo', 'codigo'], name='inventario_tipo_idx'),
+            models.Index(fields=['status', 'codigo'], name='inventario_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.codigo} - {self.descricao}"
@@ -66,14 +88,37 @@ class Conferencia(models.Model):
     ano = models.IntegerField()
     usuario = models.ForeignKey(User, on_delete=models.CASCADE)
     finalizada = models.BooleanField(default=False)
+    # Também avançado a cada item conferido (usado pela conciliação incremental)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Totais mantidos a cada alteração de ItemConferencia (ver meuapp/conferencias.py)
+    total_itens = models.IntegerField(default=0, editable=False)
+    total_bom = models.IntegerField(default=0, editable=False)
+    total_danificado = models.IntegerField(default=0, editable=False)
+    total_inutilizado = models.IntegerField(default=0, editable=False)
+
+    CAMPOS_TOTAIS = ('total_itens', 'total_bom', 'total_danificado', 'total_inutilizado')
 
     class Meta:
         verbose_name_plural = "Conferências"
         ordering = ['-data_inicio']
+        indexes = [
+            models.Index(fields=['ano', 'data_inicio'], name='conferencia_ano_idx'),
+        ]
 
     def __str__(self):
         return f"Conferência {self.sala} - {self.ano} ({self.usuario.username})"
 
+    def save(self, *args, **kwargs):
+        # Os totais são atualizados com F() por outras requisições; um save()
+        # comum não deve sobrescrevê-los com os valores lidos no início
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CAMPOS_TOTAIS
+            ]
+        super().save(*args, **kwargs)
+
 
 class ItemConferencia(models.Model):
     conferencia = models.ForeignKey(Conferencia, on_delete=models.CASCADE, related_name='itens')
@@ -81,12 +126,206 @@ class ItemConferencia(models.Model):
     status_conferido = models.CharField(max_length=20, choices=Inventario.STATUS_CHOICES)
     observacao = models.TextField(blank=True, null=True)
     imagem_observacao = models.ImageField(upload_to='observacoes/', null=True, blank=True)
+    # Preenchidas pelo worker processar_imagens (ver meuapp/imagens.py)
+    imagem_miniatura = models.ImageField(upload_to='observacoes/', null=True, blank=True, editable=False)
+    # Envio de onde veio a foto gravada (ImagemPendente.criado_em)
+    imagem_enviada_em = models.DateTimeField(null=True, blank=True, editable=False)
     data_conferencia = models.DateTimeField(auto_now_add=True)
+    # Onde o item estava cadastrado quando foi conferido (a conferência o move de sala)
+    sala_anterior = models.ForeignKey(Sala, on_delete=models.SET_NULL, null=True, blank=True,
+                                      editable=False, related_name='+')
 
     class Meta:
         verbose_name_plural = "Itens de Conferência"
         unique_together = ['conferencia', 'inventario']
+        indexes = [
+            models.Index(fields=['status_conferido'], name='item_conferencia_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.inventario.codigo} - {self.conferencia}"
 
+
+class Movimentacao(models.Model):
+    """Histórico (só inserções) das mudanças de sala_atual (ver meuapp/movimentacoes.py)."""
+    ORIGEM_CHOICES = [
+        ('cadastro', 'Cadastro/edição'),
+        ('conferencia', 'Conferência'),
+        ('admin', 'Admin'),
+        ('importacao', 'Importação'),
+    ]
+
+    # inventario e sala já são o início dos índices compostos abaixo
+    inventario = models.ForeignKey(Inventario, on_delete=models.CASCADE, related_name='movimentacoes',
+                                   db_index=False)
+    # Sala de destino (vazia quando o item ficou sem sala)
+    sala = models.ForeignKey(Sala, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+                             db_index=False)
+    sala_anterior = models.ForeignKey(Sala, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    data = models.DateTimeField()
+    origem = models.CharField(max_length=20, choices=ORIGEM_CHOICES)
+    conferencia = models.ForeignKey(Conferencia, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='+')
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta:
+        verbose_name_plural = "Movimentações"
+        ordering = ['-data', '-id']
+        indexes = [
+            # Cobrem "onde estava o item na data D" e "o que havia na sala na data D"
+            # sem ler a tabela: a terceira coluna responde a consulta
+            models.Index(fields=['inventario', 'data', 'sala'], name='movimentacao_item_data_idx'),
+            models.Index(fields=['sala', 'data', 'inventario'], name='movimentacao_sala_data_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.inventario_id}: {self.sala_anterior_id} → {self.sala_id} ({self.data:%d/%m/%Y})"
+
+
+class ImagemPendente(models.Model):
+    """Foto enviada na conferência aguardando o worker processar_imagens."""
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('processando', 'Processando'),
+        ('concluido', 'Concluído'),
+        ('erro', 'Erro'),
+    ]
+
+    item = models.ForeignKey(ItemConferencia, on_delete=models.CASCADE, related_name='imagens_pendentes')
+    arquivo = models.CharField(max_length=255, verbose_name="Upload original")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente')
+    erro = models.TextField(blank=True, null=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    # Início da reserva pelo worker; reservas vencidas voltam para a fila
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    processado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Imagens Pendentes"
+        indexes = [
+            models.Index(fields=['status', 'criado_em']),
+        ]
+
+    def __str__(self):
+        return f"Imagem #{self.pk} ({self.get_status_display()})"
+
+
+class RelatorioJob(models.Model):
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('processando', 'Processando'),
+        ('concluido', 'Concluído'),
+        ('erro', 'Erro'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pendente')
+    chave = models.CharField(max_length=64, verbose_name="Chave dos filtros")
+    fingerprint = models.CharField(max_length=64, verbose_name="Versão dos dados")
+    filtros = models.JSONField(default=dict, blank=True)
+    arquivo = models.FileField(upload_to='relatorios/', null=True, blank=True)
+    total_itens = models.IntegerField(default=0)
+    erro = models.TextField(blank=True, null=True)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    # Início do processamento; passado o prazo, o job volta para a fila
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Relatórios"
+        ordering = ['-criado_em']
+        indexes = [
+            models.Index(fields=['chave', 'fingerprint', 'status']),
+            models.Index(fields=['status', 'criado_em']),
+        ]
+
+    def __str__(self):
+        return f"Relatório #{self.pk} ({self.get_status_display()})"
+
+
+class SincronizacaoScanner(models.Model):
+    """Lote enviado pelo modo offline do scanner, guardado pela chave de idempotência."""
+    chave = models.CharField(max_length=64)
+    conferencia = models.ForeignKey(Conferencia, on_delete=models.CASCADE, related_name='sincronizacoes')
+    resposta = models.JSONField(default=dict)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Sincronizações do Scanner"
+        unique_together = ['conferencia', 'chave']
+
+    def __str__(self):
+        return f"{self.chave} - {self.conferencia_id}"
+
+
+class ConciliacaoSala(models.Model):
+    """Resumo da conciliação de uma sala num ano (ver meuapp/conciliacao.py)."""
+    sala = models.ForeignKey(Sala, on_delete=models.CASCADE, related_name='conciliacoes')
+    ano = models.IntegerField()
+    conferencias = models.IntegerField(default=0)
+    esperados = models.IntegerField(default=0)
+    encontrados = models.IntegerField(default=0)
+    faltantes = models.IntegerField(default=0)
+    realocados = models.IntegerField(default=0)
+    inesperados = models.IntegerField(default=0)
+    calculado_em = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "Conciliações por Sala"
+        unique_together = ['sala', 'ano']
+        indexes = [
+            models.Index(fields=['ano', 'calculado_em']),
+        ]
+
+    def __str__(self):
+        return f"{self.sala} - {self.ano}"
+
+
+class ConciliacaoItem(models.Model):
+    SITUACAO_CHOICES = [
+        ('encontrado', 'Encontrado'),
+        ('faltante', 'Não encontrado'),
+        ('realocado', 'Encontrado em outra sala'),
+        ('inesperado', 'Inesperado'),
+    ]
+
+    ano = models.IntegerField()
+    sala = models.ForeignKey(Sala, on_delete=models.CASCADE, related_name='+')
+    inventario = models.ForeignKey(Inventario, on_delete=models.CASCADE, related_name='+')
+    situacao = models.CharField(max_length=20, choices=SITUACAO_CHOICES)
+    # Realocado: sala onde foi encontrado. Inesperado: sala onde era esperado
+    sala_relacionada = models.ForeignKey(Sala, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+
+    class Meta:
+        verbose_name_plural = "Conciliações por Item"
+        indexes = [
+            models.Index(fields=['ano', 'sala', 'situacao']),
+            models.Index(fields=['ano', 'inventario']),
+            models.Index(fields=['ano', 'sala_relacionada']),
+        ]
+
+    def __str__(self):
+        return f"{self.inventario_id} - {self.get_situacao_display()}"
+
+
+class ResumoInventario(models.Model):
+    """Totais do inventário por setor, tipo e status (ver meuapp/resumos.py)."""
+    # Vazio: itens sem sala. O índice da restrição única já começa pelo setor
+    setor = models.ForeignKey(Setor, on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+                              db_index=False)
+    tipo = models.CharField(max_length=20, choices=Inventario.TIPO_CHOICES)
+    status = models.CharField(max_length=20, choices=Inventario.STATUS_CHOICES)
+    quantidade = models.IntegerField(default=0)
+    valor_aquisicao = models.FloatField(default=0)
+    valor_depreciado = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Resumos do Inventário"
+        constraints = [
+            models.UniqueConstraint(fields=['setor', 'tipo', 'status'], name='resumo_setor_tipo_status_unico'),
+            models.UniqueConstraint(fields=['tipo', 'status'], condition=models.Q(setor__isnull=True),
+                                    name='resumo_sem_setor_tipo_status_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.setor_id} - {self.tipo} - {self.status}: {self.quantidade}"
@@ -0,0 +1,112 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Inventario, ItemConferencia, Movimentacao
+
+MOVIMENTACOES_LOTE = 2000
+
+
+# ========== GRAVAÇÃO ==========
+def registrar_movimentacoes(movimentos, origem, usuario_id=None, conferencia_id=None, data=None):
+    """Grava de uma vez as mudanças de sala: `movimentos` são (inventario_id, sala_anterior_id, sala_id).
+
+    Itens que continuaram na mesma sala são ignorados. Devolve quantas foram gravadas.
+    """
+    data = data or timezone.now()
+    novas = [
+        Movimentacao(inventario_id=inventario_id, sala_anterior_id=anterior, sala_id=sala, data=data,
+                     origem=origem, conferencia_id=conferencia_id, usuario_id=usuario_id)
+        for inventario_id, anterior, sala in movimentos
+        if anterior != sala
+    ]
+    Movimentacao.objects.bulk_create(novas, batch_size=MOVIMENTACOES_LOTE)
+    return len(novas)
+
+
+# ========== CONSULTAS NO TEMPO ==========
+def sala_em(inventario_id, data):
+    """Id da sala onde o item estava na data (None se estava sem sala).
+
+    Antes da primeira movimentação registrada vale a sala de onde ela saiu;
+    sem nenhuma movimentação, a sala atual.
+    """
+    ultima = (Movimentacao.objects.filter(inventario_id=inventario_id, data__lte=data)
+              .order_by('-data', '-id').values_list('sala_id').first())
+    if ultima:
+        return ultima[0]
+    primeira = (Movimentacao.objects.filter(inventario_id=inventario_id, data__gt=data)
+                .order_by('data', 'id').values_list('sala_anterior_id').first())
+    if primeira:
+        return primeira[0]
+    return Inventario.objects.filter(pk=inventario_id).values_list('sala_atual_id', flat=True).first()
+
+
+def itens_na_sala_em(sala_id, data):
+    """Inventários que estavam na sala na data, pelos mesmos critérios de sala_em."""
+    # Última movimentação até a data: nenhuma outra do item depois dela (e até a data)
+    posterior = Movimentacao.objects.filter(
+        Q(data__gt=OuterRef('data')) | Q(data=OuterRef('data'), id__gt=OuterRef('id')),
+        inventario_id=OuterRef('inventario_id'), data__lte=data,
+    )
+    chegaram = (Movimentacao.objects.filter(sala_id=sala_id, data__lte=data)
+                .filter(~Exists(posterior)).values('inventario_id'))
+
+    # Saíram da sala depois da data, na primeira movimentação registrada
+    anterior = Movimentacao.objects.filter(
+        Q(data__lt=OuterRef('data')) | Q(data=OuterRef('data'), id__lt=OuterRef('id')),
+        inventario_id=OuterRef('inventario_id'),
+    )
+    sairam_depois = (Movimentacao.objects.filter(sala_anterior_id=sala_id, data__gt=data)
+                     .filter(~Exists(anterior)).values('inventario_id'))
+
+    sem_historico = Q(sala_atual_id=sala_id) & ~Exists(Movimentacao.objects.filter(inventario_id=OuterRef('pk')))
+    return Inventario.objects.filter(Q(pk__in=chegaram) | Q(pk__in=sairam_depois) | sem_historico)
+
+
+def itens_na_sala_no_periodo(sala_id, inicio, fim):
+    """Inventários que passaram pela sala entre as datas (ex.: "o que havia na Sala 12 em 2023")."""
+    entraram = (Movimentacao.objects.filter(sala_id=sala_id, data__gt=inicio, data__lte=fim)
+                .values('inventario_id'))
+    return itens_na_sala_em(sala_id, inicio) | Inventario.objects.filter(pk__in=entraram)
+
+
+# ========== RECONSTRUÇÃO ==========
+def reconstruir_de_conferencias(tamanho_lote=MOVIMENTACOES_LOTE):
+    """Cria as movimentações que faltam a partir dos itens conferidos.
+
+    Cada conferência que mudou o item de sala vira uma movimentação na data da
+    conferência. Quando sala_anterior não foi registrada (conferências antigas),
+    vale a sala da conferência anterior do item. Pode ser executada de novo:
+    conferências que já têm a movimentação do item são ignoradas.
+    """
+    existentes = set(Movimentacao.objects.filter(conferencia__isnull=False).order_by()
+                     .values_list('inventario_id', 'conferencia_id'))
+    itens = (ItemConferencia.objects.order_by('inventario_id', 'data_conferencia', 'id')
+             .values_list('inventario_id', 'conferencia_id', 'conferencia__sala_id',
+                          'conferencia__usuario_id', 'sala_anterior_id', 'data_conferencia'))
+
+    criadas = 0
+    lote = []
+    item_atual = sala_conhecida = None
+    for inventario_id, conferencia_id, sala_id, usuario_id, sala_anterior_id, data in itens.iterator(tamanho_lote):
+        if inventario_id != item_atual:
+            item_atual, sala_conhecida = inventario_id, None
+        anterior = sala_anterior_id if sala_anterior_id is not None else sala_conhecida
+        sala_conhecida = sala_id
+        if anterior == sala_id or (inventario_id, conferencia_id) in existentes:
+            continue
+
+        lote.append(Movimentacao(inventario_id=inventario_id, sala_anterior_id=anterior, sala_id=sala_id,
+                                 data=data, origem='conferencia', conferencia_id=conferencia_id,
+                                 usuario_id=usuario_id))
+        if len(lote) >= tamanho_lote:
+            criadas += _gravar_lote(lote)
+            lote = []
+    return criadas + _gravar_lote(lote)
+
+
+def _gravar_lote(lote):
+    with transaction.atomic():
+        Movimentacao.objects.bulk_create(lote)
+    return len(lote)
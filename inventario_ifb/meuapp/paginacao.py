@@ -0,0 +1,199 @@
+import base64
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+CONTAGEM_APROXIMADA_TTL = getattr(settings, 'CONTAGEM_APROXIMADA_TTL', 600)
+
+
+# ========== CURSORES ==========
+def codificar_cursor(valores, direcao):
+    bruto = json.dumps([direcao, valores], default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Devolve (direção, valores) ou None se o cursor for inválido."""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direcao, valores = json.loads(bruto)
+    except (ValueError, TypeError):
+        return None
+    if direcao not in ('proxima', 'anterior') or not isinstance(valores, list):
+        return None
+    return direcao, valores
+
+
+# ========== CONTAGEM APROXIMADA ==========
+def _estimativa_do_banco(tabela):
+    """Estimativa de linhas mantida pelo próprio banco (sem varrer a tabela)."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [tabela])
+        elif connection.vendor == 'sqlite':
+            # Preenchida pelo ANALYZE; o primeiro número de `stat` é o total de linhas
+            try:
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [tabela])
+            except DatabaseError:
+                return None
+        else:
+            return None
+        linha = cursor.fetchone()
+    if not linha or linha[0] is None:
+        return None
+    try:
+        total = int(str(linha[0]).split()[0])
+    except ValueError:
+        return None
+    return total if total >= 0 else None
+
+
+def contar_aproximado(queryset):
+    """Total aproximado: estimativa do banco para a tabela inteira ou COUNT em cache."""
+    sql, params = queryset.query.sql_with_params()
+    chave = 'contagem:' + hashlib.sha1(f'{sql}|{params}'.encode()).hexdigest()
+    total = cache.get(chave)
+    if total is not None:
+        return total
+
+    if not queryset.query.where:
+        total = _estimativa_do_banco(queryset.model._meta.db_table)
+    if total is None:
+        total = queryset.order_by().count()
+    cache.set(chave, total, CONTAGEM_APROXIMADA_TTL)
+    return total
+
+
+# ========== PAGINAÇÃO ==========
+class PaginadorAproximado(Paginator):
+    """Paginator com o total de contar_aproximado (usado nas listagens do admin)."""
+
+    @cached_property
+    def count(self):
+        return contar_aproximado(self.object_list)
+
+
+class PaginaKeyset:
+    def __init__(self, objetos, params, campos, tem_proxima, tem_anterior, total=None, aproximado=False):
+        self.object_list = objetos
+        self.tem_proxima = tem_proxima
+        self.tem_anterior = tem_anterior
+        self.total = total
+        self.aproximado = aproximado
+        self._params = params
+        self._campos = campos
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def _valores(self, objeto):
+        return [getattr(objeto, nome) for nome, _ in self._campos]
+
+    def _url(self, cursor):
+        params = self._params.copy()
+        params['cursor'] = cursor
+        return '?' + urlencode(params)
+
+    @property
+    def url_proxima(self):
+        if self.tem_proxima:
+            return self._url(codificar_cursor(self._valores(self.object_list[-1]), 'proxima'))
+        return None
+
+    @property
+    def url_anterior(self):
+        if self.tem_anterior:
+            return self._url(codificar_cursor(self._valores(self.object_list[0]), 'anterior'))
+        return None
+
+
+class KeysetPaginationMixin:
+    """Paginação por cursor (keyset) para ListView.
+
+    Em vez de OFFSET, cada página filtra a partir dos valores da última linha
+    da página anterior na ordenação da view (mais a pk para desempate), então
+    o custo não cresce com o número da página. `contagem` pode ser None (sem
+    total), 'exata' ou 'aproximada'.
+    """
+    paginate_by = 50
+    contagem = None
+
+    def get_ordering(self):
+        return super().get_ordering() or self.model._meta.ordering or ['pk']
+
+    def _campos_ordenacao(self):
+        campos = []
+        for campo in self.get_ordering():
+            descendente = campo.startswith('-')
+            nome = campo.lstrip('-')
+            campos.append(('pk' if nome == 'id' else nome, descendente))
+        if not any(nome == 'pk' for nome, _ in campos):
+            campos.append(('pk', campos[-1][1] if campos else False))
+        return campos
+
+    @staticmethod
+    def _filtro_apos(campos, valores, reverso):
+        """Q equivalente a (c1, c2, ..., pk) > (v1, v2, ..., vpk) respeitando asc/desc."""
+        filtro = Q()
+        iguais = {}
+        for (nome, descendente), valor in zip(campos, valores):
+            operador = 'lt' if descendente != reverso else 'gt'
+            filtro |= Q(**iguais, **{f'{nome}__{operador}': valor})
+            iguais[nome] = valor
+        return filtro
+
+    def _valores_cursor(self, campos, valores):
+        convertidos = []
+        for (nome, _), valor in zip(campos, valores):
+            campo = self.model._meta.pk if nome == 'pk' else self.model._meta.get_field(nome)
+            convertidos.append(campo.to_python(valor))
+        return convertidos
+
+    def paginate_queryset(self, queryset, page_size):
+        campos = self._campos_ordenacao()
+        params = self.request.GET.copy()
+        cursor = decodificar_cursor(params.pop('cursor', [''])[-1])
+
+        total = None
+        if self.contagem == 'exata':
+            total = queryset.order_by().count()
+        elif self.contagem == 'aproximada':
+            total = contar_aproximado(queryset)
+
+        direcao, valores = cursor if cursor and len(cursor[1]) == len(campos) else ('proxima', None)
+        reverso = direcao == 'anterior'
+        if valores is not None:
+            try:
+                valores = self._valores_cursor(campos, valores)
+            except (ValidationError, ValueError, TypeError, KeyError):
+                # Valores adulterados (to_python recusa ou o JSON traz listas/objetos)
+                valores, reverso = None, False
+
+        ordem = [('-' if descendente != reverso else '') + nome for nome, descendente in campos]
+        pagina = queryset.order_by(*ordem)
+        if valores is not None:
+            pagina = pagina.filter(self._filtro_apos(campos, valores, reverso))
+
+        objetos = list(pagina[:page_size + 1])
+        ha_mais = len(objetos) > page_size
+        objetos = objetos[:page_size]
+        if reverso:
+            objetos.reverse()
+            tem_proxima, tem_anterior = True, ha_mais
+        else:
+            tem_proxima, tem_anterior = ha_mais, valores is not None
+
+        pagina = PaginaKeyset(objetos, params, campos, tem_proxima, tem_anterior,
+                              total=total, aproximado=self.contagem == 'aproximada')
+        return None, pagina, objetos, tem_proxima or tem_anterior
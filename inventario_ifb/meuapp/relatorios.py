@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from .banco import inicializar_processo
+from .forms import FiltroRelatorioForm
+from .metricas import registrar_relatorio
+from .models import Inventario, RelatorioJob, Sala
+
+# Abaixo desse total o relatório é desenhado num único processo
+PDF_LIMITE_PARALELO = getattr(settings, 'RELATORIO_PDF_LIMITE_PARALELO', 5000)
+PDF_PROCESSOS = getattr(settings, 'RELATORIO_PDF_PROCESSOS', os.cpu_count() or 2)
+PDF_CHUNK_SIZE = 2000
+# Job em processamento há mais que isso (worker encerrado no meio) volta para a fila
+JOB_PRAZO_SEGUNDOS = getattr(settings, 'RELATORIO_JOB_PRAZO_SEGUNDOS', 30 * 60)
+XLSX_CHUNK_SIZE = 2000
+
+
+# ========== FILTROS ==========
+def limpar_filtros(dados):
+    """Valida os filtros de relatório e devolve apenas os preenchidos."""
+    form = FiltroRelatorioForm(dados)
+    if not form.is_valid():
+        return {}
+    return {campo: valor for campo, valor in form.cleaned_data.items() if valor not in (None, '')}
+
+
+def filtrar_inventarios(dados):
+    """Aplica os filtros de relatório (tipo, status, setor, sala) ao inventário."""
+    filtros = limpar_filtros(dados)
+    inventarios = Inventario.objects.all()
+    if 'tipo' in filtros:
+        inventarios = inventarios.filter(tipo=filtros['tipo'])
+    if 'status' in filtros:
+        inventarios = inventarios.filter(status=filtros['status'])
+    if 'setor' in filtros:
+        inventarios = inventarios.filter(sala_atual__setor_id=filtros['setor'])
+    if 'sala' in filtros:
+        inventarios = inventarios.filter(sala_atual_id=filtros['sala'])
+    return inventarios
+
+
+def chave_filtros(filtros):
+    return hashlib.sha1(json.dumps(filtros, sort_keys=True).encode()).hexdigest()
+
+
+def fingerprint_inventarios(filtros):
+    """Versão dos dados cobertos pelos filtros: muda a cada inclusão, alteração ou exclusão.
+
+    O PDF mostra o número da sala e é dividido por setor, então alterar ou
+    excluir uma sala ou um setor com salas também muda a versão.
+    """
+    versao = filtrar_inventarios(filtros).aggregate(
+        total=Count('id'), ultima=Max('atualizado_em'), maior_id=Max('id'),
+    )
+    salas = Sala.objects.aggregate(
+        total=Count('id'), ultima=Max('atualizado_em'), maior_id=Max('id'), setor=Max('setor__atualizado_em'),
+    )
+    bruto = (f"{versao['total']}|{versao['ultima']}|{versao['maior_id']}|"
+             f"{salas['total']}|{salas['ultima']}|{salas['maior_id']}|{salas['setor']}")
+    return hashlib.sha1(bruto.encode()).hexdigest()
+
+
+# ========== JOBS ==========
+def solicitar_relatorio_pdf(dados, usuario=None):
+    """Devolve um job já concluído para os mesmos filtros e dados, ou enfileira um novo."""
+    filtros = limpar_filtros(dados)
+    chave = chave_filtros(filtros)
+    fingerprint = fingerprint_inventarios(filtros)
+
+    job = RelatorioJob.objects.filter(
+        chave=chave, fingerprint=fingerprint, status__in=['pendente', 'processando', 'concluido'],
+    ).first()
+    if job and (job.status != 'concluido' or (job.arquivo and job.arquivo.storage.exists(job.arquivo.name))):
+        return job
+
+    return RelatorioJob.objects.create(
+        chave=chave, fingerprint=fingerprint, filtros=filtros, usuario=usuario,
+    )
+
+
+def reservar_proximo_job():
+    """Marca o job pendente mais antigo como em processamento; seguro com vários workers.
+
+    Jobs em processamento há mais de JOB_PRAZO_SEGUNDOS são reservados de novo.
+    """
+    agora = timezone.now()
+    vencidos = Q(status='processando', iniciado_em__lt=agora - timedelta(seconds=JOB_PRAZO_SEGUNDOS))
+    for job in RelatorioJob.objects.filter(Q(status='pendente') | vencidos).order_by('criado_em')[:10]:
+        # Só reserva se ninguém reservou desde a leitura (mesmo status e início)
+        reservado = RelatorioJob.objects.filter(pk=job.pk, status=job.status, iniciado_em=job.iniciado_em).update(
+            status='processando', iniciado_em=agora,
+        )
+        if reservado:
+            job.status, job.iniciado_em = 'processando', agora
+            return job
+    return None
+
+
+def processar_job(job):
+    caminho = None
+    try:
+        inicio = time.perf_counter()
+        caminho, total = gerar_relatorio_pdf(job.filtros)
+        registrar_relatorio('pdf', time.perf_counter() - inicio, total)
+        with open(caminho, 'rb') as arquivo:
+            job.arquivo.save(f"relatorio_inventario_{job.chave[:12]}_{job.fingerprint[:12]}.pdf",
+                             File(arquivo), save=False)
+        job.total_itens = total
+        job.status = 'concluido'
+        job.erro = None
+    except Exception as exc:
+        job.status = 'erro'
+        job.erro = str(exc)
+    finally:
+        if caminho:
+            shutil.rmtree(os.path.dirname(caminho), ignore_errors=True)
+    job.concluido_em = timezone.now()
+    job.save()
+    return job
+
+
+# ========== GERAÇÃO DO PDF ==========
+def _formatar_linha(codigo, descricao, tipo, status, sala_numero):
+    sala = f"Sala {sala_numero}" if sala_numero is not None else "Não definida"
+    return f"{codigo} - Descrição: {descricao} - Tipo: {tipo} - Status: {status} - Sala atual: {sala}"
+
+
+def _renderizar_parte(filtros, setor_id, titulo, destino):
+    """Desenha num PDF próprio os itens de um setor (ou de todos, se setor_id for None)."""
+    inventarios = filtrar_inventarios(filtros)
+    if setor_id == 'sem_sala':
+        inventarios = inventarios.filter(sala_atual__isnull=True)
+    elif setor_id is not None:
+        inventarios = inventarios.filter(sala_atual__setor_id=setor_id)
+
+    p = canvas.Canvas(destino, pagesize=A4)
+    largura, altura = A4
+
+    # Cabeçalho
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(50, altura - 50, titulo)
+
+    # Lista de itens
+    p.setFont("Helvetica", 12)
+    y = altura - 80
+    linhas = inventarios.values_list(
+        'codigo', 'descricao', 'tipo', 'status', 'sala_atual__numero',
+    ).iterator(chunk_size=PDF_CHUNK_SIZE)
+    for linha in linhas:
+        p.drawString(50, y, _formatar_linha(*linha))
+        y -= 20
+        if y < 50:  # Nova página se necessário
+            p.showPage()
+            p.setFont("Helvetica", 12)
+            y = altura - 50
+
+    p.showPage()
+    p.save()
+    return destino
+
+
+def _partes_por_setor(filtros):
+    partes = []
+    setores = (filtrar_inventarios(filtros).filter(sala_atual__isnull=False)
+               .values_list('sala_atual__setor_id', 'sala_atual__setor__sigla', 'sala_atual__setor__nome')
+               .distinct().order_by('sala_atual__setor__sigla'))
+    for setor_id, sigla, nome in setores:
+        partes.append((setor_id, f"Relatório de Inventário - {sigla} - {nome}"))
+    if filtrar_inventarios(filtros).filter(sala_atual__isnull=True).exists():
+        partes.append(('sem_sala', "Relatório de Inventário - Sem sala definida"))
+    return partes
+
+
+def gerar_relatorio_pdf(filtros):
+    """Gera o PDF num arquivo temporário e devolve (caminho, total de itens).
+
+    Relatórios grandes são divididos por setor, desenhados em paralelo num
+    pool de processos e depois concatenados.
+    """
+    total = filtrar_inventarios(filtros).count()
+    pasta = tempfile.mkdtemp(prefix='relatorio_')
+    try:
+        return _gerar_em(pasta, filtros, total), total
+    except BaseException:
+        shutil.rmtree(pasta, ignore_errors=True)
+        raise
+
+
+def _gerar_em(pasta, filtros, total):
+    destino = os.path.join(pasta, 'relatorio.pdf')
+
+    partes = _partes_por_setor(filtros) if total >= PDF_LIMITE_PARALELO else []
+    if len(partes) < 2:
+        _renderizar_parte(filtros, None, "Relatório de Inventário", destino)
+        return destino
+
+    from pypdf import PdfWriter
+
+    # Fecha a conexão antes do fork para não compartilhá-la com os filhos
+    connections.close_all()
+    caminhos = [os.path.join(pasta, f"parte_{i}.pdf") for i in range(len(partes))]
+    with ProcessPoolExecutor(max_workers=PDF_PROCESSOS, initializer=inicializar_processo) as pool:
+        futuros = [
+            pool.submit(_renderizar_parte, filtros, setor_id, titulo, caminho)
+            for (setor_id, titulo), caminho in zip(partes, caminhos)
+        ]
+        for futuro in futuros:
+            futuro.result()
+
+    writer = PdfWriter()
+    for caminho in caminhos:
+        writer.append(caminho)
+        os.remove(caminho)
+    with open(destino, 'wb') as arquivo:
+        writer.write(arquivo)
+    return destino
+
+
+# ========== GERAÇÃO DO XLSX ==========
+XLSX_CABECALHO = ["Codigo", "Descricao", "Tipo", "Status", "Sala Atual", "Data de Aquisicao",
+                  "Valor de Aquisicao", "Valor Depreciado", "Numero de Serie"]
+
+
+def _titulo_planilha(nome, usados):
+    # O Excel limita o nome da aba a 31 caracteres e proíbe alguns símbolos
+    titulo = re.sub(r'[\\/*?:\[\]]', '-', nome)[:31] or 'Setor'
+    base, n = titulo, 2
+    while titulo.lower() in usados:
+        sufixo = f" ({n})"
+        titulo = base[:31 - len(sufixo)] + sufixo
+        n += 1
+    usados.add(titulo.lower())
+    return titulo
+
+
+def gerar_relatorio_xlsx(filtros, destino):
+    """Escreve o inventário filtrado em `destino` com uma aba por setor.
+
+    Usa o modo write-only do openpyxl, que grava as linhas à medida que são
+    adicionadas, então a memória não cresce com o número de itens.
+    """
+    wb = Workbook(write_only=True)
+    usados = set()
+    linhas = filtrar_inventarios(filtros).order_by(
+        'sala_atual__setor__sigla', 'sala_atual__setor_id', 'codigo',
+    ).values_list(
+        'sala_atual__setor_id', 'sala_atual__setor__sigla',
+        'codigo', 'descricao', 'tipo', 'status', 'sala_atual__numero', 'data_aquisicao',
+        'valor_aquisicao', 'valor_depreciado', 'numero_serie',
+    ).iterator(chunk_size=XLSX_CHUNK_SIZE)
+
+    inicio = time.perf_counter()
+    ws = None
+    setor_atual = object()
+    total = 0
+    for (setor_id, sigla, codigo, descricao, tipo, status, sala_numero, aquisicao_em,
+         aquisicao, depreciado, serie) in linhas:
+        total += 1
+        if setor_id != setor_atual:
+            setor_atual = setor_id
+            ws = wb.create_sheet(_titulo_planilha(sigla if setor_id else 'Sem sala', usados))
+            ws.append(XLSX_CABECALHO)
+
+        # Data e valores como células tipadas, para a planilha ordenar e somar
+        data = WriteOnlyCell(ws, value=aquisicao_em)
+        data.number_format = 'DD/MM/YYYY'
+        valores = []
+        for valor in (aquisicao, depreciado):
+            celula = WriteOnlyCell(ws, value=valor)
+            celula.number_format = '#,##0.00'
+            valores.append(celula)
+        ws.append([
+            codigo,
+            descricao,
+            tipo,
+            status,
+            f"Sala {sala_numero}" if sala_numero is not None else "",
+            data,
+            *valores,
+            serie or "",
+        ])
+
+    if ws is None:
+        wb.create_sheet('Inventário').append(XLSX_CABECALHO)
+
+    wb.save(destino)
+    registrar_relatorio('xlsx', time.perf_counter() - inicio, total)
+    return destino
@@ -0,0 +1,113 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Inventario, Movimentacao, ResumoInventario, Sala
+
+# O resumo guarda, por (setor, tipo, status), a quantidade de itens e as somas
+# dos valores. Os signals de Inventario e Sala aplicam as diferenças de cada
+# alteração; as mudanças de sala das conferências (UPDATE em massa, sem
+# signals) entram quando a conferência é finalizada.
+STATUS = [valor for valor, _ in Inventario.STATUS_CHOICES]
+
+
+def novos_deltas():
+    """(setor_id, tipo, status) -> [quantidade, valor de aquisição, valor depreciado]."""
+    return defaultdict(lambda: [0, 0.0, 0.0])
+
+
+def somar_item(deltas, setor_id, tipo, status, aquisicao, depreciado, sinal=1):
+    delta = deltas[(setor_id, tipo, status)]
+    delta[0] += sinal
+    delta[1] += sinal * (aquisicao or 0)
+    delta[2] += sinal * (depreciado or 0)
+
+
+@transaction.atomic
+def aplicar_deltas_resumo(deltas):
+    """Soma os deltas às linhas do resumo com F(), criando as que faltam."""
+    for (setor_id, tipo, status), (quantidade, aquisicao, depreciado) in deltas.items():
+        if not quantidade and abs(aquisicao) < 0.005 and abs(depreciado) < 0.005:
+            continue
+        atualizadas = ResumoInventario.objects.filter(setor_id=setor_id, tipo=tipo, status=status).update(
+            quantidade=F('quantidade') + quantidade,
+            valor_aquisicao=F('valor_aquisicao') + aquisicao,
+            valor_depreciado=F('valor_depreciado') + depreciado,
+        )
+        if not atualizadas:
+            ResumoInventario.objects.create(setor_id=setor_id, tipo=tipo, status=status, quantidade=quantidade,
+                                            valor_aquisicao=aquisicao, valor_depreciado=depreciado)
+
+
+def setores_das_salas(*salas):
+    """sala_id -> setor_id numa consulta (None -> None)."""
+    ids = {sala for sala in salas if sala is not None}
+    setores = dict(Sala.objects.filter(pk__in=ids).order_by().values_list('id', 'setor_id')) if ids else {}
+    setores[None] = None
+    return setores
+
+
+# ========== RECÁLCULO ==========
+@transaction.atomic
+def reconstruir_resumo(setores=None):
+    """Recalcula o resumo a partir do inventário: todo, ou só os `setores` (ids; None = sem sala)."""
+    linhas = ResumoInventario.objects.all()
+    itens = Inventario.objects.all()
+    if setores is not None:
+        setores = set(setores)
+        ids = [setor for setor in setores if setor is not None]
+        filtro_linhas, filtro_itens = Q(setor_id__in=ids), Q(sala_atual__setor_id__in=ids)
+        if None in setores:
+            filtro_linhas |= Q(setor__isnull=True)
+            filtro_itens |= Q(sala_atual__isnull=True)
+        linhas, itens = linhas.filter(filtro_linhas), itens.filter(filtro_itens)
+
+    linhas.delete()
+    grupos = itens.order_by().values_list('sala_atual__setor_id', 'tipo', 'status').annotate(
+        quantidade=Count('id'),
+        aquisicao=Coalesce(Sum('valor_aquisicao'), 0, output_field=FloatField()),
+        depreciado=Coalesce(Sum('valor_depreciado'), 0, output_field=FloatField()),
+    )
+    novas = ResumoInventario.objects.bulk_create([
+        ResumoInventario(setor_id=setor_id, tipo=tipo, status=status, quantidade=quantidade,
+                         valor_aquisicao=aquisicao, valor_depreciado=depreciado)
+        for setor_id, tipo, status, quantidade, aquisicao, depreciado in grupos
+    ])
+    return len(novas)
+
+
+def atualizar_resumo_da_conferencia(conferencia):
+    """Recalcula os setores por onde passaram os itens movidos pela conferência.
+
+    Só esses setores são lidos, então o custo não depende do tamanho do inventário.
+    O recálculo (em vez de deltas) também corrige alterações feitas nos itens
+    enquanto a conferência estava aberta.
+    """
+    salas = set(Movimentacao.objects.filter(conferencia=conferencia).order_by()
+                .values_list('sala_anterior_id', flat=True).distinct())
+    if not salas:
+        return
+    salas.add(conferencia.sala_id)
+    setores = setores_das_salas(*salas)
+    reconstruir_resumo({setores.get(sala) for sala in salas})
+
+
+# ========== CONSULTAS ==========
+def _agregados():
+    return {
+        'itens': Sum('quantidade'),
+        'aquisicao': Sum('valor_aquisicao'),
+        'depreciado': Sum('valor_depreciado'),
+        **{f'status_{status}': Sum('quantidade', filter=Q(status=status)) for status in STATUS},
+    }
+
+
+def totais_agrupados(linhas, *campos):
+    """Agrupa as linhas do resumo por `campos`, com a quantidade por status e as somas dos valores."""
+    return linhas.values(*campos).annotate(**_agregados()).order_by(*campos)
+
+
+def totais(linhas):
+    return linhas.aggregate(**_agregados())
@@ -0,0 +1,195 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .autocompletar import invalidar_autocompletar
+from .banco import aplicar_pragmas
+from .conferencias import atualizar_totais
+from .contadores import aplicar_deltas, chave
+from .models import Conferencia, Inventario, ItemConferencia, Sala, Setor
+from .resumos import (aplicar_deltas_resumo, atualizar_resumo_da_conferencia, novos_deltas, reconstruir_resumo,
+                      setores_das_salas, somar_item)
+
+
+# ========== CONEXÃO ==========
+@receiver(connection_created)
+def configurar_conexao(sender, connection, **kwargs):
+    aplicar_pragmas(connection)
+
+
+# ========== CONTADORES DO DASHBOARD ==========
+@receiver(post_init, sender=Inventario)
+def guardar_estado_inventario(sender, instance, **kwargs):
+    # __dict__ evita disparar consulta quando o campo foi adiado com only()/defer()
+    instance._contadores_original = (instance.__dict__.get('status'), instance.__dict__.get('tipo'))
+
+
+@receiver(post_save, sender=Inventario)
+def contar_inventario_salvo(sender, instance, created, **kwargs):
+    status, tipo = instance.status, instance.tipo
+    if created:
+        aplicar_deltas({chave('inventarios'): 1, chave('status', status): 1, chave('tipo', tipo): 1})
+    else:
+        status_antigo, tipo_antigo = getattr(instance, '_contadores_original', (status, tipo))
+        deltas = {}
+        if status_antigo is not None and status != status_antigo:
+            deltas[chave('status', status_antigo)] = -1
+            deltas[chave('status', status)] = 1
+        if tipo_antigo is not None and tipo != tipo_antigo:
+            deltas[chave('tipo', tipo_antigo)] = -1
+            deltas[chave('tipo', tipo)] = 1
+        aplicar_deltas(deltas)
+    instance._contadores_original = (status, tipo)
+
+
+@receiver(post_delete, sender=Inventario)
+def contar_inventario_excluido(sender, instance, **kwargs):
+    status, tipo = getattr(instance, '_contadores_original', (instance.status, instance.tipo))
+    aplicar_deltas({chave('inventarios'): -1, chave('status', status): -1, chave('tipo', tipo): -1})
+
+
+@receiver(post_save, sender=Sala)
+def contar_sala_salva(sender, instance, created, **kwargs):
+    if created:
+        aplicar_deltas({chave('salas'): 1})
+
+
+@receiver(post_delete, sender=Sala)
+def contar_sala_excluida(sender, instance, **kwargs):
+    aplicar_deltas({chave('salas'): -1})
+
+
+@receiver(post_init, sender=Conferencia)
+def guardar_estado_conferencia(sender, instance, **kwargs):
+    instance._contadores_finalizada = instance.__dict__.get('finalizada')
+
+
+@receiver(post_save, sender=Conferencia)
+def contar_conferencia_salva(sender, instance, created, **kwargs):
+    if created:
+        aplicar_deltas({chave('conferencias'): 1, chave('conferencias_abertas'): 0 if instance.finalizada else 1})
+    elif getattr(instance, '_contadores_finalizada', None) not in (None, instance.finalizada):
+        aplicar_deltas({chave('conferencias_abertas'): -1 if instance.finalizada else 1})
+    instance._contadores_finalizada = instance.finalizada
+
+
+@receiver(post_delete, sender=Conferencia)
+def contar_conferencia_excluida(sender, instance, **kwargs):
+    finalizada = getattr(instance, '_contadores_finalizada', instance.finalizada)
+    aplicar_deltas({chave('conferencias'): -1, chave('conferencias_abertas'): 0 if finalizada else -1})
+
+
+# ========== TOTAIS DA CONFERÊNCIA ==========
+@receiver(post_init, sender=ItemConferencia)
+def guardar_status_item(sender, instance, **kwargs):
+    instance._status_original = instance.__dict__.get('status_conferido')
+
+
+@receiver(post_save, sender=ItemConferencia)
+def totalizar_item_salvo(sender, instance, created, **kwargs):
+    status = instance.status_conferido
+    if created:
+        atualizar_totais(instance.conferencia_id, itens=1, por_status={status: 1})
+    elif getattr(instance, '_status_original', None) not in (None, status):
+        atualizar_totais(instance.conferencia_id, por_status={instance._status_original: -1, status: 1})
+    instance._status_original = status
+
+
+@receiver(post_delete, sender=ItemConferencia)
+def totalizar_item_excluido(sender, instance, origin=None, **kwargs):
+    # Exclusão da própria conferência: não há totais a manter
+    if isinstance(origin, Conferencia) or getattr(origin, 'model', None) is Conferencia:
+        return
+    status = getattr(instance, '_status_original', None) or instance.status_conferido
+    atualizar_totais(instance.conferencia_id, itens=-1, por_status={status: -1})
+    # Marca o item como alterado para a conciliação incremental
+    Inventario.objects.filter(pk=instance.inventario_id).update(atualizado_em=timezone.now())
+
+
+# ========== RESUMO ANALÍTICO ==========
+CAMPOS_RESUMO = ('sala_atual_id', 'tipo', 'status', 'valor_aquisicao', 'valor_depreciado')
+
+
+@receiver(post_init, sender=Inventario)
+def guardar_estado_resumo(sender, instance, **kwargs):
+    # Com algum campo adiado (only()/defer()) o estado original fica desconhecido
+    if all(campo in instance.__dict__ for campo in CAMPOS_RESUMO):
+        instance._resumo_original = tuple(instance.__dict__[campo] for campo in CAMPOS_RESUMO)
+    else:
+        instance._resumo_original = None
+
+
+@receiver(pre_save, sender=Inventario)
+def ler_sala_anterior(sender, instance, **kwargs):
+    # Estado original desconhecido: a sala de antes do save vem do banco, para
+    # reconstruir também o setor de onde o item saiu
+    if not instance._state.adding and getattr(instance, '_resumo_original', None) is None:
+        instance._resumo_sala_anterior = (Inventario.objects.filter(pk=instance.pk)
+                                          .values_list('sala_atual_id', flat=True).first())
+
+
+@receiver(post_save, sender=Inventario)
+def resumir_inventario_salvo(sender, instance, created, **kwargs):
+    atual = tuple(getattr(instance, campo) for campo in CAMPOS_RESUMO)
+    original = None if created else getattr(instance, '_resumo_original', None)
+    if created or (original is not None and original != atual):
+        setores = setores_das_salas(atual[0], original[0] if original else None)
+        deltas = novos_deltas()
+        if original:
+            somar_item(deltas, setores.get(original[0]), *original[1:], sinal=-1)
+        somar_item(deltas, setores.get(atual[0]), *atual[1:])
+        aplicar_deltas_resumo(deltas)
+    elif original is None:
+        salas = (atual[0], getattr(instance, '_resumo_sala_anterior', None))
+        reconstruir_resumo(set(setores_das_salas(*salas).values()))
+    instance._resumo_original = atual
+
+
+@receiver(post_delete, sender=Inventario)
+def resumir_inventario_excluido(sender, instance, **kwargs):
+    original = getattr(instance, '_resumo_original', None) or tuple(
+        getattr(instance, campo) for campo in CAMPOS_RESUMO)
+    deltas = novos_deltas()
+    somar_item(deltas, setores_das_salas(original[0]).get(original[0]), *original[1:], sinal=-1)
+    aplicar_deltas_resumo(deltas)
+
+
+@receiver(post_init, sender=Sala)
+def guardar_setor_sala(sender, instance, **kwargs):
+    instance._resumo_setor = instance.__dict__.get('setor_id')
+
+
+@receiver(post_save, sender=Sala)
+def resumir_sala_salva(sender, instance, created, **kwargs):
+    # Sala trocada de setor leva os itens junto
+    anterior = getattr(instance, '_resumo_setor', None)
+    if not created and anterior not in (None, instance.setor_id):
+        reconstruir_resumo({anterior, instance.setor_id})
+    instance._resumo_setor = instance.setor_id
+
+
+@receiver(post_delete, sender=Sala)
+def resumir_sala_excluida(sender, instance, **kwargs):
+    # Os itens da sala ficaram sem sala (SET_NULL)
+    reconstruir_resumo({instance.setor_id, None})
+
+
+@receiver(post_init, sender=Conferencia)
+def guardar_finalizacao_conferencia(sender, instance, **kwargs):
+    instance._resumo_finalizada = instance.__dict__.get('finalizada')
+
+
+@receiver(post_save, sender=Conferencia)
+def resumir_conferencia_finalizada(sender, instance, created, **kwargs):
+    # As mudanças de sala das conferências são gravadas em massa, sem signals
+    if instance.finalizada and (created or getattr(instance, '_resumo_finalizada', None) is False):
+        atualizar_resumo_da_conferencia(instance)
+    instance._resumo_finalizada = instance.finalizada
+
+
+# ========== AUTOCOMPLETAR ==========
+@receiver([post_save, post_delete], sender=Sala)
+@receiver([post_save, post_delete], sender=Setor)
+def invalidar_cache_autocompletar(sender, **kwargs):
+    invalidar_autocompletar()
@@ -0,0 +1,79 @@
+// ============================================
+// SISTEMA DE INVENTÁRIO IFB
+// autocompletar.js - Selects de sala e setor com busca no servidor
+// ============================================
+
+'use strict';
+
+document.addEventListener('DOMContentLoaded', function() {
+    configurarAutocompletar();
+});
+
+// ========== AUTOCOMPLETAR ==========
+// Selects com data-autocompletar trazem só a opção escolhida; as demais são
+// buscadas no servidor conforme o usuário digita
+function configurarAutocompletar() {
+    document.querySelectorAll('select[data-autocompletar]').forEach(select => {
+        const busca = document.createElement('input');
+        busca.type = 'search';
+        busca.className = 'autocompletar-busca';
+        busca.placeholder = 'Digite para buscar...';
+        busca.setAttribute('autocomplete', 'off');
+        select.parentNode.insertBefore(busca, select);
+
+        const aviso = document.createElement('small');
+        aviso.className = 'autocompletar-aviso';
+        select.insertAdjacentElement('afterend', aviso);
+
+        let ultimaBusca = 0;
+
+        function buscar() {
+            const parametros = new URLSearchParams({ q: busca.value.trim() });
+            if (select.dataset.campus) parametros.set('campus', select.dataset.campus);
+            const numero = ++ultimaBusca;
+
+            fetch(`${select.dataset.autocompletar}?${parametros}`, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } })
+                .then(resposta => resposta.ok ? resposta.json() : Promise.reject(resposta.status))
+                .then(dados => {
+                    // Respostas fora de ordem são descartadas
+                    if (numero !== ultimaBusca) return;
+                    preencher(dados);
+                })
+                .catch(() => {
+                    aviso.textContent = 'Não foi possível buscar as opções';
+                });
+        }
+
+        function preencher(dados) {
+            const selecionada = select.selectedOptions[0];
+            const vazia = select.querySelector('option[value=""]');
+            select.innerHTML = '';
+            if (vazia) select.appendChild(vazia);
+            if (selecionada && selecionada.value) select.appendChild(selecionada);
+
+            dados.resultados.forEach(resultado => {
+                if (selecionada && String(resultado.id) === selecionada.value) return;
+                select.appendChild(new Option(resultado.texto, resultado.id));
+            });
+
+            if (!dados.resultados.length) {
+                aviso.textContent = 'Nenhum resultado';
+            } else {
+                aviso.textContent = dados.mais ? 'Mostrando os primeiros resultados; refine a busca' : '';
+            }
+        }
+
+        busca.addEventListener('input', debounce(buscar, 250));
+        busca.addEventListener('keydown', function(e) {
+            // Enter escolhe o primeiro resultado em vez de enviar o formulário
+            if (e.key === 'Enter') {
+                e.preventDefault();
+                const primeira = Array.from(select.options).find(opcao => opcao.value);
+                if (primeira) select.value = primeira.value;
+            }
+        });
+        select.addEventListener('focus', function() {
+            if (select.options.length <= 2 && !busca.value) buscar();
+        }, { once: true });
+    });
+}
@@ -0,0 +1,40 @@
+// ============================================
+// SISTEMA DE INVENTÁRIO IFB
+// dashboard.js - Animação dos totais do painel
+// ============================================
+
+'use strict';
+
+document.addEventListener('DOMContentLoaded', function() {
+    animarEstatisticas();
+});
+
+// ========== ANIMAÇÃO DE ESTATÍSTICAS ==========
+function animarEstatisticas() {
+    const cards = document.querySelectorAll('.card p');
+
+    cards.forEach(card => {
+        const valorFinal = parseInt(card.textContent);
+
+        if (isNaN(valorFinal)) return;
+
+        let valorAtual = 0;
+        const duracao = 1500; // 1.5 segundos
+        const incrementos = 60;
+        const incremento = valorFinal / incrementos;
+        const intervaloTempo = duracao / incrementos;
+
+        card.textContent = '0';
+
+        const intervalo = setInterval(() => {
+            valorAtual += incremento;
+
+            if (valorAtual >= valorFinal) {
+                card.textContent = valorFinal;
+                clearInterval(intervalo);
+            } else {
+                card.textContent = Math.floor(valorAtual);
+            }
+        }, intervaloTempo);
+    });
+}
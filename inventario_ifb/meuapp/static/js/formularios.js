@@ -0,0 +1,117 @@
+// ============================================
+// SISTEMA DE INVENTÁRIO IFB
+// formularios.js - Preview de imagens e contador de caracteres
+// ============================================
+
+'use strict';
+
+document.addEventListener('DOMContentLoaded', function() {
+    configurarPreviewImagens();
+    configurarContadorCaracteres();
+});
+
+// ========== PREVIEW DE IMAGENS ==========
+function configurarPreviewImagens() {
+    const inputsImagem = document.querySelectorAll('input[type="file"]');
+
+    inputsImagem.forEach(input => {
+        input.addEventListener('change', function(e) {
+            const file = e.target.files[0];
+
+            if (!file) return;
+
+            // Validar tipo de arquivo
+            if (!file.type.startsWith('image/')) {
+                mostrarNotificacao('Por favor, selecione apenas arquivos de imagem', 'warning');
+                this.value = '';
+                return;
+            }
+
+            // Validar tamanho (máx 5MB)
+            if (file.size > 5 * 1024 * 1024) {
+                mostrarNotificacao('Imagem muito grande. Tamanho máximo: 5MB', 'error');
+                this.value = '';
+                return;
+            }
+
+            // Remove preview anterior
+            const previewAntigo = this.parentElement.querySelector('.image-preview');
+            if (previewAntigo) previewAntigo.remove();
+
+            // Cria preview
+            const reader = new FileReader();
+
+            reader.onload = function(e) {
+                const preview = document.createElement('div');
+                preview.className = 'image-preview';
+                preview.style.cssText = 'margin-top: 1rem; text-align: center;';
+
+                preview.innerHTML = `
+                    <img src="${e.target.result}"
+                         alt="Preview da imagem"
+                         style="max-width: 100%; max-height: 400px; border-radius: 6px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
+                    <p style="margin-top: 0.75rem; color: #27ae60; font-weight: 600;">
+                        ✓ Imagem carregada: ${file.name} (${formatarTamanho(file.size)})
+                    </p>
+                `;
+
+                input.parentElement.appendChild(preview);
+            };
+
+            reader.readAsDataURL(file);
+        });
+    });
+}
+
+function formatarTamanho(bytes) {
+    if (bytes === 0) return '0 Bytes';
+
+    const k = 1024;
+    const tamanhos = ['Bytes', 'KB', 'MB', 'GB'];
+    const i = Math.floor(Math.log(bytes) / Math.log(k));
+
+    return Math.round((bytes / Math.pow(k, i)) * 100) / 100 + ' ' + tamanhos[i];
+}
+
+// ========== CONTADOR DE CARACTERES ==========
+function configurarContadorCaracteres() {
+    const textareas = document.querySelectorAll('textarea');
+
+    textareas.forEach(textarea => {
+        const maxLength = textarea.getAttribute('maxlength');
+
+        if (!maxLength) return;
+
+        // Cria contador
+        const contador = document.createElement('div');
+        contador.className = 'char-counter';
+        contador.style.cssText = 'text-align: right; font-size: 0.85rem; color: #7f8c8d; margin-top: 0.5rem; font-weight: 500;';
+
+        // Função de atualização
+        const atualizarContador = () => {
+            const atual = textarea.value.length;
+            const restante = maxLength - atual;
+            const percentual = (atual / maxLength) * 100;
+
+            contador.textContent = `${atual} / ${maxLength} caracteres`;
+
+            // Mudar cor conforme limite
+            if (percentual >= 95) {
+                contador.style.color = '#e74c3c';
+                contador.style.fontWeight = '700';
+            } else if (percentual >= 80) {
+                contador.style.color = '#f39c12';
+                contador.style.fontWeight = '600';
+            } else {
+                contador.style.color = '#7f8c8d';
+                contador.style.fontWeight = '500';
+            }
+        };
+
+        textarea.parentElement.appendChild(contador);
+        textarea.addEventListener('input', atualizarContador);
+
+        // Inicializar
+        atualizarContador();
+    });
+}
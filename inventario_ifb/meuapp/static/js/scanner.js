@@ -0,0 +1,473 @@
+// ============================================
+// SISTEMA DE INVENTÁRIO IFB
+// scanner.js - Conferência: scanner, fila offline e confirmação rápida
+// ============================================
+
+'use strict';
+
+document.addEventListener('DOMContentLoaded', function() {
+    configurarScannerCodigoBarras();
+    configurarCarregarMais();
+});
+
+// ========== SCANNER DE CÓDIGO DE BARRAS ==========
+function configurarScannerCodigoBarras() {
+    const campoBusca = document.querySelector('input[name="codigo_patrimonio"]');
+
+    if (!campoBusca) return;
+
+    const scannerOffline = configurarScannerOffline(campoBusca.form);
+    const confirmacaoRapida = configurarConfirmacaoRapida(campoBusca.form, scannerOffline);
+
+    // Confirmação rápida (uma requisição), fila offline ou, sem nenhum dos dois, envio do formulário
+    function enviarCodigo(codigo) {
+        if (confirmacaoRapida && confirmacaoRapida.ativa() && navigator.onLine) {
+            confirmacaoRapida.confirmar(codigo);
+            return true;
+        }
+        return Boolean(scannerOffline && scannerOffline.registrar(codigo));
+    }
+
+    let buffer = '';
+    let ultimaTecla = Date.now();
+
+    // Detectar entrada de scanner (rápida) vs digitação (lenta)
+    campoBusca.addEventListener('keypress', function(e) {
+        const agora = Date.now();
+        const deltaTime = agora - ultimaTecla;
+
+        // Se passou mais de 100ms, reinicia o buffer (provavelmente digitação manual)
+        if (deltaTime > 100) {
+            buffer = '';
+        }
+
+        ultimaTecla = agora;
+
+        // Adiciona caractere ao buffer
+        if (e.key !== 'Enter') {
+            buffer += e.key;
+        }
+
+        // Enter = submeter
+        if (e.key === 'Enter') {
+            e.preventDefault();
+
+            // Se buffer tem mais de 3 caracteres, assume que foi scan
+            if (buffer.length > 3) {
+                this.value = buffer;
+                console.log('📱 Scanner detectado:', buffer);
+            }
+
+            // Valida antes de submeter
+            if (this.value.trim()) {
+                if (enviarCodigo(this.value.trim())) {
+                    this.value = '';
+                    this.focus();
+                } else {
+                    this.form.submit();
+                }
+            } else {
+                mostrarNotificacao('Por favor, digite ou escaneie um código', 'warning');
+                this.focus();
+            }
+
+            buffer = '';
+        }
+    });
+
+    // Validação no submit
+    const form = campoBusca.form;
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            const valor = campoBusca.value.trim();
+
+            if (!valor) {
+                e.preventDefault();
+                mostrarNotificacao('Por favor, digite ou escaneie um código de patrimônio', 'error');
+                campoBusca.focus();
+            } else if (enviarCodigo(valor)) {
+                e.preventDefault();
+                e.stopImmediatePropagation();
+                campoBusca.value = '';
+                campoBusca.focus();
+            }
+        });
+    }
+
+    // Focus automático após carregar
+    setTimeout(() => {
+        campoBusca.focus();
+    }, 100);
+}
+
+// ========== SCANNER OFFLINE (MANIFESTO + FILA) ==========
+const SCANNER_LOTE_MAXIMO = 100;
+const SCANNER_INTERVALO_SYNC = 15000;
+
+function configurarScannerOffline(form) {
+    if (!form || !form.dataset.manifestoUrl || !form.dataset.sincronizarUrl) return null;
+    if (!window.localStorage || !window.fetch) return null;
+
+    const chaveManifesto = `inventario:manifesto:${form.dataset.conferencia}`;
+    const chaveFila = `inventario:fila:${form.dataset.conferencia}`;
+    const corpoTabela = document.getElementById('itens-conferidos-corpo');
+    const status = document.getElementById('fila-status');
+
+    let manifesto = lerStorage(chaveManifesto, null);
+    let sincronizando = false;
+
+    const lerFila = () => lerStorage(chaveFila, { pendentes: [], lotes: [] });
+    const salvarFila = (fila) => salvarStorage(chaveFila, fila);
+
+    function totalNaFila(fila = lerFila()) {
+        return fila.pendentes.length + fila.lotes.reduce((total, lote) => total + lote.itens.length, 0);
+    }
+
+    function jaNaFila(codigo, fila) {
+        return fila.pendentes.some(item => item.codigo === codigo) ||
+            fila.lotes.some(lote => lote.itens.some(item => item.codigo === codigo));
+    }
+
+    function atualizarStatus() {
+        if (!status) return;
+
+        const pendentes = totalNaFila();
+        const partes = [];
+        partes.push(manifesto ? `Manifesto: ${Object.keys(manifesto.itens).length} itens esperados` : 'Manifesto não carregado');
+        partes.push(`${pendentes} na fila`);
+        const comErro = lerFila().lotes.filter(lote => lote.erro);
+        if (comErro.length) partes.push(`${comErro.length} lote(s) recusado(s): ${comErro[0].erro}`);
+        if (!navigator.onLine) partes.push('sem conexão');
+        if (sincronizando) partes.push('sincronizando...');
+        status.textContent = partes.join(' | ');
+    }
+
+    function adicionarLinha(codigo, descricao, situacao) {
+        if (!corpoTabela) return;
+
+        const linha = document.createElement('tr');
+        linha.dataset.codigo = codigo;
+        [codigo, descricao || '—', situacao, '—', new Date().toLocaleString('pt-BR'), '—'].forEach(texto => {
+            const celula = document.createElement('td');
+            celula.textContent = texto;
+            linha.appendChild(celula);
+        });
+        corpoTabela.insertBefore(linha, corpoTabela.firstChild);
+    }
+
+    function atualizarLinha(codigo, situacao) {
+        if (!corpoTabela) return;
+
+        const linha = corpoTabela.querySelector(`tr[data-codigo="${CSS.escape(codigo)}"]`);
+        if (linha && linha.cells[2]) linha.cells[2].textContent = situacao;
+    }
+
+    function registrar(codigo) {
+        if (!manifesto) return false;
+
+        const fila = lerFila();
+        if (manifesto.conferidos.includes(codigo) || jaNaFila(codigo, fila)) {
+            mostrarNotificacao(`Patrimônio ${codigo} já foi conferido`, 'warning');
+            return true;
+        }
+
+        const item = manifesto.itens[codigo];
+        if (item) {
+            mostrarNotificacao(`✓ ${codigo} - ${item[1]}`, 'success');
+        } else {
+            // Pode ser um item de outra sala; o servidor decide na sincronização
+            mostrarNotificacao(`Patrimônio ${codigo} não consta nesta sala. Será verificado ao sincronizar.`, 'warning');
+        }
+
+        fila.pendentes.push({ codigo: codigo });
+        salvarFila(fila);
+        adicionarLinha(codigo, item ? item[1] : '', 'Na fila');
+        atualizarStatus();
+
+        if (fila.pendentes.length >= SCANNER_LOTE_MAXIMO) sincronizar();
+        return true;
+    }
+
+    // Lotes recusados pelo servidor (4xx) ficam na fila com o erro e só são
+    // reenviados quando o usuário tenta finalizar
+    function sincronizar(reenviarRecusados = false) {
+        if (sincronizando || !navigator.onLine) return;
+
+        const fila = lerFila();
+        let lote = fila.lotes.find(lote => reenviarRecusados || !lote.erro);
+        if (!lote && fila.pendentes.length) {
+            // A chave é gerada uma vez por lote e reaproveitada nas novas tentativas
+            lote = { chave: gerarChaveIdempotencia(), itens: fila.pendentes.splice(0, SCANNER_LOTE_MAXIMO) };
+            fila.lotes.push(lote);
+            salvarFila(fila);
+        }
+        if (!lote) return;
+
+        sincronizando = true;
+        let continuar = false;
+        atualizarStatus();
+
+        fetch(form.dataset.sincronizarUrl, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/json',
+                'X-CSRFToken': obterCsrfToken(form)
+            },
+            body: JSON.stringify({ chave: lote.chave, itens: lote.itens })
+        })
+            .then(resposta => resposta.json().then(dados => ({ ok: resposta.ok, codigo: resposta.status, dados: dados })))
+            .then(({ ok, codigo, dados }) => {
+                if (!ok) {
+                    const erro = dados.erro || 'Falha ao sincronizar a fila';
+                    mostrarNotificacao(erro, 'error');
+                    // Erros do cliente não se resolvem sozinhos: o lote fica guardado com o erro
+                    if (codigo >= 400 && codigo < 500) {
+                        marcarRecusado(lote.chave, erro);
+                        continuar = true;
+                    }
+                    return;
+                }
+
+                const situacoes = {
+                    'ok': 'Conferido',
+                    'ja_conferido': 'Já conferido',
+                    'nao_encontrado': 'Não encontrado',
+                    'status_invalido': 'Status inválido'
+                };
+                dados.resultados.forEach(resultado => {
+                    atualizarLinha(resultado.codigo, situacoes[resultado.resultado] || resultado.resultado);
+                    if (resultado.resultado === 'ok' || resultado.resultado === 'ja_conferido') {
+                        manifesto.conferidos.push(resultado.codigo);
+                    }
+                });
+                salvarStorage(chaveManifesto, manifesto);
+                descartarLote(lote.chave);
+                continuar = true;
+
+                const naoEncontrados = dados.totais.nao_encontrado || 0;
+                if (naoEncontrados) {
+                    mostrarNotificacao(`${naoEncontrados} código(s) não encontrado(s) no cadastro`, 'error');
+                }
+            })
+            .catch(() => {
+                // Sem rede ou sessão expirada: o lote continua na fila
+            })
+            .finally(() => {
+                sincronizando = false;
+                atualizarStatus();
+                const restante = lerFila();
+                if (continuar && navigator.onLine && (restante.pendentes.length || restante.lotes.some(l => !l.erro))) {
+                    setTimeout(sincronizar, 0);
+                }
+            });
+    }
+
+    function marcarRecusado(chave, erro) {
+        const fila = lerFila();
+        fila.lotes.forEach(lote => {
+            if (lote.chave !== chave) return;
+            lote.erro = erro;
+            lote.itens.forEach(item => atualizarLinha(item.codigo, `Recusado: ${erro}`));
+        });
+        salvarFila(fila);
+    }
+
+    function descartarLote(chave) {
+        const fila = lerFila();
+        fila.lotes = fila.lotes.filter(lote => lote.chave !== chave);
+        salvarFila(fila);
+    }
+
+    // Baixa o manifesto; sem rede, usa o último salvo
+    fetch(form.dataset.manifestoUrl, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } })
+        .then(resposta => resposta.ok ? resposta.json() : Promise.reject(resposta.status))
+        .then(dados => {
+            manifesto = dados;
+            // Itens ainda na fila continuam contando como pendentes, não conferidos
+            salvarStorage(chaveManifesto, manifesto);
+            atualizarStatus();
+        })
+        .catch(() => {
+            if (!manifesto) {
+                mostrarNotificacao('Manifesto indisponível: os códigos serão enviados um a um', 'warning');
+            }
+        });
+
+    // Reexibe o que ficou na fila de uma sessão anterior
+    const filaInicial = lerFila();
+    filaInicial.lotes.flatMap(lote => lote.itens.map(item => [item, lote.erro]))
+        .concat(filaInicial.pendentes.map(item => [item, null]))
+        .forEach(([item, erro]) => {
+            const dadosItem = manifesto && manifesto.itens[item.codigo];
+            adicionarLinha(item.codigo, dadosItem ? dadosItem[1] : '', erro ? `Recusado: ${erro}` : 'Na fila');
+        });
+
+    // Não finaliza com itens ainda não enviados
+    const btnFinalizar = document.querySelector('button[name="finalizar"]');
+    if (btnFinalizar) {
+        btnFinalizar.addEventListener('click', function(e) {
+            if (totalNaFila() > 0) {
+                e.preventDefault();
+                e.stopImmediatePropagation();
+                mostrarNotificacao('Ainda há itens na fila. Aguarde a sincronização antes de finalizar.', 'warning');
+                sincronizar(true);
+            }
+        });
+    }
+
+    window.addEventListener('online', () => sincronizar());
+    window.addEventListener('offline', atualizarStatus);
+    setInterval(() => sincronizar(), SCANNER_INTERVALO_SYNC);
+
+    atualizarStatus();
+    sincronizar();
+
+    function marcarConferido(codigo) {
+        if (!manifesto || manifesto.conferidos.includes(codigo)) return;
+        manifesto.conferidos.push(codigo);
+        salvarStorage(chaveManifesto, manifesto);
+    }
+
+    return { registrar: registrar, sincronizar: () => sincronizar(), pendentes: totalNaFila, marcarConferido: marcarConferido };
+}
+
+// ========== CONFIRMAÇÃO RÁPIDA ==========
+const CHAVE_CONFIRMACAO_RAPIDA = 'inventario:confirmacao-rapida';
+
+function configurarConfirmacaoRapida(form, scannerOffline) {
+    const opcao = document.getElementById('modo-rapido');
+    if (!form || !form.dataset.confirmacaoRapidaUrl || !opcao || !window.fetch) return null;
+
+    const corpoTabela = document.getElementById('itens-conferidos-corpo');
+    const campoBusca = form.querySelector('input[name="codigo_patrimonio"]');
+
+    opcao.checked = lerStorage(CHAVE_CONFIRMACAO_RAPIDA, true);
+    opcao.addEventListener('change', function() {
+        salvarStorage(CHAVE_CONFIRMACAO_RAPIDA, opcao.checked);
+        if (campoBusca) campoBusca.focus();
+    });
+
+    function atualizarTotais(totais) {
+        Object.entries(totais || {}).forEach(([campo, valor]) => {
+            document.querySelectorAll(`[data-total="${campo}"]`).forEach(elemento => {
+                elemento.textContent = valor;
+            });
+        });
+    }
+
+    function inserirLinha(codigo, html) {
+        if (!corpoTabela || !html) return;
+
+        // Substitui a linha provisória da fila offline, se houver
+        const existente = corpoTabela.querySelector(`tr[data-codigo="${CSS.escape(codigo)}"]`);
+        if (existente) existente.remove();
+        corpoTabela.insertAdjacentHTML('afterbegin', html);
+    }
+
+    // Sem rede ou sessão expirada: usa a fila offline ou o formulário tradicional
+    function alternativa(codigo) {
+        if (scannerOffline && scannerOffline.registrar(codigo)) return;
+        campoBusca.value = codigo;
+        form.submit();
+    }
+
+    function confirmar(codigo) {
+        const dados = new FormData();
+        dados.append('codigo_patrimonio', codigo);
+
+        fetch(form.dataset.confirmacaoRapidaUrl, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: { 'Accept': 'application/json', 'X-CSRFToken': obterCsrfToken(form) },
+            body: dados
+        })
+            .then(resposta => resposta.json().then(corpo => ({ ok: resposta.ok, corpo: corpo })))
+            .then(({ ok, corpo }) => {
+                if (!ok) {
+                    mostrarNotificacao(corpo.erro || 'Não foi possível confirmar o item', 'error');
+                    return;
+                }
+
+                atualizarTotais(corpo.totais);
+                if (corpo.resultado === 'ok') {
+                    inserirLinha(codigo, corpo.linha);
+                    if (scannerOffline) scannerOffline.marcarConferido(codigo);
+                    mostrarNotificacao(`✓ ${corpo.mensagem}`, 'success');
+                } else if (corpo.resultado === 'ja_conferido') {
+                    if (scannerOffline) scannerOffline.marcarConferido(codigo);
+                    mostrarNotificacao(corpo.mensagem, 'warning');
+                } else if (corpo.resultado === 'detalhar') {
+                    // Itens danificados/inutilizados passam pelo formulário completo
+                    mostrarNotificacao(corpo.mensagem, 'warning');
+                    window.location.href = corpo.url;
+                } else {
+                    mostrarNotificacao(corpo.mensagem || `Patrimônio ${codigo} não encontrado`, 'error');
+                }
+            })
+            .catch(() => alternativa(codigo));
+    }
+
+    return { confirmar: confirmar, ativa: () => opcao.checked };
+}
+
+function lerStorage(chave, padrao) {
+    try {
+        const valor = localStorage.getItem(chave);
+        return valor ? JSON.parse(valor) : padrao;
+    } catch (e) {
+        return padrao;
+    }
+}
+
+function salvarStorage(chave, valor) {
+    try {
+        localStorage.setItem(chave, JSON.stringify(valor));
+    } catch (e) {
+        console.warn('⚠️ Não foi possível salvar no armazenamento local:', e);
+    }
+}
+
+function gerarChaveIdempotencia() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+}
+
+function obterCsrfToken(form) {
+    const campo = form && form.querySelector('input[name="csrfmiddlewaretoken"]');
+    if (campo) return campo.value;
+
+    const cookie = document.cookie.split(';').map(c => c.trim()).find(c => c.startsWith('csrftoken='));
+    return cookie ? decodeURIComponent(cookie.split('=')[1]) : '';
+}
+
+// ========== CARREGAR MAIS ITENS ==========
+function configurarCarregarMais() {
+    const botao = document.querySelector('button.carregar-mais');
+    const corpoTabela = document.getElementById('itens-conferidos-corpo');
+
+    if (!botao || !corpoTabela) return;
+
+    botao.addEventListener('click', function() {
+        botao.disabled = true;
+
+        fetch(`${botao.dataset.url}?antes=${encodeURIComponent(botao.dataset.cursor)}`, { credentials: 'same-origin' })
+            .then(resposta => resposta.ok ? resposta : Promise.reject(resposta.status))
+            .then(resposta => resposta.text().then(html => {
+                corpoTabela.insertAdjacentHTML('beforeend', html);
+
+                const proximo = resposta.headers.get('X-Proximo-Cursor');
+                if (proximo) {
+                    botao.dataset.cursor = proximo;
+                    botao.disabled = false;
+                } else {
+                    botao.remove();
+                }
+            }))
+            .catch(() => {
+                botao.disabled = false;
+                mostrarNotificacao('Não foi possível carregar mais itens', 'error');
+            });
+    });
+}
@@ -1,7 +1,11 @@
 // ============================================
 // SISTEMA DE INVENTÁRIO IFB
-// script.js - Arquivo de Scripts Principal
+// script.js - Scripts comuns a todas as páginas
 // ============================================
+// Os módulos de cada página (scanner.js, formularios.js, autocompletar.js,
+// dashboard.js) usam as funções daqui (mostrarNotificacao, debounce...) e
+// são carregados depois dele. O collectstatic minifica e gera as versões
+// com hash e comprimidas (ver meuapp/estaticos.py).
 
 'use strict';
 
@@ -12,16 +16,12 @@ document.addEventListener('DOMContentLoaded', function() {
     // Executar funções de inicialização
     inicializarSistema();
     configurarMenuMobile();
-    configurarScannerCodigoBarras();
     configurarConfirmacoes();
     configurarMensagens();
-    configurarPreviewImagens();
-    configurarContadorCaracteres();
     configurarValidacaoFormularios();
     configurarLoadingState();
     configurarAtalhosTeclado();
     configurarTabelasResponsivas();
-    animarEstatisticas();
 
     console.log('✅ Todas as funcionalidades carregadas');
     console.log('💡 Atalhos disponíveis: Alt+N (Novo) | Alt+S (Salvar) | Esc (Cancelar)');
@@ -94,74 +94,6 @@ function criarBotaoMenuMobile(nav) {
     });
 }
 
-// ========== SCANNER DE CÓDIGO DE BARRAS ==========
-function configurarScannerCodigoBarras() {
-    const campoBusca = document.querySelector('input[name="codigo_patrimonio"]');
-
-    if (!campoBusca) return;
-
-    let buffer = '';
-    let ultimaTecla = Date.now();
-
-    // Detectar entrada de scanner (rápida) vs digitação (lenta)
-    campoBusca.addEventListener('keypress', function(e) {
-        const agora = Date.now();
-        const deltaTime = agora - ultimaTecla;
-
-        // Se passou mais de 100ms, reinicia o buffer (provavelmente digitação manual)
-        if (deltaTime > 100) {
-            buffer = '';
-        }
-
-        ultimaTecla = agora;
-
-        // Adiciona caractere ao buffer
-        if (e.key !== 'Enter') {
-            buffer += e.key;
-        }
-
-        // Enter = submeter
-        if (e.key === 'Enter') {
-            e.preventDefault();
-
-            // Se buffer tem mais de 3 caracteres, assume que foi scan
-            if (buffer.length > 3) {
-                this.value = buffer;
-                console.log('📱 Scanner detectado:', buffer);
-            }
-
-            // Valida antes de submeter
-            if (this.value.trim()) {
-                this.form.submit();
-            } else {
-                mostrarNotificacao('Por favor, digite ou escaneie um código', 'warning');
-                this.focus();
-            }
-
-            buffer = '';
-        }
-    });
-
-    // Validação no submit
-    const form = campoBusca.form;
-    if (form) {
-        form.addEventListener('submit', function(e) {
-            const valor = campoBusca.value.trim();
-
-            if (!valor) {
-                e.preventDefault();
-                mostrarNotificacao('Por favor, digite ou escaneie um código de patrimônio', 'error');
-                campoBusca.focus();
-            }
-        });
-    }
-
-    // Focus automático após carregar
-    setTimeout(() => {
-        campoBusca.focus();
-    }, 100);
-}
-
 // ========== CONFIRMAÇÕES ==========
 function configurarConfirmacoes() {
     // Links de exclusão
@@ -258,112 +190,6 @@ function criarContainerMensagens() {
     return container;
 }
 
-// ========== PREVIEW DE IMAGENS ==========
-function configurarPreviewImagens() {
-    const inputsImagem = document.querySelectorAll('input[type="file"]');
-
-    inputsImagem.forEach(input => {
-        input.addEventListener('change', function(e) {
-            const file = e.target.files[0];
-
-            if (!file) return;
-
-            // Validar tipo de arquivo
-            if (!file.type.startsWith('image/')) {
-                mostrarNotificacao('Por favor, selecione apenas arquivos de imagem', 'warning');
-                this.value = '';
-                return;
-            }
-
-            // Validar tamanho (máx 5MB)
-            if (file.size > 5 * 1024 * 1024) {
-                mostrarNotificacao('Imagem muito grande. Tamanho máximo: 5MB', 'error');
-                this.value = '';
-                return;
-            }
-
-            // Remove preview anterior
-            const previewAntigo = this.parentElement.querySelector('.image-preview');
-            if (previewAntigo) previewAntigo.remove();
-
-            // Cria preview
-            const reader = new FileReader();
-
-            reader.onload = function(e) {
-                const preview = document.createElement('div');
-                preview.className = 'image-preview';
-                preview.style.cssText = 'margin-top: 1rem; text-align: center;';
-
-                preview.innerHTML = `
-                    <img src="${e.target.result}"
-                         alt="Preview da imagem"
-                         style="max-width: 100%; max-height: 400px; border-radius: 6px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                    <p style="margin-top: 0.75rem; color: #27ae60; font-weight: 600;">
-                        ✓ Imagem carregada: ${file.name} (${formatarTamanho(file.size)})
-                    </p>
-                `;
-
-                input.parentElement.appendChild(preview);
-            };
-
-            reader.readAsDataURL(file);
-        });
-    });
-}
-
-function formatarTamanho(bytes) {
-    if (bytes === 0) return '0 Bytes';
-
-    const k = 1024;
-    const tamanhos = ['Bytes', 'KB', 'MB', 'GB'];
-    const i = Math.floor(Math.log(bytes) / Math.log(k));
-
-    return Math.round((bytes / Math.pow(k, i)) * 100) / 100 + ' ' + tamanhos[i];
-}
-
-// ========== CONTADOR DE CARACTERES ==========
-function configurarContadorCaracteres() {
-    const textareas = document.querySelectorAll('textarea');
-
-    textareas.forEach(textarea => {
-        const maxLength = textarea.getAttribute('maxlength');
-
-        if (!maxLength) return;
-
-        // Cria contador
-        const contador = document.createElement('div');
-        contador.className = 'char-counter';
-        contador.style.cssText = 'text-align: right; font-size: 0.85rem; color: #7f8c8d; margin-top: 0.5rem; font-weight: 500;';
-
-        // Função de atualização
-        const atualizarContador = () => {
-            const atual = textarea.value.length;
-            const restante = maxLength - atual;
-            const percentual = (atual / maxLength) * 100;
-
-            contador.textContent = `${atual} / ${maxLength} caracteres`;
-
-            // Mudar cor conforme limite
-            if (percentual >= 95) {
-                contador.style.color = '#e74c3c';
-                contador.style.fontWeight = '700';
-            } else if (percentual >= 80) {
-                contador.style.color = '#f39c12';
-                contador.style.fontWeight = '600';
-            } else {
-                contador.style.color = '#7f8c8d';
-                contador.style.fontWeight = '500';
-            }
-        };
-
-        textarea.parentElement.appendChild(contador);
-        textarea.addEventListener('input', atualizarContador);
-
-        // Inicializar
-        atualizarContador();
-    });
-}
-
 // ========== VALIDAÇÃO DE FORMULÁRIOS ==========
 function configurarValidacaoFormularios() {
     const formularios = document.querySelectorAll('form');
@@ -520,36 +346,6 @@ function configurarTabelasResponsivas() {
     });
 }
 
-// ========== ANIMAÇÃO DE ESTATÍSTICAS ==========
-function animarEstatisticas() {
-    const cards = document.querySelectorAll('.card p');
-
-    cards.forEach(card => {
-        const valorFinal = parseInt(card.textContent);
-
-        if (isNaN(valorFinal)) return;
-
-        let valorAtual = 0;
-        const duracao = 1500; // 1.5 segundos
-        const incrementos = 60;
-        const incremento = valorFinal / incrementos;
-        const intervaloTempo = duracao / incrementos;
-
-        card.textContent = '0';
-
-        const intervalo = setInterval(() => {
-            valorAtual += incremento;
-
-            if (valorAtual >= valorFinal) {
-                card.textContent = valorFinal;
-                clearInterval(intervalo);
-            } else {
-                card.textContent = Math.floor(valorAtual);
-            }
-        }, intervaloTempo);
-    });
-}
-
 // ========== UTILITÁRIOS ==========
 
 // Debounce - evita execução excessiva de funções
@@ -1,3 +1,1537 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection, transaction
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from django.utils.text import Truncator
+from PIL import Image
+from pypdf import PdfReader
+
+from . import banco, conciliacao, etiquetas as modulo_etiquetas, forms as modulo_forms, metricas, urls as meuapp_urls
+from .admin import ADMIN_INLINE_MAX_ITENS
+from .autocompletar import autocompletar_salas, autocompletar_setores
+from .banco import aplicar_pragmas, repetir_escrita
+from .benchmark import CENARIOS, executar_benchmark
+from .busca import buscar_ids, filtrar_busca
+from .conciliacao import atualizar_conciliacao
+from .conferencias import registrar_itens
+from .dados_sinteticos import gerar_dados
+from .forms import InventarioForm
+from .depreciacao import calcular_valores, depreciar
+from .imagens import concluir_imagem, enfileirar_imagem, processar_imagem, processar_pendentes, reservar_imagens
+from .instrumentacao import ContadorConsultas
+from .models import (ConciliacaoItem, ConciliacaoSala, Conferencia, ImagemPendente, Inventario,
+                     ItemConferencia, Movimentacao, RelatorioJob, ResumoInventario, Sala, Setor)
+from .movimentacoes import (itens_na_sala_em, itens_na_sala_no_periodo, reconstruir_de_conferencias,
+                            registrar_movimentacoes, sala_em)
+from .paginacao import codificar_cursor
+from .relatorios import fingerprint_inventarios, processar_job, reservar_proximo_job, solicitar_relatorio_pdf
+from .resumos import reconstruir_resumo
+
+MEDIA_TESTES = tempfile.mkdtemp(prefix='meuapp_testes_')
+
+
+def criar_dados(escala):
+    """Cria uma base proporcional a `escala`: setores, 2 salas por setor,
+    `escala` itens por sala e uma conferência aberta com `escala` itens conferidos.
+    """
+    # staff para também acessar /metricas/
+    usuario = User.objects.create_user('operador', password='senha-de-teste', is_staff=True)
+    setores = [Setor.objects.create(nome=f'Setor {i}', sigla=f'S{i}', campus='Campus Brasília')
+               for i in range(escala)]
+    salas = [Sala.objects.create(numero=100 + i, setor=setores[i // 2]) for i in range(escala * 2)]
+
+    tipos = [valor for valor, _ in Inventario.TIPO_CHOICES]
+    inventarios = Inventario.objects.bulk_create([
+        Inventario(
+            codigo=f'PAT-{sala.numero}-{i:04d}',
+            descricao=f'Item {i} da sala {sala.numero}',
+            tipo=tipos[i % len(tipos)],
+            valor_aquisicao=1000.0 + i,
+            sala_atual=sala,
+        )
+        for sala in salas for i in range(escala)
+    ])
+
+    for sala in salas:
+        Conferencia.objects.create(sala=sala, ano=2024, usuario=usuario, finalizada=True)
+    conferencia = Conferencia.objects.create(sala=salas[0], ano=2025, usuario=usuario)
+    for inventario in inventarios[:escala]:
+        ItemConferencia.objects.create(conferencia=conferencia, inventario=inventario, status_conferido='bom')
+
+    job = RelatorioJob.objects.create(chave='a' * 40, fingerprint='b' * 40, status='concluido', usuario=usuario)
+    job.arquivo.save('relatorio_teste.pdf', ContentFile(b'%PDF-1.4'), save=True)
+    atualizar_conciliacao(2025)
+
+    return {
+        'usuario': usuario,
+        'setor': setores[0],
+        'sala': salas[0],
+        'inventario': inventarios[0],
+        'inventario_novo': inventarios[-1],
+        'codigos_sala': [inv.codigo for inv in inventarios[:escala]],
+        'conferencia': conferencia,
+        'job': job,
+        'primeiro_item': conferencia.itens.order_by('-id').first(),
+    }
+
+
+def json_lote(dados):
+    return json.dumps({'codigos': dados['codigos_sala'] + ['NAO-EXISTE']})
+
+
+def json_sincronizacao(dados):
+    return json.dumps({'chave': 'chave-teste', 'itens': [{'codigo': c} for c in dados['codigos_sala']]})
+
+
+def formulario_confirmacao_rapida(dados):
+    return {'codigo_patrimonio': dados['inventario_novo'].codigo}
+
+
+# nome da URL -> (método, argumentos, corpo JSON ou formulário, querystring, orçamento de consultas)
+# Os orçamentos incluem as consultas de sessão e usuário da autenticação e são
+# medidos com o cache vazio (listagens com contagem aproximada ainda sem cache).
+ROTAS = {
+    'login': ('get', lambda d: [], None, '', 2),
+    'logout': ('get', lambda d: [], None, '', 4),
+    'principal': ('get', lambda d: [], None, '', 3),
+    'autocompletar_salas': ('get', lambda d: [], None, 'q=S 1', 3),
+    'autocompletar_setores': ('get', lambda d: [], None, 'q=s', 3),
+
+    'setor_list': ('get', lambda d: [], None, '', 3),
+    'setor_create': ('get', lambda d: [], None, '', 2),
+    'setor_update': ('get', lambda d: [d['setor'].pk], None, '', 3),
+    'setor_delete': ('get', lambda d: [d['setor'].pk], None, '', 3),
+
+    'sala_list': ('get', lambda d: [], None, '', 3),
+    'sala_create': ('get', lambda d: [], None, '', 2),
+    'sala_update': ('get', lambda d: [d['sala'].pk], None, '', 4),
+    'sala_delete': ('get', lambda d: [d['sala'].pk], None, '', 3),
+
+    'inventario_list': ('get', lambda d: [], None, '', 5),
+    'inventario_create': ('get', lambda d: [], None, '', 2),
+    'inventario_update': ('get', lambda d: [d['inventario'].pk], None, '', 4),
+    'inventario_delete': ('get', lambda d: [d['inventario'].pk], None, '', 3),
+    'buscar_inventarios': ('get', lambda d: [], None, 'q=item sala', 6),
+    'relatorio_pdf': ('get', lambda d: [], None, '', 6),
+    'relatorio_pdf_status': ('get', lambda d: [d['job'].pk], None, '', 3),
+    'relatorio_pdf_download': ('get', lambda d: [d['job'].pk], None, '', 3),
+    'relatorio_csv': ('get', lambda d: [], None, 'status=bom', 3),
+    'relatorio_xlsx': ('get', lambda d: [], None, '', 3),
+
+    'conferencia_list': ('get', lambda d: [], None, '', 5),
+    'conferencia_create': ('get', lambda d: [], None, '', 2),
+    'conferencia_update': ('get', lambda d: [d['conferencia'].pk], None, '', 4),
+    'conferencia_delete': ('get', lambda d: [d['conferencia'].pk], None, '', 5),
+
+    'conciliacao': ('get', lambda d: [], None, lambda d: f"ano=2025&sala={d['sala'].pk}", 6),
+    'analise': ('get', lambda d: [], None, lambda d: f"setor={d['setor'].pk}", 5),
+    'analise_csv': ('get', lambda d: [], None, '', 4),
+    'etiquetas': ('get', lambda d: [], None,
+                  lambda d: f"sala={d['sala'].pk}&formato=a4_3x8&simbologia=code128&copias=1&gerar=1", 5),
+    'metricas': ('get', lambda d: [], None, '', 2),
+
+    'iniciar_conferencia': ('get', lambda d: [], None, '', 2),
+    'realizar_conferencia': ('get', lambda d: [d['conferencia'].pk], None, '', 4),
+    'confirmar_item': ('get', lambda d: [d['conferencia'].pk, d['inventario_novo'].pk], None, '', 7),
+    'itens_conferidos': ('get', lambda d: [d['conferencia'].pk], None,
+                         lambda d: f"antes={d['primeiro_item'].pk}", 4),
+    'confirmacao_rapida': ('post', lambda d: [d['conferencia'].pk], formulario_confirmacao_rapida, '', 14),
+    'conferir_itens_lote': ('post', lambda d: [d['conferencia'].pk], json_lote, '', 7),
+    'manifesto_conferencia': ('get', lambda d: [d['conferencia'].pk], None, '', 5),
+    'sincronizar_conferencia': ('post', lambda d: [d['conferencia'].pk], json_sincronizacao, '', 11),
+}
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTES, INSTRUMENTACAO_CONSULTAS=False)
+class OrcamentoConsultasTest(TestCase):
+    """Cada URL nomeada tem um orçamento de consultas que não pode crescer com o volume de dados."""
+
+    ESCALA_PEQUENA = 3
+    ESCALA_GRANDE = 20
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TESTES, ignore_errors=True)
+
+    def medir(self, nome, dados):
+        metodo, argumentos, corpo, querystring, _ = ROTAS[nome]
+        url = reverse(nome, args=argumentos(dados))
+        if callable(querystring):
+            querystring = querystring(dados)
+        if querystring:
+            url = f'{url}?{querystring}'
+
+        cache.clear()
+        self.client.force_login(dados['usuario'])
+        with ContadorConsultas() as contador:
+            if metodo == 'post' and isinstance(corpo(dados), dict):
+                response = self.client.post(url, corpo(dados), HTTP_ACCEPT='application/json')
+            elif metodo == 'post':
+                response = self.client.post(url, corpo(dados), content_type='application/json',
+                                            HTTP_ACCEPT='application/json')
+            else:
+                response = self.client.get(url, HTTP_ACCEPT='application/json' if nome == 'relatorio_pdf' else '*/*')
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+        self.assertLess(response.status_code, 400, f'{nome} respondeu {response.status_code}')
+        return contador
+
+    def medir_todas(self, escala):
+        with transaction.atomic():
+            dados = criar_dados(escala)
+            resultado = {nome: self.medir(nome, dados) for nome in ROTAS}
+            transaction.set_rollback(True)
+        return resultado
+
+    def test_todas_as_rotas_nomeadas_tem_orcamento(self):
+        nomes = {p.name for p in meuapp_urls.urlpatterns if isinstance(p, URLPattern) and p.name}
+        self.assertEqual(nomes - set(ROTAS), set(), 'Defina o orçamento de consultas das novas URLs')
+
+    def test_consultas_dentro_do_orcamento(self):
+        for nome, contador in self.medir_todas(self.ESCALA_GRANDE).items():
+            with self.subTest(url=nome):
+                orcamento = ROTAS[nome][4]
+                self.assertLessEqual(
+                    contador.total, orcamento,
+                    f'{nome}: {contador.total} consultas (orçamento {orcamento}); '
+                    f'repetidas: {list(contador.duplicadas.items())[:3]}',
+                )
+
+    def test_consultas_nao_crescem_com_volume(self):
+        pequena = self.medir_todas(self.ESCALA_PEQUENA)
+        grande = self.medir_todas(self.ESCALA_GRANDE)
+        for nome in ROTAS:
+            with self.subTest(url=nome):
+                self.assertEqual(
+                    grande[nome].total, pequena[nome].total,
+                    f'{nome}: {pequena[nome].total} consultas com escala {self.ESCALA_PEQUENA} '
+                    f'e {grande[nome].total} com escala {self.ESCALA_GRANDE}',
+                )
+
+
+# (URL do admin, argumentos, querystring, orçamento de consultas)
+ROTAS_ADMIN = [
+    ('meuapp_inventario_changelist', lambda d: [], '', 5),
+    ('meuapp_inventario_changelist', lambda d: [], 'tipo__exact=mobiliario&status__exact=bom', 4),
+    ('meuapp_inventario_change', lambda d: [d['inventario'].pk], '', 5),
+    ('meuapp_sala_changelist', lambda d: [], '', 6),
+    ('meuapp_conferencia_changelist', lambda d: [], 'ano=2024', 5),
+    ('meuapp_conferencia_change', lambda d: [d['conferencia'].pk], '', 7),
+    ('meuapp_itemconferencia_changelist', lambda d: [], 'status_conferido__exact=bom', 4),
+    ('meuapp_itemconferencia_changelist', lambda d: [], 'q=PAT-100', 4),
+    ('meuapp_itemconferencia_change', lambda d: [d['primeiro_item'].pk], '', 12),
+    ('meuapp_conciliacaoitem_changelist', lambda d: [], '', 6),
+    ('meuapp_movimentacao_changelist', lambda d: [], '', 5),
+]
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTES, INSTRUMENTACAO_CONSULTAS=False)
+class OrcamentoConsultasAdminTest(TestCase):
+    """As páginas do admin também têm orçamento de consultas, independente do volume."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_TESTES, ignore_errors=True)
+
+    def medir_todas(self, escala):
+        resultado = []
+        with transaction.atomic():
+            dados = criar_dados(escala)
+            admin = User.objects.create_superuser('admin', password='senha-de-teste')
+            for nome, argumentos, querystring, _ in ROTAS_ADMIN:
+                url = reverse(f'admin:{nome}', args=argumentos(dados))
+                cache.clear()
+                ContentType.objects.clear_cache()
+                self.client.force_login(admin)
+                with ContadorConsultas() as contador:
+                    response = self.client.get(f'{url}?{querystring}')
+                self.assertEqual(response.status_code, 200, nome)
+                resultado.append(contador.total)
+            transaction.set_rollback(True)
+        return resultado
+
+    def test_consultas_dentro_do_orcamento_e_sem_crescer(self):
+        pequena = self.medir_todas(3)
+        grande = self.medir_todas(20)
+        for (nome, _, querystring, orcamento), antes, depois in zip(ROTAS_ADMIN, pequena, grande):
+            with self.subTest(url=nome, querystring=querystring):
+                self.assertEqual(depois, antes, f'{nome}: {antes} consultas com escala 3 e {depois} com escala 20')
+                self.assertLessEqual(depois, orcamento, f'{nome}: {depois} consultas (orçamento {orcamento})')
+
+    def test_inline_nao_consulta_por_linha(self):
+        dados = criar_dados(3)
+        admin = User.objects.create_superuser('admin', password='senha-de-teste')
+        self.client.force_login(admin)
+        pagina = self.client.get(reverse('admin:meuapp_conferencia_change', args=[dados['conferencia'].pk]))
+        self.assertContains(pagina, 'vForeignKeyRawIdAdminField')
+        self.assertContains(pagina, Truncator(dados['inventario']).words(14))
+        self.assertNotContains(pagina, f'<option value="{dados["inventario_novo"].pk}"')
+
+    def test_conferencia_grande_sem_inline(self):
+        dados = criar_dados(3)
+        admin = User.objects.create_superuser('admin', password='senha-de-teste')
+        self.client.force_login(admin)
+        url = reverse('admin:meuapp_conferencia_change', args=[dados['conferencia'].pk])
+        self.assertContains(self.client.get(url), 'itens-0-inventario')
+
+        total = ADMIN_INLINE_MAX_ITENS + 1
+        Conferencia.objects.filter(pk=dados['conferencia'].pk).update(total_itens=total)
+        pagina = self.client.get(url)
+        self.assertNotContains(pagina, 'itens-0-inventario')
+        self.assertContains(pagina, f'?conferencia__id__exact={dados["conferencia"].pk}">{total} item(ns)</a>')
+
+    def test_busca_de_itens_sem_like_na_observacao(self):
+        dados = criar_dados(3)
+        item = ItemConferencia.objects.filter(conferencia=dados['conferencia']).first()
+        ItemConferencia.objects.filter(pk=item.pk).update(observacao='Pé da mesa quebrado')
+        self.client.force_login(User.objects.create_superuser('admin', password='senha-de-teste'))
+        url = reverse('admin:meuapp_itemconferencia_changelist')
+        with ContadorConsultas() as contador:
+            pagina = self.client.get(url, {'q': item.inventario.codigo})
+        self.assertIn(item, pagina.context['cl'].result_list)
+        self.assertFalse([sql for sql, _ in contador.consultas if 'observacao' in sql and 'LIKE' in sql])
+        self.assertEqual(list(self.client.get(url, {'q': 'quebrado'}).context['cl'].result_list), [])
+
+
+class ContadorConsultasTest(TestCase):
+
+    def test_detecta_consultas_repetidas(self):
+        setor = Setor.objects.create(nome='Setor', sigla='S', campus='C')
+        Sala.objects.bulk_create([Sala(numero=i, setor=setor) for i in range(3)])
+
+        with ContadorConsultas() as contador:
+            for sala in Sala.objects.all():
+                str(sala.setor)
+
+        self.assertEqual(contador.total, 4)
+        self.assertEqual(list(contador.duplicadas.values()), [3])
+        self.assertGreaterEqual(contador.tempo, 0)
+
+    def test_para_de_registrar_ao_sair(self):
+        with ContadorConsultas() as contador:
+            Setor.objects.count()
+        Setor.objects.count()
+        self.assertEqual(contador.total, 1)
+        self.assertFalse(connection.execute_wrappers)
+
+    @override_settings(INSTRUMENTACAO_CONSULTAS=True)
+    def test_middleware_expoe_cabecalhos(self):
+        response = self.client.get(reverse('login'))
+        self.assertEqual(response['X-Consultas-SQL'], '0')
+        self.assertIn('X-Tempo-SQL-ms', response)
+
+
+class PaginacaoKeysetTest(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('operador', password='senha-de-teste')
+        self.client.force_login(self.usuario)
+        setor = Setor.objects.create(nome='Setor', sigla='S', campus='C')
+        # Números repetidos: o desempate pela pk precisa manter a ordem estável
+        Sala.objects.bulk_create([Sala(numero=i // 3, setor=setor) for i in range(120)])
+
+    def percorrer(self, url):
+        vistos, paginas = [], []
+        while url:
+            response = self.client.get(url)
+            pagina = response.context['page_obj']
+            paginas.append(url)
+            vistos += [sala.pk for sala in pagina]
+            url = reverse('sala_list') + pagina.url_proxima if pagina.tem_proxima else None
+        return vistos, paginas, pagina
+
+    def test_percorre_todas_as_linhas_na_ordem(self):
+        esperado = list(Sala.objects.order_by('numero', 'pk').values_list('pk', flat=True))
+        vistos, paginas, _ = self.percorrer(reverse('sala_list'))
+        self.assertEqual(vistos, esperado)
+        self.assertEqual(len(paginas), 3)
+
+    def test_volta_para_a_pagina_anterior(self):
+        primeira = self.client.get(reverse('sala_list')).context['page_obj']
+        segunda = self.client.get(reverse('sala_list') + primeira.url_proxima).context['page_obj']
+        self.assertTrue(segunda.tem_anterior)
+        volta = self.client.get(reverse('sala_list') + segunda.url_anterior).context['page_obj']
+        self.assertEqual([s.pk for s in volta], [s.pk for s in primeira])
+        self.assertFalse(volta.tem_anterior)
+        self.assertTrue(volta.tem_proxima)
+
+    def test_cursor_invalido_volta_ao_inicio(self):
+        response = self.client.get(reverse('sala_list'), {'cursor': 'lixo!'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['page_obj'].tem_anterior)
+
+        # Base64 e JSON válidos, mas com valores que não cabem nos campos da ordenação
+        for valores in [['x', 1], [[1], {}]]:
+            response = self.client.get(reverse('sala_list'), {'cursor': codificar_cursor(valores, 'anterior')})
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.context['page_obj'].tem_anterior)
+
+    def test_contagem_aproximada_fica_em_cache(self):
+        cache.clear()
+        Inventario.objects.create(codigo='PAT-1', descricao='Mesa', tipo='mobiliario')
+        self.assertEqual(self.client.get(reverse('inventario_list')).context['page_obj'].total, 1)
+        Inventario.objects.create(codigo='PAT-2', descricao='Cadeira', tipo='mobiliario')
+        self.assertEqual(self.client.get(reverse('inventario_list')).context['page_obj'].total, 1)
+
+
+class BuscaInventarioTest(TestCase):
+
+    def setUp(self):
+        self.mesa = Inventario.objects.create(codigo='MOB-0001', descricao='Mesa de reunião', tipo='mobiliario')
+        self.cadeira = Inventario.objects.create(codigo='MOB-0002', descricao='Cadeira giratória',
+                                                 tipo='mobiliario', obs='Encosto com mesa lateral')
+        self.notebook = Inventario.objects.create(codigo='INF-0001', descricao='Notebook', tipo='informatica',
+                                                  numero_serie='SN-ABC123')
+
+    def test_busca_por_texto_prefixo_e_acentos(self):
+        self.assertEqual(set(buscar_ids('mesa')), {self.mesa.pk, self.cadeira.pk})
+        self.assertEqual(buscar_ids('reuniao'), [self.mesa.pk])
+        self.assertEqual(buscar_ids('abc12'), [self.notebook.pk])
+        self.assertEqual(buscar_ids('girat cadeira'), [self.cadeira.pk])
+
+    def test_prefixo_do_codigo_vem_primeiro(self):
+        self.assertEqual(buscar_ids('mob-000'), [self.mesa.pk, self.cadeira.pk])
+        self.assertEqual(buscar_ids('INF'), [self.notebook.pk])
+
+    def test_prefixo_do_codigo_com_acento(self):
+        # UPPER() do SQLite não converte 'é': o prefixo também não pode converter
+        cafe = Inventario.objects.create(codigo='café-01', descricao='Garrafa térmica', tipo='outros')
+        self.assertEqual(buscar_ids('CAFé-0'), [cafe.pk])
+        self.assertEqual(list(filtrar_busca(Inventario.objects.all(), 'café')), [cafe])
+
+    def test_triggers_acompanham_alteracoes(self):
+        self.notebook.descricao = 'Projetor'
+        self.notebook.save()
+        self.assertEqual(buscar_ids('notebook'), [])
+        self.assertEqual(buscar_ids('projetor'), [self.notebook.pk])
+
+        Inventario.objects.filter(pk=self.mesa.pk).update(descricao='Armário')
+        self.assertEqual(buscar_ids('reuniao'), [])
+        self.mesa.delete()
+        self.assertEqual(buscar_ids('armario'), [])
+
+    def test_ranking_inclui_itens_antigos(self):
+        # Item antigo e mais relevante que dezenas de ocorrências mais novas
+        Inventario.objects.bulk_create([
+            Inventario(codigo=f'NOVO-{i}', descricao=f'Suporte {i} de monitor, acompanha parafusos e manual',
+                       tipo='informatica', obs='Revisar monitor') for i in range(30)
+        ])
+        self.assertEqual(buscar_ids('notebook', limite=5), [self.notebook.pk])
+        Inventario.objects.filter(pk=self.notebook.pk).update(descricao='Monitor', obs='Monitor reserva')
+        self.assertEqual(buscar_ids('monitor', limite=5)[0], self.notebook.pk)
+
+    def test_indice_criado_por_migracao(self):
+        # Sem handler de post_migrate: o banco de testes só tem o índice pela migração 0017
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT type, name FROM sqlite_master WHERE tbl_name = 'meuapp_inventario_busca' "
+                           "OR type = 'trigger' AND name LIKE 'meuapp_inventario_busca%%' ORDER BY name")
+            self.assertEqual(cursor.fetchall(), [
+                ('table', 'meuapp_inventario_busca'), ('trigger', 'meuapp_inventario_busca_ad'),
+                ('trigger', 'meuapp_inventario_busca_ai'), ('trigger', 'meuapp_inventario_busca_au'),
+            ])
+
+    def test_filtro_do_admin(self):
+        encontrados = filtrar_busca(Inventario.objects.all(), 'mesa')
+        self.assertEqual(set(encontrados), {self.mesa, self.cadeira})
+        self.assertEqual(filtrar_busca(Inventario.objects.all(), '').count(), 3)
+
+    def test_view_de_busca(self):
+        self.client.force_login(User.objects.create_user('operador', password='senha-de-teste'))
+        response = self.client.get(reverse('buscar_inventarios'), {'q': 'mesa'})
+        self.assertEqual([i.pk for i in response.context['inventarios']][0], self.mesa.pk)
+        self.assertContains(response, 'MOB-0002')
+
+
+class ConciliacaoTest(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('operador', password='senha-de-teste')
+        setor = Setor.objects.create(nome='Setor', sigla='S', campus='C')
+        self.a, self.b, self.c = [Sala.objects.create(numero=n, setor=setor) for n in (1, 2, 3)]
+        criar = lambda codigo, sala: Inventario.objects.create(codigo=codigo, descricao=codigo, tipo='outros',
+                                                               sala_atual=sala)
+        self.a1, self.a2, self.a3 = criar('A1', self.a), criar('A2', self.a), criar('A3', self.a)
+        self.b1, self.x = criar('B1', self.b), criar('X', None)
+
+        self.conferencia_a = Conferencia.objects.create(sala=self.a, ano=2025, usuario=self.usuario)
+        self.conferencia_c = Conferencia.objects.create(sala=self.c, ano=2025, usuario=self.usuario)
+        self.conferir(self.conferencia_a, 'A1', 'B1', 'X')
+        self.conferir(self.conferencia_c, 'A3')
+
+    def conferir(self, conferencia, *codigos):
+        registrar_itens(conferencia, [{'codigo': c, 'status': None, 'observacao': None} for c in codigos])
+
+    def resumo(self, sala):
+        r = ConciliacaoSala.objects.get(sala=sala, ano=2025)
+        return r.esperados, r.encontrados, r.faltantes, r.realocados, r.inesperados
+
+    def test_calcula_os_conjuntos(self):
+        self.assertEqual(atualizar_conciliacao(2025), [self.a.pk, self.b.pk, self.c.pk])
+        self.assertEqual(self.resumo(self.a), (3, 1, 1, 1, 2))
+        self.assertEqual(self.resumo(self.b), (1, 0, 0, 1, 0))
+        self.assertEqual(self.resumo(self.c), (0, 0, 0, 0, 1))
+
+        realocado = ConciliacaoItem.objects.get(ano=2025, sala=self.a, situacao='realocado')
+        self.assertEqual((realocado.inventario, realocado.sala_relacionada), (self.a3, self.c))
+        inesperados = ConciliacaoItem.objects.filter(ano=2025, sala=self.a, situacao='inesperado')
+        self.assertEqual({(i.inventario, i.sala_relacionada) for i in inesperados}, {(self.b1, self.b), (self.x, None)})
+
+    def test_salas_em_lotes(self):
+        atualizar_conciliacao(2025)
+        completo = set(ConciliacaoItem.objects.values_list('sala', 'inventario', 'situacao', 'sala_relacionada'))
+        with mock.patch.object(conciliacao, 'SALAS_POR_LOTE', 1):
+            self.assertEqual(atualizar_conciliacao(2025, completo=True), [self.a.pk, self.b.pk, self.c.pk])
+        self.assertEqual(set(ConciliacaoItem.objects.values_list('sala', 'inventario', 'situacao',
+                                                                 'sala_relacionada')), completo)
+        self.assertEqual(self.resumo(self.a), (3, 1, 1, 1, 2))
+
+    def test_atualizacao_incremental(self):
+        atualizar_conciliacao(2025)
+        self.assertEqual(atualizar_conciliacao(2025), [])
+
+        self.conferir(self.conferencia_a, 'A2')
+        self.assertEqual(atualizar_conciliacao(2025), [self.a.pk])
+        self.assertEqual(self.resumo(self.a), (3, 2, 0, 1, 2))
+
+        ItemConferencia.objects.get(conferencia=self.conferencia_a, inventario=self.b1).delete()
+        self.assertEqual(atualizar_conciliacao(2025), [self.a.pk, self.b.pk])
+        # A exclusão não devolve o item à sala de origem: ele segue cadastrado em A
+        self.assertEqual(self.resumo(self.a), (4, 2, 1, 1, 1))
+        self.assertEqual(self.resumo(self.b), (0, 0, 0, 0, 0))
+
+        # Sem a conferência da sala C, A3 volta a ser esperado lá (onde está cadastrado)
+        self.conferencia_c.delete()
+        self.assertEqual(atualizar_conciliacao(2025), [self.a.pk, self.c.pk])
+        self.assertEqual(self.resumo(self.a), (3, 2, 1, 0, 1))
+        self.assertEqual(self.resumo(self.c), (1, 0, 1, 0, 0))
+
+    def test_escopo_por_setor(self):
+        outro = Setor.objects.create(nome='Outro', sigla='O', campus='C')
+        sala = Sala.objects.create(numero=9, setor=outro)
+        self.assertEqual(atualizar_conciliacao(2025, setor=outro), [sala.pk])
+        self.assertFalse(ConciliacaoSala.objects.filter(sala=self.a).exists())
+
+
+def em(ano, mes, dia):
+    return timezone.make_aware(datetime(ano, mes, dia))
+
+
+class MovimentacaoTest(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('operador', password='senha-de-teste')
+        setor = Setor.objects.create(nome='Setor', sigla='S', campus='C')
+        self.a, self.b, self.c = [Sala.objects.create(numero=n, setor=setor) for n in (1, 2, 3)]
+        self.item = Inventario.objects.create(codigo='M1', descricao='Mesa', tipo='mobiliario', sala_atual=self.a)
+        self.parado = Inventario.objects.create(codigo='M2', descricao='Cadeira', tipo='mobiliario',
+                                                sala_atual=self.a)
+
+    def conferir(self, sala, *codigos):
+        conferencia = Conferencia.objects.create(sala=sala, ano=2025, usuario=self.usuario)
+        registrar_itens(conferencia, [{'codigo': c, 'status': None, 'observacao': None} for c in codigos])
+        return conferencia
+
+    def test_conferencia_registra_e_consultas_no_tempo(self):
+        conferencia = self.conferir(self.b, 'M1')
+        movimentacao = Movimentacao.objects.get()
+        self.assertEqual((movimentacao.sala_anterior, movimentacao.sala, movimentacao.conferencia_id),
+                         (self.a, self.b, conferencia.pk))
+        Movimentacao.objects.update(data=em(2023, 6, 1))
+        registrar_movimentacoes([(self.item.pk, self.b.pk, self.c.pk)], 'cadastro', data=em(2024, 3, 1))
+
+        self.assertEqual(sala_em(self.item.pk, em(2023, 1, 1)), self.a.pk)
+        self.assertEqual(sala_em(self.item.pk, em(2023, 12, 31)), self.b.pk)
+        self.assertEqual(sala_em(self.item.pk, em(2024, 6, 1)), self.c.pk)
+        self.assertEqual(sala_em(self.parado.pk, em(2020, 1, 1)), self.a.pk)
+
+        self.assertEqual(set(itens_na_sala_em(self.a.pk, em(2023, 1, 1))), {self.item, self.parado})
+        self.assertEqual(set(itens_na_sala_em(self.a.pk, em(2023, 12, 31))), {self.parado})
+        self.assertEqual(set(itens_na_sala_em(self.b.pk, em(2023, 12, 31))), {self.item})
+        self.assertEqual(set(itens_na_sala_em(self.b.pk, em(2024, 6, 1))), set())
+        self.assertEqual(set(itens_na_sala_no_periodo(self.b.pk, em(2023, 1, 1), em(2023, 12, 31))), {self.item})
+        self.assertEqual(set(itens_na_sala_no_periodo(self.c.pk, em(2023, 1, 1), em(2023, 12, 31))), set())
+
+    def test_consultas_usam_os_indices(self):
+        plano = (Movimentacao.objects.filter(inventario_id=self.item.pk, data__lte=timezone.now())
+                 .order_by('-data', '-id').values_list('sala_id').explain())
+        self.assertIn('COVERING INDEX movimentacao_item_data_idx', plano)
+        plano = (Movimentacao.objects.filter(sala_id=self.a.pk, data__lte=timezone.now())
+                 .values_list('inventario_id').explain())
+        self.assertIn('COVERING INDEX movimentacao_sala_data_idx', plano)
+
+    def test_reconstroi_a_partir_das_conferencias(self):
+        primeira = self.conferir(self.b, 'M1', 'M2')
+        segunda = self.conferir(self.c, 'M1')
+        self.conferir(self.c, 'M1')  # já estava na sala: não é movimentação
+        ItemConferencia.objects.filter(conferencia=primeira).update(data_conferencia=em(2024, 1, 1))
+        # Conferência antiga, de antes de sala_anterior existir
+        ItemConferencia.objects.filter(conferencia=segunda).update(data_conferencia=em(2024, 5, 1),
+                                                                   sala_anterior=None)
+        Movimentacao.objects.all().delete()
+
+        self.assertEqual(reconstruir_de_conferencias(tamanho_lote=1), 3)
+        self.assertEqual(
+            set(Movimentacao.objects.values_list('inventario__codigo', 'sala_anterior', 'sala', 'data')),
+            {('M1', self.a.pk, self.b.pk, em(2024, 1, 1)), ('M2', self.a.pk, self.b.pk, em(2024, 1, 1)),
+             ('M1', self.b.pk, self.c.pk, em(2024, 5, 1))},
+        )
+        self.assertEqual(reconstruir_de_conferencias(), 0)
+
+    def test_formulario_registra_mudanca_de_sala(self):
+        self.client.force_login(self.usuario)
+        dados = {'codigo': 'M1', 'descricao': 'Mesa', 'tipo': 'mobiliario', 'status': 'bom',
+                 'sala_atual': self.c.pk}
+        self.client.post(reverse('inventario_update', args=[self.item.pk]), dados)
+        self.client.post(reverse('inventario_update', args=[self.item.pk]), {**dados, 'descricao': 'Mesa grande'})
+
+        movimentacao = Movimentacao.objects.get()
+        self.assertEqual((movimentacao.sala_anterior, movimentacao.sala, movimentacao.origem, movimentacao.usuario),
+                         (self.a, self.c, 'cadastro', self.usuario))
+
+
+class ResumoInventarioTest(TestCase):
+    """Os deltas dos signals e da finalização devem chegar ao mesmo resultado do recálculo completo."""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('operador', password='senha-de-teste')
+        self.s1 = Setor.objects.create(nome='Ensino', sigla='CGEN', campus='Gama')
+        self.s2 = Setor.objects.create(nome='Biblioteca', sigla='CDBI', campus='Taguatinga')
+        self.a = Sala.objects.create(numero=1, setor=self.s1)
+        self.b = Sala.objects.create(numero=2, setor=self.s2)
+        criar = lambda codigo, tipo, sala, valor: Inventario.objects.create(
+            codigo=codigo, descricao=codigo, tipo=tipo, sala_atual=sala, valor_aquisicao=valor,
+            valor_depreciado=valor / 2)
+        self.mesa = criar('R1', 'mobiliario', self.a, 500.0)
+        self.pc = criar('R2', 'informatica', self.a, 3000.0)
+        self.armario = criar('R3', 'mobiliario', self.b, 900.0)
+        criar('R4', 'outros', None, 100.0)
+
+    def estado(self):
+        return {
+            (r.setor_id, r.tipo, r.status, r.quantidade, round(r.valor_aquisicao, 2), round(r.valor_depreciado, 2))
+            for r in ResumoInventario.objects.all() if r.quantidade
+        }
+
+    def assertIgualAoRecalculo(self):
+        incremental = self.estado()
+        reconstruir_resumo()
+        self.assertEqual(incremental, self.estado())
+
+    def test_signals_mantem_o_resumo(self):
+        self.assertIn((self.s1.pk, 'mobiliario', 'bom', 1, 500.0, 250.0), self.estado())
+        self.mesa.status = 'danificado'
+        self.mesa.sala_atual = self.b
+        self.mesa.valor_depreciado = 100.0
+        self.mesa.save()
+        self.pc.delete()
+        Inventario.objects.get(pk=self.armario.pk).save()  # sem mudanças
+        self.assertIgualAoRecalculo()
+
+    def test_item_carregado_com_only_muda_de_setor(self):
+        # Estado original desconhecido: os dois setores têm que ser refeitos
+        mesa = Inventario.objects.only('pk', 'sala_atual').get(pk=self.mesa.pk)
+        mesa.sala_atual = self.b
+        mesa.save()
+        self.assertNotIn((self.s1.pk, 'mobiliario', 'bom', 1, 500.0, 250.0), self.estado())
+        self.assertIgualAoRecalculo()
+
+    def test_sala_trocada_de_setor(self):
+        self.a.setor = self.s2
+        self.a.save()
+        self.assertEqual(self.estado(), {(self.s2.pk, 'mobiliario', 'bom', 2, 1400.0, 700.0),
+                                         (self.s2.pk, 'informatica', 'bom', 1, 3000.0, 1500.0),
+                                         (None, 'outros', 'bom', 1, 100.0, 50.0)})
+        self.assertIgualAoRecalculo()
+
+    def test_conferencia_entra_ao_finalizar(self):
+        conferencia = Conferencia.objects.create(sala=self.b, ano=2025, usuario=self.usuario)
+        antes = self.estado()
+        registrar_itens(conferencia, [{'codigo': 'R1', 'status': None, 'observacao': None}])
+        self.assertEqual(self.estado(), antes)
+
+        conferencia.finalizada = True
+        with self.assertNumQueries(8):
+            conferencia.save()
+        self.assertIn((self.s2.pk, 'mobiliario', 'bom', 2, 1400.0, 700.0), self.estado())
+        self.assertIgualAoRecalculo()
+
+    def test_confirmar_em_conferencia_finalizada(self):
+        conferencia = Conferencia.objects.create(sala=self.b, ano=2025, usuario=self.usuario, finalizada=True)
+        self.client.force_login(self.usuario)
+        resposta = self.client.post(reverse('confirmar_item', args=[conferencia.pk, self.mesa.pk]),
+                                    {'status_conferido': 'bom'})
+        self.assertRedirects(resposta, reverse('conferencia_list'), fetch_redirect_response=False)
+        self.assertFalse(conferencia.itens.exists())
+        self.mesa.refresh_from_db()
+        self.assertEqual(self.mesa.sala_atual, self.a)
+        self.assertIgualAoRecalculo()
+
+    def test_pagina_com_drill_down_e_csv(self):
+        self.client.force_login(self.usuario)
+        pagina = self.client.get(reverse('analise'))
+        self.assertContains(pagina, '?campus=Gama')
+        self.assertContains(pagina, '?setor=0')
+        pagina = self.client.get(reverse('analise'), {'campus': 'Gama'})
+        self.assertContains(pagina, f'?setor={self.s1.pk}')
+        pagina = self.client.get(reverse('analise'), {'setor': self.s1.pk})
+        self.assertContains(pagina, 'Informática')
+
+        csv_ = self.client.get(reverse('analise_csv'), {'setor': self.s1.pk}).content.decode().splitlines()
+        self.assertEqual(csv_[0], 'Tipo,Itens,Bom,Danificado,Inutilizado,Valor de Aquisicao,Valor Depreciado')
+        self.assertIn('Mobiliário,1,1,0,0,500.00,250.00', csv_)
+
+
+class AutocompletarTest(TestCase):
+    """Os selects de sala e setor buscam por prefixo no servidor em vez de listar a tabela inteira."""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('operador', password='senha-de-teste')
+        self.ensino = Setor.objects.create(nome='Ensino', sigla='CGEN', campus='Gama')
+        self.biblioteca = Setor.objects.create(nome='Biblioteca', sigla='CDBI', campus='Taguatinga')
+        self.salas = {numero: Sala.objects.create(numero=numero, setor=self.ensino) for numero in (1, 10, 101, 210)}
+        self.sala_biblioteca = Sala.objects.create(numero=10, setor=self.biblioteca)
+        cache.clear()
+
+    def ids(self, resposta):
+        return [resultado['id'] for resultado in resposta['resultados']]
+
+    def test_prefixo_do_numero_e_do_setor(self):
+        self.assertEqual(self.ids(autocompletar_salas('10')),
+                         [self.salas[10].pk, self.sala_biblioteca.pk, self.salas[101].pk])
+        self.assertEqual(self.ids(autocompletar_salas('cgen 10')), [self.salas[10].pk, self.salas[101].pk])
+        self.assertEqual(self.ids(autocompletar_salas('bibl')), [self.sala_biblioteca.pk])
+        self.assertEqual(self.ids(autocompletar_salas('10', campus='Taguatinga')), [self.sala_biblioteca.pk])
+        self.assertEqual(self.ids(autocompletar_setores('c', campus='Gama')), [self.ensino.pk])
+
+        resposta = autocompletar_salas('', limite=2)
+        self.assertEqual(len(resposta['resultados']), 2)
+        self.assertTrue(resposta['mais'])
+
+    def test_cache_invalidado_ao_salvar_sala(self):
+        self.assertEqual(len(autocompletar_salas('2')['resultados']), 1)
+        with self.assertNumQueries(0):
+            autocompletar_salas('2')
+        Sala.objects.create(numero=22, setor=self.biblioteca)
+        self.assertEqual(len(autocompletar_salas('2')['resultados']), 2)
+
+    def test_endpoints(self):
+        self.client.force_login(self.usuario)
+        resposta = self.client.get(reverse('autocompletar_salas'), {'q': '21'}).json()
+        self.assertEqual(resposta, {'resultados': [{'id': self.salas[210].pk, 'texto': 'Sala 210 - CGEN (Gama)'}],
+                                    'mais': False})
+        resposta = self.client.get(reverse('autocompletar_setores'), {'q': 'ensino'}).json()
+        self.assertEqual(self.ids(resposta), [self.ensino.pk])
+
+    def test_select_traz_so_a_opcao_escolhida(self):
+        item = Inventario.objects.create(codigo='A1', descricao='Mesa', tipo='mobiliario', sala_atual=self.salas[101])
+        html = str(InventarioForm(instance=item)['sala_atual'])
+        self.assertIn('data-autocompletar="/autocompletar/salas/"', html)
+        self.assertEqual(html.count('<option'), 2)
+        self.assertIn('selected>Sala 101 - CGEN (Gama)</option>', html)
+
+        dados = {'codigo': 'A1', 'descricao': 'Mesa', 'tipo': 'mobiliario', 'status': 'bom',
+                 'sala_atual': self.sala_biblioteca.pk}
+        form = InventarioForm(dados, instance=item)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['sala_atual'], self.sala_biblioteca)
+        dados['sala_atual'] = 999999
+        self.assertFalse(InventarioForm(dados, instance=item).is_valid())
+
+
+def foto_jpeg(largura=3000, altura=2000, orientacao=6):
+    """JPEG como o de um celular: grande e com a rotação só no EXIF."""
+    imagem = Image.new('RGB', (largura, altura), (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x0112] = orientacao
+    buffer = io.BytesIO()
+    imagem.save(buffer, 'JPEG', quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTES)
+class ProcessamentoImagemTest(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('operador', password='senha-de-teste'))
+        setor = Setor.objects.create(nome='Setor', sigla='S', campus='C')
+        self.sala = Sala.objects.create(numero=1, setor=setor)
+        self.conferencia = Conferencia.objects.create(sala=self.sala, ano=2025, usuario=User.objects.get())
+        self.inventarios = [Inventario.objects.create(codigo=f'PAT-{i}', descricao='Mesa', tipo='mobiliario')
+                            for i in range(2)]
+
+    def enviar(self, inventario, conteudo):
+        url = reverse('confirmar_item', args=[self.conferencia.pk, inventario.pk])
+        return self.client.post(url, {
+            'status_conferido': 'bom',
+            'imagem_observacao': SimpleUploadedFile('foto.jpg', conteudo, content_type='image/jpeg'),
+        })
+
+    def test_upload_vai_para_a_fila_e_o_worker_processa(self):
+        conteudo = foto_jpeg()
+        response = self.enviar(self.inventarios[0], conteudo)
+        self.assertEqual(response.status_code, 302)
+
+        item = ItemConferencia.objects.get(inventario=self.inventarios[0])
+        self.assertFalse(item.imagem_observacao)
+        job = ImagemPendente.objects.get(item=item, status='pendente')
+        with open(f'{MEDIA_TESTES}/{job.arquivo}', 'rb') as spool:
+            self.assertEqual(spool.read(), conteudo)
+
+        with ThreadPoolExecutor(2) as pool:
+            [job] = processar_pendentes(pool, 10)
+        self.assertEqual(job.status, 'concluido', job.erro)
+
+        item.refresh_from_db()
+        with Image.open(item.imagem_observacao.path) as imagem:
+            # Orientação 6 do EXIF: a foto em paisagem vira retrato
+            self.assertEqual(imagem.size, (1067, 1600))
+        with Image.open(item.imagem_miniatura.path) as miniatura:
+            self.assertLessEqual(max(miniatura.size), 240)
+        self.assertFalse(ImagemPendente.objects.filter(status='pendente').exists())
+        with self.assertRaises(FileNotFoundError):
+            open(f'{MEDIA_TESTES}/{job.arquivo}', 'rb')
+
+    def test_fotos_repetidas_sao_guardadas_uma_vez(self):
+        conteudo = foto_jpeg(800, 600, orientacao=1)
+        for inventario in self.inventarios:
+            self.enviar(inventario, conteudo)
+        with ThreadPoolExecutor(2) as pool:
+            jobs = processar_pendentes(pool, 10)
+        self.assertEqual([job.status for job in jobs], ['concluido', 'concluido'])
+        nomes = set(ItemConferencia.objects.values_list('imagem_observacao', flat=True))
+        self.assertEqual(len(nomes), 1)
+
+    def test_foto_antiga_nao_sobrescreve_a_nova(self):
+        self.enviar(self.inventarios[0], foto_jpeg(800, 600, orientacao=1))
+        self.enviar(self.inventarios[0], foto_jpeg(600, 800, orientacao=1))
+        antigo, novo = reservar_imagens(10)
+        with ThreadPoolExecutor(2) as pool:
+            # O job mais novo termina primeiro
+            concluir_imagem(novo, pool.submit(processar_imagem, novo.arquivo))
+            concluir_imagem(antigo, pool.submit(processar_imagem, antigo.arquivo))
+        self.assertEqual((antigo.status, novo.status), ('concluido', 'concluido'))
+        item = ItemConferencia.objects.get(inventario=self.inventarios[0])
+        self.assertEqual(item.imagem_enviada_em, novo.criado_em)
+        with Image.open(item.imagem_observacao.path) as imagem:
+            self.assertEqual(imagem.size, (600, 800))
+
+    def test_arquivo_invalido_registra_erro(self):
+        item = ItemConferencia.objects.create(conferencia=self.conferencia, inventario=self.inventarios[0],
+                                              status_conferido='bom')
+        enfileirar_imagem(item, ContentFile(b'nao e imagem'))
+        with ThreadPoolExecutor(1) as pool:
+            [job] = processar_pendentes(pool, 10)
+        self.assertEqual(job.status, 'erro')
+
+    def test_falha_na_gravacao_nao_deixa_arquivo_na_fila(self):
+        pendentes = os.path.join(MEDIA_TESTES, 'observacoes', 'pendentes')
+        antes = set(os.listdir(pendentes)) if os.path.isdir(pendentes) else set()
+        with mock.patch('meuapp.views.registrar_movimentacoes', side_effect=OperationalError('disk I/O error')):
+            with self.assertRaises(OperationalError):
+                self.enviar(self.inventarios[0], foto_jpeg(80, 60))
+        self.assertFalse(ImagemPendente.objects.exists())
+        self.assertEqual(set(os.listdir(pendentes)) if os.path.isdir(pendentes) else set(), antes)
+
+    def test_job_parado_volta_para_a_fila(self):
+        self.enviar(self.inventarios[0], foto_jpeg(800, 600, orientacao=1))
+        [job] = reservar_imagens(10)
+        self.assertEqual(reservar_imagens(10), [])
+
+        # Worker que morreu no meio: a reserva vence e outro worker pega o job
+        ImagemPendente.objects.filter(pk=job.pk).update(iniciado_em=timezone.now() - timedelta(hours=1))
+        [novo] = reservar_imagens(10)
+        self.assertEqual(novo.pk, job.pk)
+        with ThreadPoolExecutor(1) as pool:
+            self.assertEqual(concluir_imagem(novo, pool.submit(processar_imagem, novo.arquivo)).status, 'concluido')
+            # O primeiro worker termina depois, sem o original: não desfaz a conclusão
+            self.assertEqual(concluir_imagem(job, pool.submit(processar_imagem, job.arquivo)).status, 'concluido')
+        self.assertEqual(ImagemPendente.objects.get().status, 'concluido')
+
+
+class DepreciacaoTest(TestCase):
+
+    def test_metodos(self):
+        valores = [1000.0, 1000.0, 1000.0]
+        idades = [0, 5, 20]
+        self.assertEqual(calcular_valores(valores, idades, 'linear', 10, 0.1, 0.2).tolist(),
+                         [1000.0, 550.0, 100.0])
+        self.assertEqual(calcular_valores(valores, idades, 'saldo_decrescente', 5, 0.1, 0.4).tolist(),
+                         [1000.0, 100.0, 100.0])
+        self.assertEqual(calcular_valores([1000.0], [1], 'saldo_decrescente', 5, 0.1, 0.4).tolist(), [600.0])
+        # Data de aquisição no futuro não valoriza o item
+        self.assertEqual(calcular_valores([1000.0], [-2], 'linear', 10, 0.1, 0.2).tolist(), [1000.0])
+
+    def test_vetorizado_igual_a_formula_escalar(self):
+        valores = [1234.56, 89.9, 15000.0, 0.0, 450.0, 7.77]
+        idades = [0.0, 0.5, 3.25, 1.0, 9.99, 12.4]
+
+        def escalar(valor, idade, metodo, vida, residual, taxa):
+            idade = max(idade, 0)
+            if metodo == 'linear':
+                atual = valor * (1 - (1 - residual) * min(idade / vida, 1))
+            else:
+                atual = valor * (1 - taxa) ** idade
+            return max(atual, valor * residual)
+
+        for parametros in (('linear', 10, 0.1, 0.2), ('saldo_decrescente', 5, 0.1, 0.4),
+                           ('saldo_decrescente', 8, 0.0, 0.25)):
+            atuais = calcular_valores(valores, idades, *parametros)
+            for valor, idade, atual in zip(valores, idades, atuais.tolist()):
+                self.assertAlmostEqual(atual, escalar(valor, idade, *parametros), places=2)
+
+    def test_grava_so_o_que_mudou_e_simula_por_setor(self):
+        setor = Setor.objects.create(nome='Setor', sigla='S1', campus='C')
+        sala = Sala.objects.create(numero=1, setor=setor)
+        mesa = Inventario.objects.create(codigo='M', descricao='Mesa', tipo='mobiliario', valor_aquisicao=1000,
+                                         data_aquisicao=date(2020, 1, 1), sala_atual=sala)
+        Inventario.objects.create(codigo='SEM-DATA', descricao='Cadeira', tipo='mobiliario', valor_aquisicao=500)
+
+        alterados, totais = depreciar(date(2025, 1, 1), simular=True)
+        self.assertEqual(alterados, 1)
+        self.assertEqual(totais['S1'][:2], [1, 1000.0])
+        self.assertAlmostEqual(totais['S1'][2], 549.82, places=2)
+        mesa.refresh_from_db()
+        self.assertIsNone(mesa.valor_depreciado)
+        antes = mesa.atualizado_em
+
+        self.assertEqual(depreciar(date(2025, 1, 1))[0], 1)
+        mesa.refresh_from_db()
+        self.assertAlmostEqual(mesa.valor_depreciado, 549.82, places=2)
+        self.assertGreater(mesa.atualizado_em, antes)
+        self.assertEqual(depreciar(date(2025, 1, 1))[0], 0)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTES)
+class RelatorioJobTest(TestCase):
+
+    def setUp(self):
+        self.setor = Setor.objects.create(nome='Ensino', sigla='CGEN', campus='Gama')
+        self.sala = Sala.objects.create(numero=1, setor=self.setor)
+        Inventario.objects.create(codigo='R1', descricao='Mesa', tipo='mobiliario', sala_atual=self.sala)
+
+    def test_versao_muda_com_salas_e_setores(self):
+        versoes = [fingerprint_inventarios({})]
+        self.sala.numero = 2
+        self.sala.save()
+        versoes.append(fingerprint_inventarios({}))
+        self.setor.sigla = 'CGEN2'
+        self.setor.save()
+        versoes.append(fingerprint_inventarios({}))
+        # O item fica sem sala (SET_NULL por UPDATE, sem mexer no atualizado_em dele)
+        self.sala.delete()
+        versoes.append(fingerprint_inventarios({}))
+        self.assertEqual(len(set(versoes)), 4)
+
+    def test_job_parado_volta_para_a_fila(self):
+        job = solicitar_relatorio_pdf({})
+        self.assertEqual(reservar_proximo_job(), job)
+        self.assertIsNone(reservar_proximo_job())
+
+        RelatorioJob.objects.filter(pk=job.pk).update(iniciado_em=timezone.now() - timedelta(hours=1))
+        self.assertEqual(reservar_proximo_job(), job)
+        self.assertEqual(processar_job(job).status, 'concluido')
+        self.assertIsNone(reservar_proximo_job())
+
+    def test_pasta_temporaria_removida_na_falha(self):
+        pastas = []
+        mkdtemp = tempfile.mkdtemp
+
+        def criar(*args, **kwargs):
+            pastas.append(mkdtemp(*args, **kwargs))
+            return pastas[-1]
+
+        job = solicitar_relatorio_pdf({})
+        with mock.patch('meuapp.relatorios.tempfile.mkdtemp', criar), \
+                mock.patch('meuapp.relatorios._renderizar_parte', side_effect=OSError('disco cheio')):
+            self.assertEqual(processar_job(job).erro, 'disco cheio')
+        with mock.patch('meuapp.relatorios.tempfile.mkdtemp', criar):
+            self.assertEqual(processar_job(job).status, 'concluido')
+        self.assertEqual(len(pastas), 2)
+        self.assertFalse(any(os.path.exists(pasta) for pasta in pastas))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTES)
+class RelatorioExportacaoTest(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('operador', password='senha-de-teste'))
+        setor = Setor.objects.create(nome='Ensino', sigla='CGEN', campus='Gama')
+        self.sala = Sala.objects.create(numero=12, setor=setor)
+        Inventario.objects.create(codigo='E-1', descricao='Mesa, tampo "laminado"', tipo='mobiliario',
+                                  sala_atual=self.sala, valor_aquisicao=1234.5, valor_depreciado=617.25,
+                                  data_aquisicao=date(2021, 3, 15), numero_serie='NS-1')
+        Inventario.objects.create(codigo='E-2', descricao='Cadeira ergonômica', tipo='mobiliario',
+                                  status='danificado')
+
+    def test_csv(self):
+        response = self.client.get(reverse('relatorio_csv'))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        conteudo = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('\r\n', conteudo)
+        linhas = list(csv.reader(io.StringIO(conteudo)))
+        self.assertEqual(linhas, [
+            ['Codigo', 'Descricao', 'Tipo', 'Status', 'Sala Atual', 'Setor'],
+            ['E-1', 'Mesa, tampo "laminado"', 'mobiliario', 'bom', 'Sala 12', 'CGEN'],
+            ['E-2', 'Cadeira ergonômica', 'mobiliario', 'danificado', '', ''],
+        ])
+
+        response = self.client.get(reverse('relatorio_csv'), {'status': 'danificado'})
+        linhas = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual([linha[0] for linha in linhas], ['Codigo', 'E-2'])
+
+    def test_xlsx(self):
+        from openpyxl import load_workbook
+
+        response = self.client.get(reverse('relatorio_xlsx'))
+        self.assertEqual(response['Content-Type'],
+                         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        wb = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        # Uma aba por setor, e os itens sem sala numa aba própria
+        self.assertEqual(sorted(wb.sheetnames), ['CGEN', 'Sem sala'])
+        linhas = list(wb['CGEN'].iter_rows())
+        self.assertEqual([celula.value for celula in linhas[0]], [
+            'Codigo', 'Descricao', 'Tipo', 'Status', 'Sala Atual', 'Data de Aquisicao',
+            'Valor de Aquisicao', 'Valor Depreciado', 'Numero de Serie',
+        ])
+        codigo, descricao, _, status, sala, data, aquisicao, depreciado, serie = linhas[1]
+        self.assertEqual((codigo.value, descricao.value, status.value, sala.value, serie.value),
+                         ('E-1', 'Mesa, tampo "laminado"', 'bom', 'Sala 12', 'NS-1'))
+        self.assertEqual((data.is_date, data.value.date(), data.number_format),
+                         (True, date(2021, 3, 15), 'DD/MM/YYYY'))
+        self.assertEqual((aquisicao.data_type, aquisicao.value, aquisicao.number_format), ('n', 1234.5, '#,##0.00'))
+        self.assertEqual((depreciado.data_type, depreciado.value), ('n', 617.25))
+
+        [sem_sala] = list(wb['Sem sala'].iter_rows(min_row=2, values_only=True))
+        self.assertEqual(sem_sala, ('E-2', 'Cadeira ergonômica', 'mobiliario', 'danificado', None, None, None,
+                                    None, None))
+
+        response = self.client.get(reverse('relatorio_xlsx'), {'status': 'danificado'})
+        self.assertEqual(load_workbook(io.BytesIO(b''.join(response.streaming_content))).sheetnames, ['Sem sala'])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_TESTES)
+class BenchmarkTest(TestCase):
+
+    def test_dados_sinteticos_reproduziveis(self):
+        totais = gerar_dados(campi=1, setores=2, salas=2, itens=10, semente=7)
+        self.assertEqual(totais['inventarios'], Inventario.objects.count())
+        self.assertEqual(totais['itens_conferidos'], ItemConferencia.objects.count())
+        self.assertEqual(sum(Conferencia.objects.values_list('total_itens', flat=True)),
+                         totais['itens_conferidos'])
+        primeira = list(Inventario.objects.order_by('codigo').values_list('descricao', 'status'))
+
+        Inventario.objects.all().delete()
+        gerar_dados(campi=1, setores=2, salas=2, itens=10, semente=7)
+        self.assertEqual(list(Inventario.objects.order_by('codigo').values_list('descricao', 'status')), primeira)
+
+    def test_executa_todos_os_cenarios(self):
+        gerar_dados(campi=1, setores=1, salas=2, itens=5)
+        resultados = executar_benchmark(repeticoes=2, aquecimento=0)
+
+        self.assertEqual(set(resultados), set(CENARIOS))
+        self.assertEqual(resultados['confirmar_item']['status'], [302])
+        self.assertEqual(resultados['relatorio_csv']['status'], [200])
+        for resultado in resultados.values():
+            self.assertLessEqual(resultado['latencia_ms']['p50'], resultado['latencia_ms']['max'])
+            self.assertGreater(resultado['consultas']['min'], 0)
+
+
+class BancoSqliteTest(TransactionTestCase):
+    """Fora de TestCase: a retentativa só atua quando não há transação aberta."""
+
+    def view_que_falha(self, erros):
+        chamadas = []
+
+        @repetir_escrita
+        def view(request):
+            chamadas.append(connection.in_atomic_block)
+            if erros:
+                raise erros.pop(0)
+            return HttpResponse('ok')
+        return view, chamadas
+
+    def test_pragmas_aplicados(self):
+        # Nos testes (DEBUG) o perfil de produção fica desligado: aplica os PRAGMAs direto
+        pragmas = {'synchronous': 'NORMAL', 'cache_size': -64000}
+        with mock.patch.object(banco, 'SQLITE_PRAGMAS', pragmas):
+            aplicar_pragmas(connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -64000)
+
+    def test_repete_escrita_com_banco_bloqueado(self):
+        view, chamadas = self.view_que_falha([OperationalError('database is locked')])
+        self.assertEqual(view(RequestFactory().post('/')).status_code, 200)
+        self.assertEqual(chamadas, [True, True])
+
+    def test_nao_repete_outros_erros_nem_leituras(self):
+        view, chamadas = self.view_que_falha([OperationalError('no such table: x')])
+        with self.assertRaises(OperationalError):
+            view(RequestFactory().post('/'))
+        self.assertEqual(chamadas, [True])
+
+        view, chamadas = self.view_que_falha([OperationalError('database is locked')])
+        with self.assertRaises(OperationalError):
+            view(RequestFactory().get('/'))
+        self.assertEqual(chamadas, [False])
+
+
+class ScannerAsyncTest(TestCase):
+    """O caminho do scanner pelo handler async (como sob o servidor ASGI)."""
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('scanner', password='senha-de-teste')
+        setor = Setor.objects.create(nome='Setor', sigla='S1', campus='C')
+        self.origem = Sala.objects.create(numero=1, setor=setor)
+        self.destino = Sala.objects.create(numero=2, setor=setor)
+        self.inventario = Inventario.objects.create(codigo='A-1', descricao='Mesa', tipo='mobiliario',
+                                                    sala_atual=self.origem)
+        self.conferencia = Conferencia.objects.create(sala=self.destino, ano=2025, usuario=self.usuario)
+
+    async def test_busca_confirma_e_lista(self):
+        cliente = AsyncClient()
+        await cliente.aforce_login(self.usuario)
+        url = reverse('realizar_conferencia', args=[self.conferencia.pk])
+
+        busca = await cliente.post(url, {'codigo_patrimonio': 'A-1'})
+        self.assertRedirects(busca, reverse('confirmar_item', args=[self.conferencia.pk, self.inventario.pk]),
+                             fetch_redirect_response=False)
+        resposta = await cliente.post(busca.url, {'status_conferido': 'danificado', 'observacao': ''})
+        self.assertRedirects(resposta, url, fetch_redirect_response=False)
+
+        pagina = await cliente.get(url)
+        self.assertContains(pagina, 'scanner')  # request.user no template
+        self.assertContains(pagina, 'A-1')
+        item = await ItemConferencia.objects.select_related('inventario').aget(conferencia=self.conferencia)
+        self.assertEqual((item.sala_anterior_id, item.inventario.sala_atual_id), (self.origem.pk, self.destino.pk))
+
+        lote = await cliente.post(reverse('conferir_itens_lote', args=[self.conferencia.pk]),
+                                  json.dumps({'codigos': ['A-1', 'NAO-EXISTE']}), content_type='application/json')
+        self.assertEqual([r['resultado'] for r in lote.json()['resultados']], ['ja_conferido', 'nao_encontrado'])
+
+    async def test_confirmacao_rapida(self):
+        cliente = AsyncClient()
+        await cliente.aforce_login(self.usuario)
+        url = reverse('confirmacao_rapida', args=[self.conferencia.pk])
+        danificado = await Inventario.objects.acreate(codigo='A-2', descricao='Cadeira', tipo='mobiliario',
+                                                      status='danificado', sala_atual=self.origem)
+
+        resposta = (await cliente.post(url, {'codigo_patrimonio': 'A-1'})).json()
+        self.assertEqual(resposta['resultado'], 'ok')
+        self.assertIn('data-codigo="A-1"', resposta['linha'])
+        self.assertEqual(resposta['totais'], {'total_itens': 1, 'total_bom': 1, 'total_danificado': 0,
+                                              'total_inutilizado': 0})
+        inventario = await Inventario.objects.aget(pk=self.inventario.pk)
+        self.assertEqual(inventario.sala_atual_id, self.destino.pk)
+
+        repetido = (await cliente.post(url, {'codigo_patrimonio': 'A-1'})).json()
+        self.assertEqual((repetido['resultado'], repetido['totais']['total_itens']), ('ja_conferido', 1))
+
+        # Item que não está em bom estado vai para o formulário detalhado, sem gravar nada
+        detalhar = (await cliente.post(url, {'codigo_patrimonio': 'A-2'})).json()
+        self.assertEqual(detalhar['resultado'], 'detalhar')
+        self.assertEqual(detalhar['url'], reverse('confirmar_item', args=[self.conferencia.pk, danificado.pk]))
+        self.assertFalse(await ItemConferencia.objects.filter(inventario=danificado).aexists())
+
+        nao_encontrado = (await cliente.post(url, {'codigo_patrimonio': 'NAO-EXISTE'})).json()
+        self.assertEqual(nao_encontrado['resultado'], 'nao_encontrado')
+
+    async def test_finalizar(self):
+        cliente = AsyncClient()
+        await cliente.aforce_login(self.usuario)
+        resposta = await cliente.post(reverse('realizar_conferencia', args=[self.conferencia.pk]), {'finalizar': '1'})
+        self.assertRedirects(resposta, reverse('conferencia_list'), fetch_redirect_response=False)
+        conferencia = await Conferencia.objects.aget(pk=self.conferencia.pk)
+        self.assertTrue(conferencia.finalizada)
+        self.assertIsNotNone(conferencia.data_fim)
+
+    def test_lote_com_tipos_invalidos(self):
+        self.client.force_login(self.usuario)
+        url = reverse('conferir_itens_lote', args=[self.conferencia.pk])
+        for corpo in [{'codigos': 'A-1'}, {'itens': {'codigo': 'A-1'}}, {'codigos': [123]},
+                      {'itens': [{'codigo': 'A-1', 'status': ['bom']}]},
+                      {'itens': [{'codigo': 'A-1', 'observacao': {'texto': 'x'}}]}]:
+            resposta = self.client.post(url, json.dumps(corpo), content_type='application/json')
+            self.assertEqual(resposta.status_code, 400, corpo)
+            self.assertIn('erro', resposta.json())
+        self.assertFalse(ItemConferencia.objects.exists())
+
+    def test_chave_de_sincronizacao_por_conferencia(self):
+        self.client.force_login(self.usuario)
+        outra = Conferencia.objects.create(sala=self.origem, ano=2025, usuario=self.usuario)
+        corpo = json.dumps({'chave': 'mesma-chave', 'itens': [{'codigo': 'A-1'}]})
+
+        def sincronizar(conferencia):
+            return self.client.post(reverse('sincronizar_conferencia', args=[conferencia.pk]), corpo,
+                                    content_type='application/json').json()
+
+        self.assertIs(sincronizar(self.conferencia)['repetido'], False)
+        self.assertIs(sincronizar(self.conferencia)['repetido'], True)
+        # A mesma chave em outra conferência é outro lote, com a resposta dela
+        resposta = sincronizar(outra)
+        self.assertEqual((resposta['repetido'], resposta['conferencia']), (False, outra.pk))
+        self.assertTrue(ItemConferencia.objects.filter(conferencia=outra, inventario=self.inventario).exists())
+
+
+class EstaticosTest(TestCase):
+    """Build do collectstatic e scripts carregados só nas páginas que os usam."""
+
+    def test_build_minifica_com_hash_e_comprimidos(self):
+        destino = tempfile.mkdtemp(prefix='meuapp_estaticos_')
+        self.addCleanup(shutil.rmtree, destino, ignore_errors=True)
+        armazenamento = {**settings.STORAGES, 'staticfiles': {'BACKEND': 'meuapp.estaticos.EstaticosStorage'}}
+        # Só os arquivos do projeto (sem os do admin), para o teste ser rápido
+        with override_settings(STATIC_ROOT=destino, STORAGES=armazenamento,
+                               STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder']):
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+        with open(os.path.join(destino, 'staticfiles.json')) as arquivo:
+            nomes = json.load(arquivo)['paths']
+        for nome in ('js/script.js', 'js/scanner.js', 'css/style.css'):
+            with self.subTest(arquivo=nome):
+                self.assertRegex(nomes[nome], r'\.[0-9a-f]{12}\.(js|css)$')
+                with open(os.path.join(settings.BASE_DIR, 'meuapp', 'static', nome), 'rb') as arquivo:
+                    original = arquivo.read()
+                with open(os.path.join(destino, nomes[nome]), 'rb') as arquivo:
+                    gerado = arquivo.read()
+                self.assertLess(len(gerado), len(original) * 0.8)
+                self.assertNotIn(b'// ==========', gerado)
+                with gzip.open(os.path.join(destino, nomes[nome] + '.gz')) as arquivo:
+                    self.assertEqual(arquivo.read(), gerado)
+                self.assertTrue(os.path.exists(os.path.join(destino, nomes[nome] + '.br')))
+
+    async def test_middleware_serve_em_modo_async(self):
+        cliente = AsyncClient()
+        # A cadeia de middlewares do handler ASGI é montada na primeira requisição
+        with override_settings(WHITENOISE_USE_FINDERS=True):
+            resposta = await cliente.get('/static/js/script.js')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn(b'function', b''.join(resposta.streaming_content))
+        self.assertEqual((await cliente.get('/static/js/nao-existe.js')).status_code, 404)
+
+    def test_scripts_por_pagina(self):
+        usuario = User.objects.create_user('operador', password='senha-de-teste')
+        setor = Setor.objects.create(nome='Ensino', sigla='CGEN', campus='Gama')
+        conferencia = Conferencia.objects.create(sala=Sala.objects.create(numero=1, setor=setor), ano=2025,
+                                                 usuario=usuario)
+        self.client.force_login(usuario)
+
+        def scripts(url):
+            return re.findall(r'<script src="/static/([^"]+)" defer', self.client.get(url).content.decode())
+
+        self.assertEqual(scripts(reverse('principal')), ['js/script.js', 'js/dashboard.js'])
+        self.assertEqual(scripts(reverse('realizar_conferencia', args=[conferencia.pk])),
+                         ['js/script.js', 'js/scanner.js'])
+        self.assertEqual(scripts(reverse('inventario_create')),
+                         ['js/script.js', 'js/formularios.js', 'js/autocompletar.js'])
+        self.assertEqual(scripts(reverse('setor_create')), ['js/script.js', 'js/formularios.js'])
+
+
+class ImportacaoTest(TestCase):
+
+    def test_xlsx_por_aba_e_salas_criadas(self):
+        from openpyxl import Workbook
+
+        caminho = os.path.join(MEDIA_TESTES, 'importacao.xlsx')
+        rejeitados = os.path.join(MEDIA_TESTES, 'importacao.rejeitados.csv')
+        wb = Workbook()
+        primeira = wb.active
+        primeira.title = 'NOVO'
+        primeira.append(['Codigo', 'Descricao', 'Tipo', 'Setor', 'Sala'])
+        primeira.append(['I1', 'Mesa', 'mobiliario', 'NOVO', 7])
+        segunda = wb.create_sheet('Sem setor')
+        segunda.append(['Codigo', 'Descricao', 'Tipo', 'Sala'])
+        segunda.append([None, None, None, None])
+        segunda.append(['I2', 'Cadeira', 'tipo-errado', 7])
+        # Sala criada no lote anterior, achada só pelo número
+        segunda.append(['I3', 'Armário', 'mobiliario', 'Sala 7'])
+        wb.save(caminho)
+
+        call_command('importar_inventario', caminho, '--criar-salas', '--lote', '1', '--rejeitados', rejeitados,
+                     stdout=io.StringIO())
+        sala = Sala.objects.get(numero=7, setor__sigla='NOVO')
+        self.assertEqual(dict(Inventario.objects.values_list('codigo', 'sala_atual')), {'I1': sala.pk, 'I3': sala.pk})
+        with open(rejeitados, encoding='utf-8') as arquivo:
+            linhas = list(csv.DictReader(arquivo))
+        self.assertEqual([(linha['aba'], linha['linha'], linha['codigo']) for linha in linhas],
+                         [('Sem setor', '3', 'I2')])
+
+    def test_arquivo_parcial_nao_apaga_colunas_ausentes(self):
+        setor = Setor.objects.create(nome='Ensino', sigla='CGEN', campus='Gama')
+        sala = Sala.objects.create(numero=1, setor=setor)
+        outra = Sala.objects.create(numero=2, setor=setor)
+        Inventario.objects.create(codigo='P1', descricao='Mesa', tipo='mobiliario', sala_atual=sala,
+                                  valor_aquisicao=1000, data_aquisicao=date(2020, 1, 1), valor_depreciado=600,
+                                  numero_serie='NS-1', obs='Canto da sala')
+
+        # Mesmo cabeçalho do relatório CSV exportado pelo sistema
+        caminho = os.path.join(MEDIA_TESTES, 'parcial.csv')
+        with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+            csv.writer(arquivo).writerows([
+                ['Codigo', 'Descricao', 'Tipo', 'Status', 'Sala Atual', 'Setor'],
+                ['P1', 'Mesa grande', 'mobiliario', 'danificado', 'Sala 2', 'CGEN'],
+                ['P2', 'Cadeira', 'mobiliario', '', '', ''],
+            ])
+        call_command('importar_inventario', caminho, stdout=io.StringIO())
+        item = Inventario.objects.get(codigo='P1')
+        self.assertEqual((item.descricao, item.status, item.sala_atual_id), ('Mesa grande', 'danificado', outra.pk))
+        self.assertEqual((item.valor_aquisicao, item.data_aquisicao, item.valor_depreciado, item.numero_serie,
+                          item.obs), (1000, date(2020, 1, 1), 600, 'NS-1', 'Canto da sala'))
+        self.assertEqual(Inventario.objects.get(codigo='P2').status, 'bom')
+
+        # Sem a coluna da sala o item fica onde está, sem movimentação nova
+        movimentacoes = Movimentacao.objects.count()
+        with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+            csv.writer(arquivo).writerows([['Codigo', 'Descricao', 'Tipo', 'Obs'],
+                                           ['P1', 'Mesa grande', 'mobiliario', '']])
+        call_command('importar_inventario', caminho, stdout=io.StringIO())
+        item.refresh_from_db()
+        self.assertEqual((item.sala_atual_id, item.status, item.obs, item.numero_serie),
+                         (outra.pk, 'danificado', None, 'NS-1'))
+        self.assertEqual(Movimentacao.objects.count(), movimentacoes)
+
+
+class EtiquetasTest(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user('operador', password='senha-de-teste')
+        self.s1 = Setor.objects.create(nome='Ensino', sigla='CGEN', campus='Gama')
+        self.s2 = Setor.objects.create(nome='Biblioteca', sigla='CDBI', campus='Gama')
+        self.a = Sala.objects.create(numero=1, setor=self.s1)
+        self.b = Sala.objects.create(numero=2, setor=self.s2)
+        Inventario.objects.bulk_create(
+            [Inventario(codigo=f'A{i:03d}', descricao=f'Cadeira {i}', sala_atual=self.a,
+                        data_aquisicao=date(2024, 1 + i % 12, 1)) for i in range(30)]
+            + [Inventario(codigo=f'B{i:03d}', descricao='Estante', sala_atual=self.b) for i in range(5)]
+        )
+
+    def gerar(self, filtros, **opcoes):
+        arquivo = io.BytesIO()
+        total = modulo_etiquetas.gerar_etiquetas_pdf(filtros, arquivo, **opcoes)
+        paginas = PdfReader(arquivo).pages
+        return total, len(paginas), ''.join(pagina.extract_text() for pagina in paginas)
+
+    def test_filtros_e_folhas(self):
+        total, paginas, texto = self.gerar({'sala': self.a})
+        self.assertEqual((total, paginas), (30, 2))  # 24 etiquetas por folha A4 3 x 8
+        self.assertIn('A029', texto)
+        self.assertIn('Sala 1 - CGEN', texto)
+        self.assertNotIn('B000', texto)
+
+        total, paginas, texto = self.gerar({'setor': self.s2}, formato='a4_2x7', simbologia='qr', copias=3)
+        self.assertEqual((total, paginas), (15, 2))
+        self.assertEqual(texto.count('B004'), 3)
+
+        self.assertEqual(self.gerar({'desde': date(2024, 11, 1)})[0], 4)  # novembro e dezembro
+
+
+    def test_codigo_fora_do_ascii_sai_em_qr(self):
+        Inventario.objects.create(codigo='CAFÉ-1', descricao='Cafeteira', tipo='eletrodomestico',
+                                  sala_atual=self.b)
+        with self.assertRaises(ValueError):
+            modulo_etiquetas.geometria_codigo('code128', 'CAFÉ-1')
+
+        with mock.patch.object(modulo_etiquetas, 'geometria_codigo',
+                               wraps=modulo_etiquetas.geometria_codigo) as geometria:
+            total, _, texto = self.gerar({'sala': self.b})
+        self.assertEqual(total, 6)
+        self.assertIn('CAFÉ-1', texto)
+        usadas = {chamada.args for chamada in geometria.call_args_list}
+        self.assertIn(('qr', 'CAFÉ-1'), usadas)
+        self.assertIn(('code128', 'B000'), usadas)
+    def test_geometria_em_cache(self):
+        modulo_etiquetas.geometria_codigo.cache_clear()
+        self.gerar({'sala': self.b}, copias=2)
+        self.gerar({'sala': self.b}, simbologia='qr')
+        informacao = modulo_etiquetas.geometria_codigo.cache_info()
+        self.assertEqual((informacao.misses, informacao.hits), (10, 5))
+
+        largura, altura, barras = modulo_etiquetas.geometria_codigo('qr', 'B000')
+        self.assertEqual((largura, altura), (21, 21))  # versão 1
+        self.assertTrue(all(0 <= x and x + w <= largura and 0 <= y < altura for x, y, w, _ in barras))
+
+    def test_lote_paralelo_igual_ao_sequencial(self):
+        _, paginas, sequencial = self.gerar({}, copias=2)
+        with mock.patch.object(modulo_etiquetas, 'ETIQUETAS_LIMITE_PARALELO', 1), \
+                mock.patch.object(modulo_etiquetas, 'ETIQUETAS_POR_PARTE', 20), \
+                mock.patch.object(modulo_etiquetas, 'ETIQUETAS_PROCESSOS', 2):
+            total, paginas_paralelo, paralelo = self.gerar({}, copias=2)
+        # Partes de folhas inteiras (24): nenhuma posição vazia no meio do PDF
+        self.assertEqual((total, paginas_paralelo), (70, paginas))
+        self.assertEqual(paralelo, sequencial)
+
+    def test_pagina_e_comando(self):
+        self.client.force_login(self.usuario)
+        self.assertContains(self.client.get(reverse('etiquetas')), 'Gerar PDF')
+        dados = {'setor': self.s1.pk, 'formato': 'carta_3x10', 'simbologia': 'code128', 'copias': 1, 'gerar': 1}
+        resposta = self.client.get(reverse('etiquetas'), dados)
+        self.assertEqual(resposta['Content-Type'], 'application/pdf')
+        self.assertEqual(len(PdfReader(io.BytesIO(b''.join(resposta.streaming_content))).pages), 1)
+        resposta = self.client.get(reverse('etiquetas'), {**dados, 'desde': '2030-01-01'})
+        self.assertContains(resposta, 'Nenhum item encontrado')
+
+        # Acima do limite da página: recusado antes de gerar, sem pool de processos na requisição
+        with mock.patch.object(modulo_forms, 'ETIQUETAS_LIMITE_WEB', 20), \
+                mock.patch.object(modulo_etiquetas, 'ProcessPoolExecutor') as pool:
+            resposta = self.client.get(reverse('etiquetas'), {**dados, 'setor': ''})
+            self.assertContains(resposta, 'gerar_etiquetas')
+            self.assertContains(resposta, '35 etiquetas')
+            with mock.patch.object(modulo_etiquetas, 'ETIQUETAS_LIMITE_PARALELO', 1):
+                resposta = self.client.get(reverse('etiquetas'), {**dados, 'setor': self.s2.pk})
+                self.assertEqual(resposta['Content-Type'], 'application/pdf')
+        pool.assert_not_called()
+
+        destino = os.path.join(MEDIA_TESTES, 'etiquetas.pdf')
+        saida = io.StringIO()
+        call_command('gerar_etiquetas', destino, '--setor', 'cdbi', '--simbologia', 'qr', stdout=saida)
+        self.assertIn('5 etiqueta(s)', saida.getvalue())
+        self.assertEqual(len(PdfReader(destino).pages), 1)
+
+
+class MetricasTest(TestCase):
+    def setUp(self):
+        self.usuario = User.objects.create_user('operador', password='senha-de-teste')
+        self.admin = User.objects.create_user('admin', password='senha-de-teste', is_staff=True)
+        setor = Setor.objects.create(nome='Ensino', sigla='CGEN', campus='Gama')
+        self.sala = Sala.objects.create(numero=1, setor=setor)
+        Inventario.objects.bulk_create([Inventario(codigo=f'M{i}', descricao='Mesa', sala_atual=self.sala)
+                                        for i in range(3)])
+        self.conferencia = Conferencia.objects.create(sala=self.sala, ano=2025, usuario=self.usuario)
+
+    def valor(self, nome, **rotulos):
+        """Valor do contador, ou [buckets..., soma] do histograma, somado entre as threads."""
+        contadores, histogramas = metricas.coletar()
+        chave = (nome, tuple((rotulo, valor) for rotulo, valor in rotulos.items()))
+        return contadores.get(chave, histogramas.get(chave, 0))
+
+    def quantidade(self, nome, **rotulos):
+        valores = self.valor(nome, **rotulos)
+        return sum(valores[:-1]) if valores else 0
+
+    def test_requisicoes_por_view_com_sql(self):
+        antes = self.quantidade('inventario_http_requisicao_segundos', view='sala_list')
+        self.client.force_login(self.usuario)
+        self.client.get(reverse('sala_list'))
+        self.client.get(reverse('sala_list'))
+        self.client.get('/nao-existe/')
+
+        self.assertEqual(self.quantidade('inventario_http_requisicao_segundos', view='sala_list'), antes + 2)
+        self.assertGreater(self.quantidade('inventario_sql_consultas', view='sala_list'), 0)
+        self.assertGreater(self.valor('inventario_sql_consultas', view='sala_list')[-1], 0)
+        self.assertGreaterEqual(self.valor('inventario_http_requisicoes_total', view='sala_list', metodo='GET',
+                                           status=200), 2)
+        self.assertGreaterEqual(self.quantidade('inventario_http_requisicao_segundos', view='nao_resolvida'), 1)
+
+    def test_relatorios_e_leituras(self):
+        linhas = self.valor('inventario_relatorio_linhas_total', formato='xlsx')
+        self.client.force_login(self.usuario)
+        self.client.get(reverse('relatorio_xlsx'))
+        b''.join(self.client.get(reverse('relatorio_csv')).streaming_content)
+        self.assertEqual(self.valor('inventario_relatorio_linhas_total', formato='xlsx'), linhas + 3)
+        self.assertGreaterEqual(self.quantidade('inventario_relatorio_segundos', formato='csv'), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('conferir_itens_lote', args=[self.conferencia.pk]),
+                             json.dumps({'codigos': ['M0', 'M1', 'NAO-EXISTE']}), content_type='application/json')
+        self.assertEqual(self.valor('inventario_conferencia_leituras_total',
+                                    conferencia=str(self.conferencia.pk)), 3)
+
+    def test_exposicao_protegida(self):
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 403)
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(reverse('metricas')).status_code, 403)
+
+        self.client.force_login(self.admin)
+        resposta = self.client.get(reverse('metricas'))
+        self.assertEqual(resposta['Content-Type'], metricas.CONTENT_TYPE)
+        texto = resposta.content.decode()
+        self.assertIn('# TYPE inventario_http_requisicao_segundos histogram', texto)
+        self.assertRegex(texto, r'inventario_http_requisicao_segundos_bucket\{view="metricas",le="\+Inf"\} \d+')
+
+        self.client.logout()
+        with mock.patch.object(metricas, 'METRICAS_TOKEN', 'segredo'):
+            self.assertEqual(self.client.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer outro').status_code,
+                             403)
+            self.assertEqual(self.client.get(reverse('metricas'), HTTP_AUTHORIZATION='Bearer segredo').status_code,
+                             200)
+
+    def test_exportacao_soma_processos(self):
+        pasta = tempfile.mkdtemp(prefix='meuapp_metricas_')
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        outro = ({('inventario_relatorio_linhas_total', (('formato', 'pdf'),)): 7},
+                 {('inventario_relatorio_segundos', (('formato', 'pdf'),)): [0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 5.5]})
+        # Processo encerrado (pid inexistente)
+        encerrado = os.path.join(pasta, 'processo-99999999-0123abcd.json')
+        with open(encerrado, 'w') as arquivo:
+            json.dump(metricas._serializar(outro), arquivo)
+
+        with mock.patch.object(metricas, 'METRICAS_DIRETORIO', pasta):
+            metricas.registrar_relatorio('pdf', 0.3, 2)
+            texto = metricas.exportar()
+            # O encerrado foi incorporado ao acumulado e apagado, sem contar duas vezes
+            self.assertEqual(sorted(os.listdir(pasta)), ['.trava', 'acumulado.json',
+                                                         os.path.basename(metricas._arquivo_do_processo())])
+            self.assertEqual(metricas.exportar(), texto)
+        proprio = self.valor('inventario_relatorio_linhas_total', formato='pdf')
+        self.assertIn(f'inventario_relatorio_linhas_total{{formato="pdf"}} {proprio + 7}', texto)
+        self.assertIn('inventario_relatorio_segundos_bucket{formato="pdf",le="0.5"} ', texto)
+        # Buckets acumulados: 0.3 e o 0.5 do outro processo ficam até le="0.5"; o 5.5 só em le="10"
+        contagens = dict(re.findall(r'inventario_relatorio_segundos_bucket\{formato="pdf",le="([^"]+)"\} (\d+)',
+                                    texto))
+        self.assertEqual(int(contagens['10']) - int(contagens['5']), 1)
+        self.assertEqual(contagens['+Inf'], re.search(r'inventario_relatorio_segundos_count\{formato="pdf"\} (\d+)',
+                                                     texto).group(1))
+
+    async def test_cadeia_async_sem_adaptacao(self):
+        cliente = AsyncClient()
+        await cliente.aforce_login(self.usuario)
+        antes = self.quantidade('inventario_http_requisicao_segundos', view='confirmacao_rapida')
+        # Com DEBUG o Django registra cada middleware síncrono adaptado ao montar a cadeia ASGI
+        with override_settings(DEBUG=True, INSTRUMENTACAO_CONSULTAS=True), \
+                self.assertLogs('django.request', 'DEBUG') as logs:
+            logging.getLogger('django.request').debug('montando a cadeia')
+            resposta = await cliente.post(reverse('confirmacao_rapida', args=[self.conferencia.pk]),
+                                          {'codigo_patrimonio': 'M0'})
+        self.assertEqual(resposta.json()['resultado'], 'ok')
+        self.assertEqual([linha for linha in logs.output if 'adapted' in linha], [])
+        self.assertGreater(int(resposta['X-Consultas-SQL']), 0)
+        self.assertEqual(self.quantidade('inventario_http_requisicao_segundos', view='confirmacao_rapida'),
+                         antes + 1)
+        self.assertGreater(self.valor('inventario_sql_consultas', view='confirmacao_rapida')[-1], 0)
+
+    def test_threads_somam_sem_perder_valores(self):
+        antes = self.valor('inventario_conferencia_leituras_total', conferencia='teste-threads')
+
+        def ler(_):
+            for _ in range(1000):
+                metricas.registrar_leituras('teste-threads')
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(ler, range(4)))
+        self.assertEqual(self.valor('inventario_conferencia_leituras_total', conferencia='teste-threads'),
+                         antes + 4000)
@@ -9,6 +9,10 @@ urlpatterns = [
     # Dashboard
     path('', views.principal, name='principal'),
 
+    # Autocompletar
+    path('autocompletar/salas/', views.autocompletar_salas, name='autocompletar_salas'),
+    path('autocompletar/setores/', views.autocompletar_setores, name='autocompletar_setores'),
+
     # CRUD Setor
     path('setores/', views.SetorListView.as_view(), name='setor_list'),
     path('setores/novo/', views.SetorCreateView.as_view(), name='setor_create'),
@@ -26,8 +30,12 @@ urlpatterns = [
     path('inventarios/novo/', views.InventarioCreateView.as_view(), name='inventario_create'),
     path('inventarios/<int:pk>/editar/', views.InventarioUpdateView.as_view(), name='inventario_update'),
     path('inventarios/<int:pk>/excluir/', views.InventarioDeleteView.as_view(), name='inventario_delete'),
+    path('inventarios/buscar/', views.buscar_inventarios, name='buscar_inventarios'),
     path('relatorio/pdf/', views.relatorio_inventario_pdf, name='relatorio_pdf'),
+    path('relatorio/pdf/<int:pk>/', views.relatorio_pdf_status, name='relatorio_pdf_status'),
+    path('relatorio/pdf/<int:pk>/download/', views.relatorio_pdf_download, name='relatorio_pdf_download'),
     path('relatorio/csv/', views.relatorio_inventario_csv, name='relatorio_csv'),
+    path('relatorio/xlsx/', views.relatorio_inventario_xlsx, name='relatorio_xlsx'),
 
     # CRUD Conferência
     path('conferencias/', views.ConferenciaListView.as_view(), name='conferencia_list'),
@@ -35,9 +43,27 @@ urlpatterns = [
     path('conferencias/<int:pk>/editar/', views.ConferenciaUpdateView.as_view(), name='conferencia_update'),
     path('conferencias/<int:pk>/excluir/', views.ConferenciaDeleteView.as_view(), name='conferencia_delete'),
 
+    # Conciliação
+    path('conciliacao/', views.conciliacao, name='conciliacao'),
+
+    # Análise
+    path('analise/', views.analise, name='analise'),
+    path('analise/csv/', views.analise_csv, name='analise_csv'),
+
+    # Etiquetas
+    path('etiquetas/', views.etiquetas, name='etiquetas'),
+
+    # Métricas (Prometheus)
+    path('metricas/', views.metricas, name='metricas'),
+
     # Realizar Conferência
     path('conferencias/iniciar/', views.iniciar_conferencia, name='iniciar_conferencia'),
     path('conferencias/<int:pk>/realizar/', views.realizar_conferencia, name='realizar_conferencia'),
     path('conferencias/<int:conferencia_pk>/confirmar/<int:inventario_pk>/', views.confirmar_item,
          name='confirmar_item'),
+    path('conferencias/<int:pk>/itens/', views.itens_conferidos, name='itens_conferidos'),
+    path('conferencias/<int:pk>/confirmar-rapido/', views.confirmacao_rapida, name='confirmacao_rapida'),
+    path('conferencias/<int:pk>/itens/lote/', views.conferir_itens_lote, name='conferir_itens_lote'),
+    path('conferencias/<int:pk>/manifesto/', views.manifesto_conferencia, name='manifesto_conferencia'),
+    path('conferencias/<int:pk>/sincronizar/', views.sincronizar_conferencia, name='sincronizar_conferencia'),
 ]
@@ -1,22 +1,57 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth import login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib import messages
-from django.urls import reverse_lazy
+from django.core.paginator import Paginator
+from django.urls import reverse, reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
 from django.utils import timezone
-from .models import Sala, Inventario, Conferencia, ItemConferencia, Setor
+from .models import (Sala, Inventario, Conferencia, ItemConferencia, Setor, RelatorioJob,
+                     SincronizacaoScanner, ConciliacaoSala, ConciliacaoItem, ResumoInventario)
 from .forms import (SalaForm, InventarioForm, ConferenciaForm,
                     IniciarConferenciaForm, BuscarPatrimonioForm,
-                    ConfirmarItemForm, SetorForm)
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from .models import Inventario
+                    ConfirmarItemForm, SetorForm, FiltroEtiquetasForm)
+from .contadores import obter_contadores
+from .conferencias import normalizar_itens, registrar_itens
+from .etiquetas import gerar_etiquetas_pdf
+from .paginacao import KeysetPaginationMixin
+from .autocompletar import autocompletar_salas as buscar_salas, autocompletar_setores as buscar_setores
+from .banco import repetir_escrita, repetir_se_bloqueado
+from .busca import buscar_ids
+from .imagens import enfileirar_imagem
+from .metricas import (CONTENT_TYPE as METRICAS_CONTENT_TYPE, autorizado as metricas_autorizadas,
+                       exportar as exportar_metricas, registrar_leituras, registrar_relatorio)
+from .movimentacoes import registrar_movimentacoes
+from .resumos import STATUS as STATUS_RESUMO, totais, totais_agrupados
+from .relatorios import filtrar_inventarios, gerar_relatorio_xlsx, solicitar_relatorio_pdf
+from django.http import HttpResponse, StreamingHttpResponse, JsonResponse, FileResponse, Http404
+from django.utils.http import urlencode
+from collections import Counter
 import csv
-import openpyxl
+import json
+import tempfile
+import time
+
+CSV_CHUNK_SIZE = 2000
+# Planilhas até esse tamanho ficam em memória; acima disso vão para disco
+XLSX_SPOOL_MAX_SIZE = 10 * 1024 * 1024
+ETIQUETAS_SPOOL_MAX_SIZE = 10 * 1024 * 1024
+LOTE_MAX_ITENS = 1000
+ITENS_CONFERIDOS_POR_PAGINA = 50
+# Na confirmação rápida só itens cadastrados com esse status são confirmados
+# direto; os demais vão para o formulário detalhado
+STATUS_CONFIRMACAO_RAPIDA = 'bom'
+BUSCA_POR_PAGINA = 50
+LIMITE_DIVERGENCIAS = 500
 
 # ========== VIEWS DE AUTENTICAÇÃO ==========
 def login_view(request):
@@ -38,23 +73,30 @@ def logout_view(request):
 # ========== DASHBOARD ==========
 @login_required
 def principal(request):
-    total_salas = Sala.objects.count()
-    total_inventarios = Inventario.objects.count()
-    total_conferencias = Conferencia.objects.count()
-    conferencias_abertas = Conferencia.objects.filter(finalizada=False).count()
-
-    context = {
-        'total_salas': total_salas,
-        'total_inventarios': total_inventarios,
-        'total_conferencias': total_conferencias,
-        'conferencias_abertas': conferencias_abertas,
-    }
+    # Contadores mantidos em cache pelos signals (ver meuapp/contadores.py)
+    context = obter_contadores()
     return render(request, 'meuapp/principal.html', context)
 
 
+# ========== AUTOCOMPLETAR ==========
+# Alimentam os selects preguiçosos dos formulários (ver meuapp/autocompletar.py)
+@login_required
+@require_GET
+def autocompletar_salas(request):
+    return JsonResponse(buscar_salas(request.GET.get('q', '').strip(), request.GET.get('campus', '').strip(),
+                                     request.GET.get('setor', '').strip()))
+
+
+@login_required
+@require_GET
+def autocompletar_setores(request):
+    return JsonResponse(buscar_setores(request.GET.get('q', '').strip(), request.GET.get('campus', '').strip()))
+
+
 # ========== CRUD SETOR ==========
-class SetorListView(LoginRequiredMixin, ListView):
+class SetorListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Setor
+    ordering = ['nome']
     template_name = 'meuapp/setor_list.html'
     context_object_name = 'setores'
 
@@ -80,8 +122,9 @@ class SetorDeleteView(LoginRequiredMixin, DeleteView):
 
 
 # ========== CRUD SALA ==========
-class SalaListView(LoginRequiredMixin, ListView):
+class SalaListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Sala
+    queryset = Sala.objects.select_related('setor')
     template_name = 'meuapp/sala_list.html'
     context_object_name = 'salas'
 
@@ -107,21 +150,34 @@ class SalaDeleteView(LoginRequiredMixin, DeleteView):
 
 
 # ========== CRUD INVENTÁRIO ==========
-class InventarioListView(LoginRequiredMixin, ListView):
+class InventarioListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Inventario
+    queryset = Inventario.objects.select_related('sala_atual')
     template_name = 'meuapp/inventario_list.html'
     context_object_name = 'inventarios'
-    paginate_by = 50
+    contagem = 'aproximada'
+
+
+class MovimentacaoFormMixin:
+    """Registra a mudança de sala feita pelo formulário do inventário."""
+
+    @transaction.atomic
+    def form_valid(self, form):
+        anterior = form.initial.get('sala_atual')
+        response = super().form_valid(form)
+        registrar_movimentacoes([(self.object.pk, anterior, self.object.sala_atual_id)], 'cadastro',
+                                usuario_id=self.request.user.pk)
+        return response
 
 
-class InventarioCreateView(LoginRequiredMixin, CreateView):
+class InventarioCreateView(LoginRequiredMixin, MovimentacaoFormMixin, CreateView):
     model = Inventario
     form_class = InventarioForm
     template_name = 'meuapp/inventario_form.html'
     success_url = reverse_lazy('inventario_list')
 
 
-class InventarioUpdateView(LoginRequiredMixin, UpdateView):
+class InventarioUpdateView(LoginRequiredMixin, MovimentacaoFormMixin, UpdateView):
     model = Inventario
     form_class = InventarioForm
     template_name = 'meuapp/inventario_form.html'
@@ -134,9 +190,25 @@ class InventarioDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy('inventario_list')
 
 
+@login_required
+def buscar_inventarios(request):
+    termo = request.GET.get('q', '').strip()
+    # Ranking e paginação sobre os ids; só a página atual é carregada
+    page_obj = Paginator(buscar_ids(termo), BUSCA_POR_PAGINA).get_page(request.GET.get('page'))
+    por_id = Inventario.objects.select_related('sala_atual').in_bulk(page_obj.object_list)
+    inventarios = [por_id[pk] for pk in page_obj.object_list if pk in por_id]
+    return render(request, 'meuapp/inventario_busca.html', {
+        'termo': termo,
+        'inventarios': inventarios,
+        'page_obj': page_obj,
+    })
+
+
 # ========== CRUD CONFERÊNCIA ==========
-class ConferenciaListView(LoginRequiredMixin, ListView):
+class ConferenciaListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Conferencia
+    queryset = Conferencia.objects.select_related('sala', 'usuario')
+    contagem = 'aproximada'
     template_name = 'meuapp/conferencia_list.html'
     context_object_name = 'conferencias'
 
@@ -165,7 +237,150 @@ class ConferenciaDeleteView(LoginRequiredMixin, DeleteView):
     success_url = reverse_lazy('conferencia_list')
 
 
+# ========== CONCILIAÇÃO ==========
+@login_required
+def conciliacao(request):
+    # Lê o resumo calculado pelo comando conciliar_inventario (ver meuapp/conciliacao.py)
+    anos = list(ConciliacaoSala.objects.order_by('-ano').values_list('ano', flat=True).distinct())
+    try:
+        ano = int(request.GET.get('ano') or (anos[0] if anos else timezone.now().year))
+    except ValueError:
+        ano = anos[0] if anos else timezone.now().year
+
+    resumos = ConciliacaoSala.objects.filter(ano=ano).select_related('sala__setor')
+    setor_id = request.GET.get('setor')
+    if setor_id and setor_id.isdigit():
+        resumos = resumos.filter(sala__setor_id=setor_id)
+    totais = resumos.aggregate(
+        esperados=Sum('esperados'), encontrados=Sum('encontrados'), faltantes=Sum('faltantes'),
+        realocados=Sum('realocados'), inesperados=Sum('inesperados'),
+    )
+
+    divergencias = None
+    sala_id = request.GET.get('sala')
+    if sala_id and sala_id.isdigit():
+        divergencias = (
+            ConciliacaoItem.objects.filter(ano=ano, sala_id=sala_id).exclude(situacao='encontrado')
+            .select_related('inventario', 'sala_relacionada').order_by('situacao', 'inventario__codigo')
+        )[:LIMITE_DIVERGENCIAS]
+
+    context = {
+        'anos': anos,
+        'ano': ano,
+        'resumos': resumos.order_by('sala__setor__sigla', 'sala__numero'),
+        'totais': totais,
+        'divergencias': divergencias,
+        'sala_id': sala_id,
+    }
+    return render(request, 'meuapp/conciliacao.html', context)
+
+
+# ========== ANÁLISE ==========
+def _dados_analise(params):
+    """Linhas do resumo analítico no nível pedido: campus → setor (?campus=) → tipo (?setor=; 0 = sem sala)."""
+    linhas = ResumoInventario.objects.all()
+    campus = params.get('campus') or None
+    setor_id = params.get('setor', '')
+    setor = None
+
+    if setor_id.isdigit():
+        if int(setor_id):
+            setor = get_object_or_404(Setor, pk=setor_id)
+            campus = setor.campus
+            linhas = linhas.filter(setor=setor)
+        else:
+            campus = None
+            linhas = linhas.filter(setor__isnull=True)
+        nivel, grupos = 'tipo', totais_agrupados(linhas, 'tipo')
+    elif campus:
+        linhas = linhas.filter(setor__campus=campus)
+        nivel, grupos = 'setor', totais_agrupados(linhas, 'setor_id', 'setor__sigla', 'setor__nome')
+    else:
+        nivel, grupos = 'campus', totais_agrupados(linhas, 'setor__campus')
+
+    tipos = dict(Inventario.TIPO_CHOICES)
+    resultado = []
+    for grupo in grupos:
+        if nivel == 'campus':
+            rotulo = grupo['setor__campus'] or 'Sem sala'
+            filtro = {'campus': grupo['setor__campus']} if grupo['setor__campus'] else {'setor': 0}
+        elif nivel == 'setor':
+            rotulo, filtro = f"{grupo['setor__sigla']} - {grupo['setor__nome']}", {'setor': grupo['setor_id']}
+        else:
+            rotulo, filtro = tipos.get(grupo['tipo'], grupo['tipo']), None
+        resultado.append({
+            'rotulo': rotulo,
+            'filtro': urlencode(filtro) if filtro else None,
+            'itens': grupo['itens'],
+            'por_status': [grupo[f'status_{status}'] or 0 for status in STATUS_RESUMO],
+            'aquisicao': grupo['aquisicao'],
+            'depreciado': grupo['depreciado'],
+        })
+
+    geral = totais(linhas)
+    geral['por_status'] = [geral[f'status_{status}'] or 0 for status in STATUS_RESUMO]
+    return {
+        'nivel': nivel,
+        'campus': campus,
+        'setor': setor,
+        'sem_sala': setor_id == '0',
+        'linhas': resultado,
+        'totais': geral,
+    }
+
+
+@login_required
+def analise(request):
+    # Lê o resumo mantido pelos signals e pelo comando reconstruir_resumo (ver meuapp/resumos.py)
+    context = _dados_analise(request.GET)
+    context['status'] = [rotulo for _, rotulo in Inventario.STATUS_CHOICES]
+    context['querystring'] = request.GET.urlencode()
+    return render(request, 'meuapp/analise.html', context)
+
+
+@login_required
+def analise_csv(request):
+    dados = _dados_analise(request.GET)
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="analise_inventario.csv"'
+
+    writer = csv.writer(response)
+    writer.writerow([dados['nivel'].capitalize(), 'Itens', *[rotulo for _, rotulo in Inventario.STATUS_CHOICES],
+                     'Valor de Aquisicao', 'Valor Depreciado'])
+    for linha in dados['linhas']:
+        writer.writerow([linha['rotulo'], linha['itens'], *linha['por_status'],
+                         f"{linha['aquisicao'] or 0:.2f}", f"{linha['depreciado'] or 0:.2f}"])
+    return response
+
+
 # ========== REALIZAR CONFERÊNCIA ==========
+# O caminho do scanner (realizar_conferencia, itens_conferidos, confirmar_item,
+# confirmacao_rapida e conferir_itens_lote) é async e usa o ORM async nas leituras. Gravações que
+# precisam de transação vão numa função síncrona via sync_to_async: o ORM
+# async ainda não tem transaction.atomic.
+def login_required_async(view):
+    """login_required para views async, já com request.user carregado.
+
+    Sem isso o request.user preguiçoso, usado pelos templates, faria uma
+    consulta síncrona dentro do loop de eventos.
+    """
+    @wraps(view)
+    async def envolver(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
+    return login_required(envolver)
+
+
+registrar_itens_em_transacao = repetir_se_bloqueado(registrar_itens)
+
+
+@repetir_se_bloqueado
+def _finalizar_conferencia(conferencia):
+    conferencia.finalizada = True
+    conferencia.data_fim = timezone.now()
+    conferencia.save(update_fields=['finalizada', 'data_fim'])
+
+
 @login_required
 def iniciar_conferencia(request):
     if request.method == 'POST':
@@ -188,9 +403,9 @@ def iniciar_conferencia(request):
     return render(request, 'meuapp/iniciar_conferencia.html', {'form': form})
 
 
-@login_required
-def realizar_conferencia(request, pk):
-    conferencia = get_object_or_404(Conferencia, pk=pk)
+@login_required_async
+async def realizar_conferencia(request, pk):
+    conferencia = await aget_object_or_404(Conferencia.objects.select_related('sala'), pk=pk)
 
     if conferencia.finalizada:
         messages.warning(request, 'Esta conferência já foi finalizada.')
@@ -198,9 +413,7 @@ def realizar_conferencia(request, pk):
 
     if request.method == 'POST':
         if 'finalizar' in request.POST:
-            conferencia.finalizada = True
-            conferencia.data_fim = timezone.now()
-            conferencia.save()
+            await sync_to_async(_finalizar_conferencia)(conferencia)
             messages.success(request, 'Conferência finalizada com sucesso!')
             return redirect('conferencia_list')
 
@@ -208,103 +421,244 @@ def realizar_conferencia(request, pk):
         if form.is_valid():
             codigo = form.cleaned_data['codigo_patrimonio']
             try:
-                inventario = Inventario.objects.get(codigo=codigo)
+                inventario = await Inventario.objects.only('pk').aget(codigo=codigo)
                 return redirect('confirmar_item', conferencia_pk=conferencia.pk, inventario_pk=inventario.pk)
             except Inventario.DoesNotExist:
                 messages.error(request, f'Patrimônio com código "{codigo}" não encontrado.')
     else:
         form = BuscarPatrimonioForm()
 
-    itens_conferidos = conferencia.itens.all()
+    itens_conferidos, proximo = await _pagina_itens_conferidos(conferencia)
 
     context = {
         'conferencia': conferencia,
         'form': form,
         'itens_conferidos': itens_conferidos,
+        'proximo': proximo,
     }
     return render(request, 'meuapp/realizar_conferencia.html', context)
 
-def relatorio_inventario_pdf(request):
-    # Configura a resposta HTTP para PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="relatorio_inventario.pdf"'
-
-    # Cria o PDF
-    p = canvas.Canvas(response, pagesize=A4)
-    largura, altura = A4
-
-    # Cabeçalho
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(50, altura - 50, "Relatório de Inventário")
-
-    # Lista de itens
-    p.setFont("Helvetica", 12)
-    y = altura - 80
-    for inventario in Inventario.objects.all():
-        linha = f"{inventario.codigo} - Descrição: {inventario.descricao} - Tipo: {inventario.tipo} - Status: {inventario.status} - Sala atual: {inventario.sala_atual}"
-        p.drawString(50, y, linha)
-        y -= 20
-        if y < 50:  # Nova página se necessário
-            p.showPage()
-            p.setFont("Helvetica", 12)
-            y = altura - 50
-
-    p.showPage()
-    p.save()
+
+async def _pagina_itens_conferidos(conferencia, antes=None):
+    """Itens mais recentes primeiro, com o inventário no mesmo JOIN; devolve (itens, cursor)."""
+    itens = (conferencia.itens.select_related('inventario')
+             .only('id', 'conferencia_id', 'status_conferido', 'observacao', 'data_conferencia',
+                   'imagem_observacao', 'imagem_miniatura', 'inventario__codigo', 'inventario__descricao')
+             .order_by('-id'))
+    if antes:
+        itens = itens.filter(id__lt=antes)
+
+    itens = [item async for item in itens[:ITENS_CONFERIDOS_POR_PAGINA + 1]]
+    proximo = None
+    if len(itens) > ITENS_CONFERIDOS_POR_PAGINA:
+        itens = itens[:ITENS_CONFERIDOS_POR_PAGINA]
+        proximo = itens[-1].id
+    return itens, proximo
+
+
+@login_required_async
+@require_GET
+async def itens_conferidos(request, pk):
+    """Próxima página (fragmento HTML) da tabela de itens conferidos."""
+    conferencia = await aget_object_or_404(Conferencia, pk=pk)
+    try:
+        antes = int(request.GET.get('antes', ''))
+    except ValueError:
+        antes = None
+
+    itens, proximo = await _pagina_itens_conferidos(conferencia, antes)
+    response = render(request, 'meuapp/itens_conferidos_linhas.html', {'itens_conferidos': itens})
+    response['X-Proximo-Cursor'] = proximo or ''
     return response
 
-def relatorio_inventario_csv(request):
-    # Configura a resposta HTTP para CSV
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="relatorio_inventario.csv"'
+# ========== RELATÓRIOS ==========
+def _quer_json(request):
+    return 'application/json' in request.headers.get('Accept', '')
 
-    # Cria o writer CSV
-    writer = csv.writer(response)
 
-    # Cabeçalhos
-    writer.writerow([
-        "Codigo",
-        "Descricao",
-        "Tipo",
-        "Status",
-        "Sala Atual"
-    ])
-
-    # Linhas do relatório
-    for inventario in Inventario.objects.all():
-        writer.writerow([
-            inventario.codigo,
-            inventario.descricao,
-            inventario.tipo,
-            inventario.status,
-            inventario.sala_atual
+def _dados_job(job):
+    dados = {
+        'job_id': job.pk,
+        'status': job.status,
+        'status_url': reverse('relatorio_pdf_status', args=[job.pk]),
+        'download_url': None,
+    }
+    if job.status == 'concluido':
+        dados['download_url'] = reverse('relatorio_pdf_download', args=[job.pk])
+    if job.status == 'erro':
+        dados['erro'] = job.erro
+    return dados
+
+
+@login_required
+def relatorio_inventario_pdf(request):
+    # O PDF é gerado em segundo plano pelo comando processar_relatorios
+    job = solicitar_relatorio_pdf(request.GET, usuario=request.user)
+
+    if _quer_json(request):
+        return JsonResponse(_dados_job(job), status=200 if job.status == 'concluido' else 202)
+    if job.status == 'concluido':
+        return redirect('relatorio_pdf_download', pk=job.pk)
+    return redirect('relatorio_pdf_status', pk=job.pk)
+
+
+@login_required
+def relatorio_pdf_status(request, pk):
+    job = get_object_or_404(RelatorioJob, pk=pk)
+
+    if _quer_json(request):
+        return JsonResponse(_dados_job(job))
+    return render(request, 'meuapp/relatorio_status.html', {'job': job})
+
+
+@login_required
+def relatorio_pdf_download(request, pk):
+    job = get_object_or_404(RelatorioJob, pk=pk, status='concluido')
+
+    if not job.arquivo or not job.arquivo.storage.exists(job.arquivo.name):
+        raise Http404('Arquivo do relatório não encontrado.')
+    return FileResponse(job.arquivo.open('rb'), as_attachment=True,
+                        filename='relatorio_inventario.pdf', content_type='application/pdf')
+
+class Echo:
+    """Pseudo-buffer para o csv.writer: devolve a linha em vez de acumulá-la."""
+
+    def write(self, value):
+        return value
+
+
+@login_required
+def relatorio_inventario_csv(request):
+    # Busca apenas as colunas necessárias, já com Sala e Setor no mesmo JOIN,
+    # em blocos pelo cursor do banco para não carregar tudo em memória
+    linhas = filtrar_inventarios(request.GET).values_list(
+        'codigo', 'descricao', 'tipo', 'status',
+        'sala_atual__numero', 'sala_atual__setor__sigla',
+    ).iterator(chunk_size=CSV_CHUNK_SIZE)
+
+    writer = csv.writer(Echo())
+
+    def gerar_linhas():
+        inicio = time.perf_counter()
+        # Cabeçalhos
+        yield writer.writerow([
+            "Codigo",
+            "Descricao",
+            "Tipo",
+            "Status",
+            "Sala Atual",
+            "Setor"
         ])
 
+        # Linhas do relatório
+        total = 0
+        for codigo, descricao, tipo, status, sala_numero, setor_sigla in linhas:
+            total += 1
+            yield writer.writerow([
+                codigo,
+                descricao,
+                tipo,
+                status,
+                f"Sala {sala_numero}" if sala_numero is not None else "",
+                setor_sigla or ""
+            ])
+        registrar_relatorio('csv', time.perf_counter() - inicio, total)
+
+    response = StreamingHttpResponse(gerar_linhas(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="relatorio_inventario.csv"'
     return response
 
+
 @login_required
-def confirmar_item(request, conferencia_pk, inventario_pk):
-    conferencia = get_object_or_404(Conferencia, pk=conferencia_pk)
-    inventario = get_object_or_404(Inventario, pk=inventario_pk)
+def relatorio_inventario_xlsx(request):
+    arquivo = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_SIZE)
+    gerar_relatorio_xlsx(request.GET, arquivo)
+    arquivo.seek(0)
+
+    return FileResponse(
+        arquivo, as_attachment=True, filename='relatorio_inventario.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+# ========== ETIQUETAS ==========
+@login_required
+@require_GET
+def etiquetas(request):
+    # Sem "gerar" só mostra o formulário. O form recusa lotes acima de
+    # ETIQUETAS_LIMITE_WEB (esses vão pelo comando gerar_etiquetas) e a view não
+    # abre o pool de processos
+    form = FiltroEtiquetasForm(request.GET if 'gerar' in request.GET else None)
+    if form.is_valid():
+        dados = form.cleaned_data
+        arquivo = tempfile.SpooledTemporaryFile(max_size=ETIQUETAS_SPOOL_MAX_SIZE)
+        total = gerar_etiquetas_pdf(dados, arquivo, dados['formato'], dados['simbologia'], dados['copias'],
+                                    paralelo=False)
+        if total:
+            arquivo.seek(0)
+            return FileResponse(arquivo, as_attachment=True, filename='etiquetas.pdf',
+                                content_type='application/pdf')
+        arquivo.close()
+        messages.warning(request, 'Nenhum item encontrado com esses filtros.')
+
+    return render(request, 'meuapp/etiquetas.html', {'form': form})
+
+
+# ========== MÉTRICAS ==========
+@require_GET
+def metricas(request):
+    # Lido pelo Prometheus; ver meuapp/metricas.py
+    if not metricas_autorizadas(request):
+        return HttpResponse('Acesso negado.', status=403, content_type='text/plain; charset=utf-8')
+    return HttpResponse(exportar_metricas(), content_type=METRICAS_CONTENT_TYPE)
+
+
+@repetir_se_bloqueado
+def _gravar_confirmacao(form, conferencia, inventario, item_existente, imagem):
+    item = form.save(commit=False)
+    item.conferencia = conferencia
+    item.inventario = inventario
+    if item_existente is None:
+        item.sala_anterior_id = inventario.sala_atual_id
+    # A foto nova é enfileirada depois do commit (ver confirmar_item)
+    if imagem:
+        item.imagem_observacao = item_existente.imagem_observacao if item_existente else None
+    item.save()
+
+    # Atualizar sala atual do inventário. Como no registrar_itens, a mudança
+    # entra no resumo analítico quando a conferência é finalizada
+    registrar_movimentacoes([(inventario.pk, inventario.sala_atual_id, conferencia.sala_id)], 'conferencia',
+                            usuario_id=conferencia.usuario_id, conferencia_id=conferencia.pk)
+    Inventario.objects.filter(pk=inventario.pk).update(sala_atual=conferencia.sala_id, atualizado_em=timezone.now())
+    transaction.on_commit(lambda: registrar_leituras(conferencia.pk))
+    return item
+
+
+@login_required_async
+async def confirmar_item(request, conferencia_pk, inventario_pk):
+    conferencia = await aget_object_or_404(Conferencia.objects.select_related('sala'), pk=conferencia_pk)
+    inventario = await aget_object_or_404(Inventario.objects.select_related('sala_atual'), pk=inventario_pk)
+
+    # Depois de finalizada, a mudança de sala não entraria mais no resumo analítico
+    if conferencia.finalizada:
+        messages.warning(request, 'Esta conferência já foi finalizada.')
+        return redirect('conferencia_list')
 
     # Verificar se já foi conferido
-    item_existente = ItemConferencia.objects.filter(
+    item_existente = await ItemConferencia.objects.filter(
         conferencia=conferencia,
         inventario=inventario
-    ).first()
+    ).afirst()
 
     if request.method == 'POST':
         form = ConfirmarItemForm(request.POST, request.FILES, instance=item_existente)
         if form.is_valid():
-            item = form.save(commit=False)
-            item.conferencia = conferencia
-            item.inventario = inventario
-            item.save()
-
-            # Atualizar sala atual do inventário
-            inventario.sala_atual = conferencia.sala
-            inventario.save()
-
+            imagem = request.FILES.get('imagem_observacao')
+            item = await sync_to_async(_gravar_confirmacao)(form, conferencia, inventario, item_existente, imagem)
+            if imagem:
+                # Fora da transação: um rollback ou nova tentativa não deixa arquivo órfão.
+                # O original é gravado como chegou e processado pelo worker processar_imagens
+                await sync_to_async(enfileirar_imagem)(item, imagem)
             messages.success(request, f'Item {inventario.codigo} conferido com sucesso!')
             return redirect('realizar_conferencia', pk=conferencia.pk)
     else:
@@ -320,4 +674,145 @@ def confirmar_item(request, conferencia_pk, inventario_pk):
     return render(request, 'meuapp/confirmar_item.html', context)
 
 
+@login_required_async
+@require_POST
+async def conferir_itens_lote(request, pk):
+    """Recebe vários códigos de uma vez (ex.: coletor) e responde o resultado de cada um."""
+    conferencia = await aget_object_or_404(Conferencia, pk=pk)
+
+    if conferencia.finalizada:
+        return JsonResponse({'erro': 'Esta conferência já foi finalizada.'}, status=409)
+
+    try:
+        itens = normalizar_itens(json.loads(request.body))
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'JSON inválido.'}, status=400)
+    except ValueError as exc:
+        return JsonResponse({'erro': str(exc)}, status=400)
+
+    if len(itens) > LOTE_MAX_ITENS:
+        return JsonResponse({'erro': f'Envie no máximo {LOTE_MAX_ITENS} itens por requisição.'}, status=400)
 
+    resultados = await sync_to_async(registrar_itens_em_transacao)(conferencia, itens)
+    return JsonResponse({
+        'conferencia': conferencia.pk,
+        'resultados': resultados,
+        'totais': Counter(r['resultado'] for r in resultados),
+    })
+
+
+@login_required_async
+@require_POST
+async def confirmacao_rapida(request, pk):
+    """Confirma um código com o status cadastrado numa única requisição.
+
+    Devolve a linha nova da tabela e os totais da conferência para a página
+    atualizar no lugar. Itens que não estão em bom estado, ou já conferidos,
+    recebem a URL do formulário detalhado (confirmar_item).
+    """
+    conferencia = await aget_object_or_404(Conferencia, pk=pk)
+
+    if conferencia.finalizada:
+        return JsonResponse({'erro': 'Esta conferência já foi finalizada.'}, status=409)
+
+    form = BuscarPatrimonioForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'erro': 'Informe o código do patrimônio.'}, status=400)
+    codigo = form.cleaned_data['codigo_patrimonio']
+
+    inventario = await Inventario.objects.only('pk', 'codigo', 'status').filter(codigo=codigo).afirst()
+    if inventario is None:
+        return JsonResponse({'codigo': codigo, 'resultado': 'nao_encontrado',
+                             'mensagem': f'Patrimônio com código "{codigo}" não encontrado.'})
+
+    url_detalhada = reverse('confirmar_item', args=[conferencia.pk, inventario.pk])
+    if inventario.status != STATUS_CONFIRMACAO_RAPIDA:
+        return JsonResponse({'codigo': codigo, 'resultado': 'detalhar', 'url': url_detalhada,
+                             'mensagem': f'Item {codigo} cadastrado como '
+                                         f'{inventario.get_status_display().lower()}: confira os detalhes.'})
+
+    resultado = (await sync_to_async(registrar_itens_em_transacao)(
+        conferencia, [{'codigo': codigo, 'status': None, 'observacao': None}],
+    ))[0]
+    resposta = {'codigo': codigo, 'resultado': resultado['resultado'], 'url': url_detalhada}
+    if resultado['resultado'] == 'ok':
+        item = await (conferencia.itens.select_related('inventario')
+                      .only('id', 'conferencia_id', 'status_conferido', 'observacao', 'data_conferencia',
+                            'imagem_observacao', 'imagem_miniatura', 'inventario__codigo',
+                            'inventario__descricao')
+                      .aget(inventario_id=inventario.pk))
+        resposta['linha'] = render_to_string('meuapp/itens_conferidos_linhas.html', {'itens_conferidos': [item]})
+        resposta['mensagem'] = f'Item {codigo} conferido.'
+    else:
+        resposta['mensagem'] = f'Item {codigo} já foi conferido nesta conferência.'
+    resposta['totais'] = await Conferencia.objects.filter(pk=conferencia.pk).values(
+        'total_itens', 'total_bom', 'total_danificado', 'total_inutilizado',
+    ).aget()
+    return JsonResponse(resposta)
+
+
+@login_required
+@require_GET
+def manifesto_conferencia(request, pk):
+    """Itens esperados na sala da conferência, para o scanner validar sem rede."""
+    conferencia = get_object_or_404(Conferencia.objects.select_related('sala'), pk=pk)
+
+    esperados = (Inventario.objects.filter(sala_atual_id=conferencia.sala_id).order_by()
+                 .values_list('id', 'codigo', 'descricao'))
+    conferidos = (ItemConferencia.objects.filter(conferencia=conferencia).order_by()
+                  .values_list('inventario__codigo', flat=True))
+
+    return JsonResponse({
+        'conferencia': conferencia.pk,
+        'sala': str(conferencia.sala),
+        'finalizada': conferencia.finalizada,
+        # codigo -> [id, descrição resumida]
+        'itens': {codigo: [item_id, descricao[:80]] for item_id, codigo, descricao in esperados},
+        'conferidos': list(conferidos),
+    })
+
+
+@login_required
+@require_POST
+@repetir_escrita
+def sincronizar_conferencia(request, pk):
+    """Recebe um lote da fila offline; a mesma chave nunca é processada duas vezes."""
+    conferencia = get_object_or_404(Conferencia, pk=pk)
+
+    try:
+        dados = json.loads(request.body)
+        chave = str(dados.get('chave') or '').strip() if isinstance(dados, dict) else ''
+        itens = normalizar_itens(dados)
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'JSON inválido.'}, status=400)
+    except ValueError as exc:
+        return JsonResponse({'erro': str(exc)}, status=400)
+
+    if not chave or len(chave) > 64:
+        return JsonResponse({'erro': 'Informe uma "chave" de até 64 caracteres.'}, status=400)
+    if len(itens) > LOTE_MAX_ITENS:
+        return JsonResponse({'erro': f'Envie no máximo {LOTE_MAX_ITENS} itens por requisição.'}, status=400)
+
+    anterior = SincronizacaoScanner.objects.filter(conferencia=conferencia, chave=chave).first()
+    if anterior:
+        return JsonResponse({**anterior.resposta, 'repetido': True})
+
+    if conferencia.finalizada:
+        return JsonResponse({'erro': 'Esta conferência já foi finalizada.'}, status=409)
+
+    try:
+        with transaction.atomic():
+            resultados = registrar_itens(conferencia, itens)
+            resposta = {
+                'conferencia': conferencia.pk,
+                'chave': chave,
+                'resultados': resultados,
+                'totais': Counter(r['resultado'] for r in resultados),
+            }
+            SincronizacaoScanner.objects.create(chave=chave, conferencia=conferencia, resposta=resposta)
+    except IntegrityError:
+        # Outro envio com a mesma chave terminou primeiro
+        anterior = get_object_or_404(SincronizacaoScanner, conferencia=conferencia, chave=chave)
+        return JsonResponse({**anterior.resposta, 'repetido': True})
+
+    return JsonResponse({**resposta, 'repetido': False})